@@ -0,0 +1,120 @@
+"""
+ACA premium rating tables for the fallback healthcare model.
+The CSV sources in data/aca/ (federal default age curve, per-state area and
+tobacco factors, metal-tier premiums and out-of-pocket limits) are compiled
+once into a packed binary file that is memory-mapped at startup, so a premium
+lookup is plain array indexing.
+
+Rebuild the binary after editing the CSVs with: python aca_tables.py
+"""
+
+import csv
+import os
+import struct
+
+import numpy as np
+
+from packed_tables import PackedTable, write_packed
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'aca')
+TABLES_PATH = os.path.join(DATA_DIR, 'rating_tables.bin')
+SOURCE_FILES = ('states.csv', 'age_curve.csv', 'metal_tiers.csv')
+
+MAGIC = b'ACA1'
+HEADER = struct.Struct('<4sHHH')
+TIER_NAME_BYTES = 8
+
+# Row used for unknown states
+NATIONAL_ROW = 'US'
+
+# Premiums in metal_tiers.csv are quoted at this age
+REFERENCE_AGE = 50
+
+
+def _read_csv(name):
+    with open(os.path.join(DATA_DIR, name), newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def compile_rating_tables(path=TABLES_PATH):
+    """Pack the CSV sources into the binary layout read by RatingTables."""
+    states = _read_csv('states.csv')
+    ages = sorted(_read_csv('age_curve.csv'), key=lambda row: int(row['age']))
+    tiers = _read_csv('metal_tiers.csv')
+    if [int(row['age']) for row in ages] != list(range(len(ages))):
+        raise ValueError("age_curve.csv must list every age from 0 without gaps")
+
+    def floats(rows, column):
+        return np.array([float(row[column]) for row in rows], dtype='<f8').tobytes()
+
+    def write(f):
+        f.write(HEADER.pack(MAGIC, len(states), len(ages), len(tiers)))
+        f.write(''.join(row['state'] for row in states).encode('ascii'))
+        f.write(b''.join(row['tier'].encode('ascii').ljust(TIER_NAME_BYTES, b'\0') for row in tiers))
+        for blob in (floats(states, 'area_factor'), floats(states, 'tobacco_factor'), floats(ages, 'factor'),
+                     floats(tiers, 'premium_age_50'), floats(tiers, 'deductible'),
+                     floats(tiers, 'max_out_of_pocket')):
+            f.write(blob)
+    write_packed(path, write)
+
+
+class RatingTables(PackedTable):
+    """Memory-mapped rating tables with O(1) lookups by state, age and tier."""
+
+    PATH = TABLES_PATH
+    SOURCES = tuple(os.path.join(DATA_DIR, name) for name in SOURCE_FILES)
+    compile = staticmethod(compile_rating_tables)
+
+    def __init__(self, path=TABLES_PATH):
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, n_states, n_ages, n_tiers = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an ACA rating table file")
+        offset = HEADER.size
+
+        codes = bytes(buffer[offset:offset + 2 * n_states]).decode('ascii')
+        offset += 2 * n_states
+        self.state_index = {codes[i:i + 2]: i // 2 for i in range(0, len(codes), 2)}
+        self.tiers = tuple(
+            bytes(buffer[offset + i * TIER_NAME_BYTES:offset + (i + 1) * TIER_NAME_BYTES]).rstrip(b'\0').decode('ascii')
+            for i in range(n_tiers)
+        )
+        offset += TIER_NAME_BYTES * n_tiers
+
+        def take(count):
+            nonlocal offset
+            array = np.frombuffer(buffer, dtype='<f8', count=count, offset=offset)
+            offset += 8 * count
+            return array
+
+        self.area_factor = take(n_states)
+        self.tobacco_factor = take(n_states)
+        age_curve = take(n_ages)
+        reference_premium = take(n_tiers)
+        self.deductible = take(n_tiers)
+        self.max_out_of_pocket = take(n_tiers)
+
+        # Monthly premium per (age, tier) for the national area, without tobacco
+        self.age_premiums = age_curve[:, None] / age_curve[REFERENCE_AGE] * reference_premium[None, :]
+        self.max_age = n_ages - 1
+
+    def state_row(self, state):
+        return self.state_index.get(str(state or '').upper(), self.state_index[NATIONAL_ROW])
+
+    def monthly_premiums(self, state, age, tobacco_use=False):
+        """
+        Unsubsidized monthly premium per metal tier, shaped age.shape + (tiers,).
+        Ages past the end of the curve (64) are rated at its last entry.
+        """
+        row = self.state_row(state)
+        age_index = np.clip(np.asarray(age, dtype=int), 0, self.max_age)
+        factor = self.area_factor[row] * (self.tobacco_factor[row] if tobacco_use else 1.0)
+        return self.age_premiums[age_index] * factor
+
+
+rating_tables = RatingTables.load()
+
+
+if __name__ == '__main__':
+    compile_rating_tables()
+    print(f"Wrote {TABLES_PATH}")
@@ -0,0 +1,149 @@
+"""
+Batch scenario evaluation for the Retirement Planning Calculator.
+Evaluates many parsed plans at once by stacking them into (scenarios, years)
+grids, so the projection and Social Security math run as array operations
+instead of one calculate() call per scenario.
+"""
+
+import numpy as np
+
+from inflation import BUDGET_FIELDS, budget_lines_by_age, expected_inflation
+from portfolio import expected_returns
+from projection import FORECAST_RETIREMENT_YEARS, project_balances
+from simulation import PLANNING_HORIZON_AGE, budget_by_age
+from social_security import social_security_benefit, spousal_benefit
+
+# Scenarios evaluated per vectorized pass; results stream out after each chunk
+BATCH_CHUNK_SIZE = 1000
+
+
+def _column(scenarios, name, default=np.nan):
+    """Stack one input field across scenarios as a float array, with None mapped to default."""
+    return np.array([default if s[name] is None else s[name] for s in scenarios], dtype=float)
+
+
+def evaluate_scenarios(scenarios, healthcare_costs, current_year):
+    """
+    Evaluate parsed plan inputs in one vectorized pass.
+
+    healthcare_costs holds each scenario's per-age healthcare cost array
+    (index = age, 0 ... 100). Returns one result dict per scenario, in order,
+    with the same summary figures /calculate reports plus the forecast's
+    ending balance, assets at age 100 and the age the timeline first runs dry.
+    Like the single-plan timeline, inputs are in today's dollars and flows are
+    paid at each scenario's expected price level.
+    """
+    count = len(scenarios)
+    birth_year = _column(scenarios, 'birth_year')
+    retirement_age = _column(scenarios, 'retirement_age')
+    liquid_assets = _column(scenarios, 'liquid_assets')
+    real_estate = _column(scenarios, 'real_estate_cashflow', 0.0)
+    contribution = _column(scenarios, 'annual_contribution', 0.0)
+    claim_age = _column(scenarios, 'social_security_claim_age')
+    spouse_claim_age = _column(scenarios, 'spouse_social_security_claim_age')
+
+    healthcare_by_age = np.asarray(healthcare_costs, dtype=float)
+    other_budget = sum(_column(scenarios, field) for field in BUDGET_FIELDS)
+
+    current_age = current_year - birth_year
+
+    # Expected inflation per scenario; budget lines grow at their own spreads unless inflation is off
+    inflation = np.array([expected_inflation(1, s['inflation_model'], s['inflation_rate'])[0] for s in scenarios])
+    indexed = np.array([s['inflation_model'] != 'none' for s in scenarios])
+    budget_lines = {field: _column(scenarios, field) for field in BUDGET_FIELDS}
+    other_budget_by_age = np.where(indexed[:, None], budget_lines_by_age(budget_lines, current_age),
+                                   budget_lines_by_age(budget_lines, current_age, 'none'))
+
+    # Summary budget: the first retirement year's healthcare plus the other lines
+    first_retirement_age = np.maximum(retirement_age, current_age)[:, None]
+    annual_budget = other_budget + np.rint(budget_by_age(first_retirement_age, healthcare_by_age)[:, 0])
+
+    def spending_at(ages):
+        return budget_by_age(ages, other_budget_by_age) + budget_by_age(ages, healthcare_by_age)
+
+    def price_level(ages, lag=0):
+        """Each scenario's expected price level in the year it reaches ages, lag years behind."""
+        return (1 + inflation[:, None]) ** np.maximum(ages - current_age[:, None] - lag, 0)
+
+    # Social Security for the primary earner and, for couples, the spouse
+    primary_ss = social_security_benefit(_column(scenarios, 'annual_income'), _column(scenarios, 'years_worked'), claim_age)
+    couple = np.array([s['marital_status'] != 'single' for s in scenarios])
+    both_earning = couple & np.array([
+        s['both_working'] == 'both' and bool(s['spouse_annual_income']) and bool(s['spouse_years_worked'])
+        for s in scenarios
+    ])
+    earned_spouse_ss = social_security_benefit(
+        _column(scenarios, 'spouse_annual_income', 0.0), _column(scenarios, 'spouse_years_worked', 0.0),
+        np.nan_to_num(spouse_claim_age, nan=67)
+    )
+    dependent_spouse_ss = spousal_benefit(primary_ss, _column(scenarios, 'spouse_birth_year', 0.0), current_year)
+    spouse_ss = np.where(
+        both_earning, np.where(np.isnan(spouse_claim_age), 0.0, earned_spouse_ss),
+        np.where(couple, dependent_spouse_ss, 0.0)
+    )
+    spouse_start = np.where(couple & ~np.isnan(spouse_claim_age), spouse_claim_age, np.inf)
+
+    def social_security_at(ages):
+        return (np.where(ages >= claim_age[:, None], primary_ss[:, None], 0.0)
+                + np.where(ages >= spouse_start[:, None], spouse_ss[:, None], 0.0))
+
+    def retirement_cashflow(ages):
+        # Social Security is indexed a year behind prices, as its COLA is
+        return ((real_estate[:, None] - spending_at(ages)) * price_level(ages)
+                + social_security_at(ages) * price_level(ages, lag=1))
+
+    # The canonical timeline for every scenario on one shared age axis; columns
+    # before a scenario's current age stay idle
+    retirement_start = np.maximum(retirement_age, current_age)
+    forecast_end_age = retirement_start + FORECAST_RETIREMENT_YEARS - 1
+    first_age = int(current_age.min())
+    ages = np.arange(first_age, int(max(PLANNING_HORIZON_AGE, forecast_end_age.max())) + 1)[None, :]
+    active = ages >= current_age[:, None]
+    working = ages < retirement_age[:, None]
+    cashflows = np.where(active, np.where(working, contribution[:, None] * price_level(ages),
+                                          retirement_cashflow(ages)), 0.0)
+    # Each scenario's expected return by age, from its own allocation path
+    expected = np.vstack([
+        expected_returns(s['market_profile'], ages[0], s['retirement_age'], s['glide_path'], s['allocation'])
+        for s in scenarios
+    ])
+    rates = np.where(active, expected, 0.0)
+    balances = project_balances(liquid_assets, rates, cashflows)
+    ending = balances[:, 1:]
+    rows = np.arange(count)
+    nominal_at_retirement = balances[rows, (retirement_start - first_age).astype(int)]
+    portfolio_at_retirement = nominal_at_retirement / (1 + inflation) ** (retirement_start - current_age)
+
+    forecast_ending = ending[rows, (forecast_end_age - first_age).astype(int)]
+    assets_at_100 = ending[:, PLANNING_HORIZON_AGE - first_age]
+
+    depleted = active & (ending < 0) & (ages <= PLANNING_HORIZON_AGE)
+    first_depleted = depleted.argmax(axis=1)
+    depletion_age = np.where(depleted.any(axis=1), ages[0, first_depleted], -1)
+
+    safe_withdrawal = portfolio_at_retirement * 0.04
+    total_social_security = primary_ss + spouse_ss
+    total_income = safe_withdrawal + real_estate + total_social_security
+
+    results = []
+    for i in range(count):
+        results.append({
+            'summary': {
+                'portfolioAtRetirement': round(portfolio_at_retirement[i]),
+                'portfolioAtRetirementNominal': round(nominal_at_retirement[i]),
+                'safeAnnualWithdrawal': round(safe_withdrawal[i]),
+                'totalAnnualIncome': round(total_income[i]),
+                'annualBudget': round(annual_budget[i]),
+                'surplusDeficit': round(total_income[i] - annual_budget[i]),
+                'safeSustainableSpending': round(total_income[i])
+            },
+            'socialSecurity': {
+                'primaryClaimed': int(primary_ss[i]),
+                'spousalClaimed': int(spouse_ss[i]),
+                'totalClaimed': int(total_social_security[i])
+            },
+            'forecastEndingBalance': round(forecast_ending[i]),
+            'assetsAt100': round(assets_at_100[i]),
+            'depletionAge': int(depletion_age[i]) if depletion_age[i] >= 0 else None
+        })
+    return results
@@ -0,0 +1,153 @@
+"""
+Social Security claiming-age optimizer.
+Scores every (primary, spouse) claim-age pair from 62y0m to 70y0m at monthly
+granularity (97 x 97 for couples) as one array computation and picks the best.
+"""
+
+import numpy as np
+
+from projection import project_balances
+from social_security import (FULL_RETIREMENT_AGE, MAX_CLAIM_AGE, MIN_CLAIM_AGE, claim_adjustment, fra_benefit,
+                             spousal_claim_adjustment)
+
+CLAIMING_OBJECTIVES = ('lifetimeBenefits', 'portfolio')
+
+# Claim options in months past age 62 (62y0m ... 70y0m)
+CLAIM_MONTHS = np.arange((MAX_CLAIM_AGE - MIN_CLAIM_AGE) * 12 + 1)
+
+# Planning assumptions for the lifetime-benefits objective
+LIFE_EXPECTANCY = 90
+DISCOUNT_RATE = 0.03
+
+
+
+def _stream_value(monthly_benefit, start_month, end_month, monthly_discount):
+    """Present value of a level monthly benefit paid from start_month up to end_month (months from now)."""
+    start_month = np.maximum(start_month, 0)
+    end_month = np.maximum(end_month, start_month)
+    return monthly_benefit * (monthly_discount ** start_month - monthly_discount ** end_month) / (1 - monthly_discount)
+
+
+def _annual_benefits(monthly_benefit, start_month, years):
+    """Benefits received in each of the next years from a monthly benefit starting start_month months from now."""
+    year_end = 12 * np.arange(1, years + 1)
+    return monthly_benefit[..., None] * np.clip(year_end - start_month[..., None], 0, 12)
+
+
+def format_claim_age(claim_months):
+    """Claim option as {'years', 'months', 'age'} for display."""
+    years, months = divmod(int(claim_months), 12)
+    return {'years': MIN_CLAIM_AGE + years, 'months': months, 'age': round(MIN_CLAIM_AGE + int(claim_months) / 12, 4)}
+
+
+def optimize_claiming(current_age, annual_income, years_worked, chosen_claim_age, couple=False, spouse_age=None,
+                      spouse_earns=False, spouse_annual_income=0.0, spouse_years_worked=0,
+                      spouse_chosen_claim_age=None, objective='lifetimeBenefits', projection=None,
+                      life_expectancy=LIFE_EXPECTANCY, spouse_life_expectancy=LIFE_EXPECTANCY,
+                      discount_rate=DISCOUNT_RATE):
+    """
+    Find the claim-age pair that maximizes the household's benefit value.
+
+    lifetimeBenefits discounts every benefit month at discount_rate until each
+    spouse's life expectancy, with the survivor stepping up to the larger
+    benefit. portfolio runs every pair through the plan's deterministic
+    projection: projection holds its 'initial_balance' and, for each year
+    from today to the horizon, the expected 'rates', the nominal 'cashflows'
+    other than Social Security, the 'cola_index' benefits are paid at and
+    the 'paid' flags of the years benefits reach the portfolio (retirement),
+    plus the horizon's price 'level'. The pair whose portfolio runs dry
+    latest (or never) wins, then the one with the most left at the horizon
+    in today's dollars, so improvement can be negative when the best pair
+    wins by lasting longer. A non-earning spouse receives the spousal benefit
+    from the later of both claims.
+
+    Claim ages already in the past are not eligible, for the best pair and
+    for the chosen one. Returns None when no claim option remains.
+    """
+    if objective not in CLAIMING_OBJECTIVES:
+        raise ValueError(f"Unknown claiming objective: {objective}")
+    if objective == 'portfolio' and projection is None:
+        raise ValueError("The portfolio objective needs the plan's projection")
+    if spouse_age is None:
+        spouse_age = current_age
+
+    primary_months = CLAIM_MONTHS[:, None]
+    spouse_months = CLAIM_MONTHS[None, :] if couple else np.zeros((1, 1), dtype=int)
+
+    # Claim dates in months from now, measured on each person's own age
+    primary_start = MIN_CLAIM_AGE * 12 + primary_months - current_age * 12
+    spouse_start = MIN_CLAIM_AGE * 12 + spouse_months - spouse_age * 12
+    eligible = (primary_start >= 0) & ((spouse_start >= 0) | (not couple))
+    if not eligible.any():
+        return None
+
+    primary_pia = float(fra_benefit(annual_income, years_worked))
+    primary_benefit = primary_pia * claim_adjustment(MIN_CLAIM_AGE + primary_months / 12) / 12
+    if not couple:
+        spouse_benefit = np.zeros((1, 1))
+    elif spouse_earns:
+        spouse_pia = float(fra_benefit(spouse_annual_income, spouse_years_worked))
+        spouse_benefit = spouse_pia * claim_adjustment(MIN_CLAIM_AGE + spouse_months / 12) / 12
+    else:
+        spouse_benefit = 0.5 * primary_pia * spousal_claim_adjustment(MIN_CLAIM_AGE + spouse_months / 12) / 12
+        spouse_start = np.maximum(spouse_start, primary_start)
+
+    depleted_at = None
+    if objective == 'lifetimeBenefits':
+        monthly_discount = (1 + discount_rate) ** (-1 / 12)
+        primary_end = life_expectancy * 12 - current_age * 12
+        spouse_end = spouse_life_expectancy * 12 - spouse_age * 12
+        value = (_stream_value(primary_benefit, primary_start, primary_end, monthly_discount)
+                 + _stream_value(spouse_benefit, spouse_start, spouse_end, monthly_discount))
+        if couple:
+            # The survivor keeps the larger of the two benefits
+            if primary_end < spouse_end:
+                step_up = np.maximum(primary_benefit - spouse_benefit, 0)
+                value = value + _stream_value(step_up, np.maximum(primary_end, spouse_start), spouse_end,
+                                              monthly_discount)
+            elif spouse_end < primary_end:
+                step_up = np.maximum(spouse_benefit - primary_benefit, 0)
+                value = value + _stream_value(step_up, np.maximum(spouse_end, primary_start), primary_end,
+                                              monthly_discount)
+        value = np.broadcast_to(value, eligible.shape)
+        best = np.argmax(np.where(eligible, value, -np.inf))
+    else:
+        # Every pair's benefits (years along the last axis) added to the plan's own cashflows
+        years = len(projection['rates'])
+        primary_start_b, spouse_start_b, spouse_benefit_b = np.broadcast_arrays(
+            primary_start, spouse_start, spouse_benefit)
+        benefits = (_annual_benefits(np.broadcast_to(primary_benefit, eligible.shape), primary_start_b, years)
+                    + _annual_benefits(spouse_benefit_b, spouse_start_b, years))
+        cashflows = projection['cashflows'] + np.where(projection['paid'], benefits * projection['cola_index'], 0.0)
+        balances = project_balances(np.full(eligible.shape, float(projection['initial_balance'])),
+                                    np.broadcast_to(projection['rates'], cashflows.shape), cashflows)[..., 1:]
+        value = balances[..., -1] / projection['level']
+        # Years until the balance first goes negative; every year when it never does
+        dry = balances < 0
+        depleted_at = np.where(dry.any(axis=-1), dry.argmax(axis=-1), years)
+        best = np.lexsort((value.ravel(), np.where(eligible, depleted_at, -1).ravel()))[-1]
+
+    best_primary, best_spouse = np.unravel_index(best, eligible.shape)
+
+    chosen = None
+    chosen_primary = int(round((chosen_claim_age - MIN_CLAIM_AGE) * 12))
+    chosen_spouse = (int(round(((spouse_chosen_claim_age or FULL_RETIREMENT_AGE) - MIN_CLAIM_AGE) * 12))
+                     if couple else 0)
+    if (0 <= chosen_primary < eligible.shape[0] and 0 <= chosen_spouse < eligible.shape[1]
+            and eligible[chosen_primary, chosen_spouse]):
+        chosen = float(value[chosen_primary, chosen_spouse])
+
+    best_value = float(value[best_primary, best_spouse])
+    depletion_age = None
+    if depleted_at is not None and depleted_at[best_primary, best_spouse] < len(projection['rates']):
+        depletion_age = int(current_age + depleted_at[best_primary, best_spouse])
+    return {
+        'objective': objective,
+        'primaryClaimAge': format_claim_age(CLAIM_MONTHS[best_primary]),
+        'spouseClaimAge': format_claim_age(CLAIM_MONTHS[best_spouse]) if couple else None,
+        'bestValue': round(best_value),
+        'chosenValue': round(chosen) if chosen is not None else None,
+        'improvement': round(best_value - chosen) if chosen is not None else None,
+        'depletionAge': depletion_age,
+        'combinations': int(eligible.sum())
+    }
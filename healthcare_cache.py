@@ -0,0 +1,209 @@
+"""
+Cache for CMS Marketplace plan searches.
+Premium lookups repeat constantly across users (same ZIP, age and year), so
+responses are kept in a bounded in-process LRU with TTL expiry, optionally
+backed by a shared store (Redis) so every gunicorn worker benefits.
+Concurrent identical lookups are collapsed into one API call.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# 2024 Federal Poverty Level for a single person
+FPL_SINGLE = 14580
+
+# ACA subsidy band edges as multiples of FPL; incomes in the same band share a cache entry
+SUBSIDY_BANDS = (1.0, 1.38, 1.5, 2.0, 2.5, 3.0, 4.0)
+
+CACHE_SIZE = int(os.environ.get('HEALTHCARE_CACHE_SIZE', 4096))
+CACHE_TTL = float(os.environ.get('HEALTHCARE_CACHE_TTL', 6 * 3600))
+
+# e.g. redis://localhost:6379/0; leave unset for the in-process cache only
+SHARED_CACHE_URL = os.environ.get('HEALTHCARE_CACHE_URL')
+
+
+def income_band(income):
+    """Index of the subsidy band income falls into (0 = at or below FPL)."""
+    ratio = float(income or 0) / FPL_SINGLE
+    return sum(ratio > edge for edge in SUBSIDY_BANDS)
+
+
+def premium_cache_key(state, zip_code, age, income, tobacco_use, year):
+    return (str(state), str(zip_code), int(age), income_band(income), bool(tobacco_use), int(year))
+
+
+class MemoryBackend:
+    """Thread-safe LRU with per-entry TTL."""
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached value, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def counters(self):
+        """Consistent (evictions, expirations) snapshot."""
+        with self._lock:
+            return self.evictions, self.expirations
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Shared cache in Redis, stored as JSON with a server-side TTL.
+    Connection errors are treated as misses so a down Redis never fails a request.
+    """
+
+    def __init__(self, url, ttl=CACHE_TTL, prefix='healthcare:'):
+        if redis is None:
+            raise RuntimeError("The redis package is required for a shared healthcare cache")
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _error(self):
+        with self._lock:
+            self.errors += 1
+
+    def _key(self, key):
+        return self.prefix + json.dumps(key, separators=(',', ':'))
+
+    def get(self, key):
+        try:
+            raw = self.client.get(self._key(key))
+        except redis.RedisError:
+            self._error()
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        try:
+            self.client.set(self._key(key), json.dumps(value, separators=(',', ':')), ex=int(self.ttl))
+        except redis.RedisError:
+            self._error()
+
+
+class PremiumCache:
+    """
+    Two-level read-through cache: in-process LRU first, then the optional
+    shared backend, then the fetch itself. Only one fetch per key runs at a
+    time within a worker; other callers wait for its result.
+    """
+
+    def __init__(self, local=None, shared=None):
+        self.local = local if local is not None else MemoryBackend()
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Return the cached value for key, calling fetch() on a miss.
+        A fetch returning None (API unavailable) is passed through uncached.
+        """
+        value = self.local.get(key)
+        if value is not None:
+            self._count('hits')
+            return value
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return pending.result()
+
+        try:
+            value = self.shared.get(key) if self.shared is not None else None
+            if value is not None:
+                self._count('shared_hits')
+            else:
+                self._count('misses')
+                value = fetch()
+                if value is not None and self.shared is not None:
+                    self.shared.set(key, value)
+            if value is not None:
+                self.local.set(key, value)
+            pending.set_result(value)
+            return value
+        except Exception as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _count(self, counter):
+        # Counters are bumped under the lock; += on an attribute is not atomic across threads
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        with self._lock:
+            hits, shared_hits, misses, coalesced = self.hits, self.shared_hits, self.misses, self.coalesced
+        evictions, expirations = self.local.counters()
+        lookups = hits + shared_hits + misses + coalesced
+        return {
+            'hits': hits,
+            'sharedHits': shared_hits,
+            'misses': misses,
+            'coalesced': coalesced,
+            'hitRate': round((lookups - misses) / lookups, 4) if lookups else None,
+            'entries': len(self.local),
+            'maxEntries': self.local.maxsize,
+            'evictions': evictions,
+            'expirations': expirations,
+            'ttlSeconds': self.local.ttl,
+            'sharedBackend': type(self.shared).__name__ if self.shared is not None else None
+        }
+
+
+premium_cache = PremiumCache(shared=RedisBackend(SHARED_CACHE_URL) if SHARED_CACHE_URL else None)
@@ -0,0 +1,144 @@
+"""
+CMS Marketplace API client for healthcare premium lookups.
+Keeps one pooled keep-alive session per worker, uses tight connect/read
+timeouts and trips a circuit breaker after repeated failures so a slow or
+down API falls straight through to the fallback premium model.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Override with a local stub server for testing, e.g. http://127.0.0.1:8000/api/v1/plans/search
+CMS_API_URL = os.environ.get('CMS_API_URL', 'https://marketplace.cms.gov/api/v1/plans/search')
+
+# Seconds to wait for a connection and for the response
+CONNECT_TIMEOUT = float(os.environ.get('CMS_API_CONNECT_TIMEOUT', 2))
+READ_TIMEOUT = float(os.environ.get('CMS_API_READ_TIMEOUT', 5))
+
+# Consecutive failures that open the circuit, and how long it stays open
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 30
+
+# Kept-alive connections per worker process
+POOL_SIZE = 10
+
+REQUEST_HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'Retirement-Planning-App/1.0'
+}
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures; open -> half-open
+    after reset_timeout seconds, letting one trial request through.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._trial_thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow_request(self):
+        """Whether a request may go out right now."""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                self._trial_thread = threading.get_ident()
+                return True
+            return False
+
+    def release_trial(self):
+        """Free the half-open trial slot if this thread holds it and the trial ended without an outcome."""
+        with self._lock:
+            if self._trial_thread == threading.get_ident():
+                self._trial_in_flight = False
+                self._trial_thread = None
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+            self._trial_thread = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            self._trial_thread = None
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class MarketplaceClient:
+    """Pooled, circuit-broken client for the CMS plan search endpoint."""
+
+    def __init__(self, api_url=CMS_API_URL, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 breaker=None):
+        self.api_url = api_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        self.session.headers.update(REQUEST_HEADERS)
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def search_plans(self, payload):
+        """
+        POST a plan search and return the decoded JSON, or None when the caller
+        should use the fallback model (circuit open, timeout, error status).
+        """
+        if not self.breaker.allow_request():
+            return None
+        try:
+            return self._post(payload)
+        finally:
+            # A trial that raised something unexpected must not hold the breaker open forever
+            self.breaker.release_trial()
+
+    def _post(self, payload):
+        try:
+            response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            print(f"API request failed: {e}")
+            self.breaker.record_failure()
+            return None
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            return None
+        self.breaker.record_success()
+        if response.status_code != 200:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+
+marketplace_client = MarketplaceClient()
+
+# Runs the primary and spouse lookups side by side
+lookup_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix='cms-lookup')
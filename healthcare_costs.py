@@ -0,0 +1,75 @@
+"""
+Per-age healthcare cost curves for the Retirement Planning Calculator.
+Builds one array of annual household healthcare cost indexed by the primary's
+age: ACA marketplace coverage before 65 (the premium estimate at retirement
+carried along the ACA age curve), Medicare Parts B and D with IRMAA
+surcharges and a supplement from 65. Amounts are in today's dollars at
+today's prices; the medical spread over general inflation is added with
+the other budget lines' (see inflation.healthcare_growth_by_age).
+"""
+
+import numpy as np
+
+from aca_tables import rating_tables
+from simulation import PLANNING_HORIZON_AGE
+
+MEDICARE_AGE = 65
+
+# 2024 Medicare premiums (monthly) and Part B deductible (annual)
+PART_B_PREMIUM = 174.70
+PART_B_DEDUCTIBLE = 240
+PART_D_PREMIUM = 34.70  # Part D base beneficiary premium
+SUPPLEMENT_PREMIUM = 150  # Typical Medigap Plan G
+
+# 2024 IRMAA: MAGI thresholds and the monthly surcharge above each one
+IRMAA_SINGLE_THRESHOLDS = np.array([103000, 129000, 161000, 193000, 500000])
+IRMAA_JOINT_THRESHOLDS = np.array([206000, 258000, 322000, 386000, 750000])
+IRMAA_PART_B = np.array([0.0, 69.90, 174.70, 279.50, 384.30, 419.30])
+IRMAA_PART_D = np.array([0.0, 12.90, 33.30, 53.80, 74.20, 81.00])
+
+
+def medicare_annual_cost(magi, joint=False):
+    """Annual Medicare cost per person (Part B + deductible, Part D, supplement) including IRMAA."""
+    thresholds = IRMAA_JOINT_THRESHOLDS if joint else IRMAA_SINGLE_THRESHOLDS
+    bracket = np.searchsorted(thresholds, magi, side='left')
+    monthly = PART_B_PREMIUM + IRMAA_PART_B[bracket] + PART_D_PREMIUM + IRMAA_PART_D[bracket] + SUPPLEMENT_PREMIUM
+    return monthly * 12 + PART_B_DEDUCTIBLE
+
+
+def aca_annual_cost(ages, estimate, anchor_age):
+    """
+    Annual marketplace cost at each age from a premium estimate made at anchor_age.
+    The recommended tier's premium follows the ACA age curve; the deductible stays flat.
+    """
+    tier = estimate['recommended_tier']
+    curve = rating_tables.age_premiums[:, rating_tables.tiers.index(tier)]
+    age_index = np.clip(np.asarray(ages, dtype=int), 0, rating_tables.max_age)
+    anchor_index = min(max(int(anchor_age), 0), rating_tables.max_age)
+    premium = estimate['premiums'][tier]['annual'] * curve[age_index] / curve[anchor_index]
+    return premium + estimate['out_of_pocket'][tier]['deductible']
+
+
+def person_cost_by_age(ages, estimate, anchor_age, magi, joint):
+    """One person's annual cost at each of their ages; Medicare from 65, the ACA estimate before."""
+    cost = np.full(np.shape(ages), float(medicare_annual_cost(magi, joint)))
+    if estimate is not None:
+        cost = np.where(np.asarray(ages) < MEDICARE_AGE, aca_annual_cost(ages, estimate, anchor_age), cost)
+    return cost
+
+
+def household_cost_curve(primary_estimate, primary_anchor_age, magi,
+                         spouse_age_offset=None, spouse_estimate=None, spouse_anchor_age=None):
+    """
+    Household healthcare cost at every primary age from 0 to PLANNING_HORIZON_AGE.
+
+    Estimates are premium lookups (estimate_healthcare_premiums results) made
+    at the anchor ages, or None for someone already on Medicare by then.
+    spouse_age_offset is the spouse's age minus the primary's, None for
+    singles. magi approximates retirement income for IRMAA.
+    """
+    ages = np.arange(PLANNING_HORIZON_AGE + 1)
+    joint = spouse_age_offset is not None
+    cost = person_cost_by_age(ages, primary_estimate, primary_anchor_age, magi, joint)
+    if joint:
+        cost = cost + person_cost_by_age(ages + spouse_age_offset, spouse_estimate, spouse_anchor_age, magi, joint)
+    return cost
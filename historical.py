@@ -0,0 +1,89 @@
+"""
+Historical annual returns for the bootstrap simulation mode.
+data/history/annual_returns.csv holds US stock (S&P 500 with dividends) and
+10-year Treasury total returns with December-to-December CPI inflation since
+1928. It is compiled once into a packed binary file that is memory-mapped at
+startup, so sampling paths is plain array indexing and needs no network.
+
+Rebuild the binary after editing the CSV with: python historical.py
+"""
+
+import csv
+import os
+import struct
+
+import numpy as np
+
+from packed_tables import PackedTable, write_packed
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'history')
+RETURNS_PATH = os.path.join(DATA_DIR, 'annual_returns.bin')
+SOURCE_FILE = 'annual_returns.csv'
+
+MAGIC = b'HRS1'
+HEADER = struct.Struct('<4sHH')
+COLUMNS = ('stocks', 'bonds', 'inflation')
+
+
+def compile_returns(path=RETURNS_PATH):
+    """Pack the CSV source into the binary layout read by HistoricalReturns."""
+    with open(os.path.join(DATA_DIR, SOURCE_FILE), newline='') as f:
+        rows = sorted(csv.DictReader(f), key=lambda row: int(row['year']))
+    years = [int(row['year']) for row in rows]
+    if years != list(range(years[0], years[0] + len(years))):
+        raise ValueError(f"{SOURCE_FILE} must list every year without gaps")
+
+    # Year-major (years, 3) block so one year's stock, bond and inflation figures sit together
+    table = np.array([[float(row[column]) for column in COLUMNS] for row in rows], dtype='<f8')
+
+    def write(f):
+        f.write(HEADER.pack(MAGIC, years[0], len(years)))
+        f.write(table.tobytes())
+    write_packed(path, write)
+
+
+class HistoricalReturns(PackedTable):
+    """Memory-mapped annual stock, bond and inflation history."""
+
+    PATH = RETURNS_PATH
+    SOURCES = (os.path.join(DATA_DIR, SOURCE_FILE),)
+    compile = staticmethod(compile_returns)
+
+    def __init__(self, path=RETURNS_PATH):
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, first_year, n_years = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a historical returns file")
+        table = np.frombuffer(buffer, dtype='<f8', count=n_years * len(COLUMNS),
+                              offset=HEADER.size).reshape(n_years, len(COLUMNS))
+
+        self.first_year = first_year
+        self.years = np.arange(first_year, first_year + n_years)
+        self.stocks, self.bonds, self.inflation = table.T
+
+        # Plans are in today's dollars, so sampling uses returns deflated by that year's CPI
+        self.real_stocks = (1 + self.stocks) / (1 + self.inflation) - 1
+        self.real_bonds = (1 + self.bonds) / (1 + self.inflation) - 1
+
+    def __len__(self):
+        return len(self.years)
+
+    def real_portfolio_returns(self, stock_share, index=slice(None)):
+        """
+        Real return of the historical years at index for a portfolio rebalanced
+        annually to stock_share stocks and the rest bonds. stock_share
+        broadcasts against the gathered years, so it can change year by year.
+        """
+        return stock_share * self.real_stocks[index] + (1 - stock_share) * self.real_bonds[index]
+
+    def nominal_portfolio_returns(self, stock_share, index=slice(None)):
+        """Nominal counterpart of real_portfolio_returns, to pair with the same years' inflation."""
+        return stock_share * self.stocks[index] + (1 - stock_share) * self.bonds[index]
+
+
+historical_returns = HistoricalReturns.load()
+
+
+if __name__ == '__main__':
+    compile_returns()
+    print(f"Wrote {RETURNS_PATH}")
@@ -0,0 +1,130 @@
+"""
+Inflation model for the Retirement Planning Calculator.
+Every amount a plan enters (budget lines, contributions, real estate income,
+Social Security) is in today's dollars. Projections turn them into nominal
+dollars with a price-level path: budget lines grow at CPI plus their own
+spread, Social Security gets a cost-of-living adjustment from the previous
+year's CPI, and balances are reported both nominal and deflated back to
+today's dollars.
+
+CPI follows an AR(1) process around INFLATION_MEAN whose shocks are drawn
+jointly with the portfolio returns, so each Monte Carlo path has its own
+inflation history correlated with its market returns.
+"""
+
+import numpy as np
+
+from portfolio import ASSET_VOLATILITIES
+
+# 'none' keeps every flow flat in entered dollars; 'deterministic' inflates at
+# the expected rate; 'stochastic' gives every Monte Carlo path its own CPI path
+INFLATION_MODELS = ('none', 'deterministic', 'stochastic')
+
+INFLATION_MEAN = 0.025
+INFLATION_VOLATILITY = 0.012
+INFLATION_PERSISTENCE = 0.6
+
+# Correlation of the CPI shock with stocks, bonds, cash and real estate returns
+ASSET_INFLATION_CORRELATIONS = np.array([-0.1, -0.3, 0.4, 0.2])
+
+# Covariance of each asset's return with the standardized CPI shock; a mix w
+# carries w @ ASSET_INFLATION_COVARIANCES of its volatility on that shock
+ASSET_INFLATION_COVARIANCES = ASSET_VOLATILITIES * ASSET_INFLATION_CORRELATIONS
+
+# Medical costs outpace general inflation
+MEDICAL_INFLATION = 0.05
+
+# Yearly growth of each budget line on top of CPI. Healthcare grows by the
+# medical spread whether it is entered or estimated along its per-age curve.
+BUDGET_INFLATION_SPREADS = {
+    'housing': 0.005,
+    'food_living': 0.0,
+    'travel_leisure': 0.005,
+    'other_discretionary': 0.0,
+    'healthcare': (1 + MEDICAL_INFLATION) / (1 + INFLATION_MEAN) - 1
+}
+
+# Plan budget lines other than healthcare, which follows its own per-age cost curve
+BUDGET_FIELDS = tuple(line for line in BUDGET_INFLATION_SPREADS if line != 'healthcare')
+
+
+def inflation_paths(shocks, rate=INFLATION_MEAN):
+    """
+    Yearly CPI inflation from standardized shocks along the last axis.
+
+    Each year reverts INFLATION_PERSISTENCE of the way from last year's rate
+    toward rate, starting from rate, then adds the year's shock.
+    """
+    shocks = np.asarray(shocks, dtype=float)
+    inflation = np.empty_like(shocks)
+    previous = np.full(shocks.shape[:-1], float(rate))
+    for year in range(shocks.shape[-1]):
+        previous = rate + INFLATION_PERSISTENCE * (previous - rate) + INFLATION_VOLATILITY * shocks[..., year]
+        inflation[..., year] = previous
+    return inflation
+
+
+def expected_inflation(years, model='deterministic', rate=INFLATION_MEAN):
+    """The expected CPI path: rate every year, or zero when inflation is off."""
+    if model not in INFLATION_MODELS:
+        raise ValueError(f"Unknown inflation model: {model}")
+    return np.full(years, 0.0 if model == 'none' else float(rate))
+
+
+def price_levels(inflation):
+    """
+    Price level of every year relative to today along the last axis, length years + 1.
+
+    Year t's flows are paid at level[t]; an ending balance of year t is
+    deflated to today's dollars by level[t + 1].
+    """
+    inflation = np.asarray(inflation, dtype=float)
+    levels = np.empty(inflation.shape[:-1] + (inflation.shape[-1] + 1,))
+    levels[..., 0] = 1.0
+    np.cumprod(1.0 + inflation, axis=-1, out=levels[..., 1:])
+    return levels
+
+
+def cola_levels(levels):
+    """Social Security benefit index for each year: the price level a year earlier, length years."""
+    return np.concatenate([levels[..., :1], levels[..., :-2]], axis=-1)
+
+
+def budget_lines_by_age(lines, current_age, model='deterministic', end_age=100):
+    """
+    Budget at each age (0 ... end_age) in today's dollars from {line: amount}.
+
+    Each line compounds at its BUDGET_INFLATION_SPREADS real growth from the
+    current age, so multiplying by the price level gives nominal spending.
+    With inflation off the lines stay flat. Amounts and current_age may be
+    per-scenario arrays, giving one row of ages per scenario.
+    """
+    current_age = np.asarray(current_age, dtype=float)[..., None]
+    years_from_now = np.maximum(np.arange(end_age + 1) - current_age, 0)
+    total = np.zeros(years_from_now.shape)
+    for line, amount in lines.items():
+        spread = 0.0 if model == 'none' else BUDGET_INFLATION_SPREADS.get(line, 0.0)
+        total += np.asarray(amount, dtype=float)[..., None] * (1 + spread) ** years_from_now
+    return total
+
+
+def healthcare_growth_by_age(current_age, model='deterministic', end_age=100):
+    """Real growth of healthcare costs at each age (0 ... end_age): the medical spread, or ones with inflation off."""
+    return budget_lines_by_age({'healthcare': 1.0}, current_age, model, end_age)
+
+
+def plan_budget_lines(inputs):
+    """A parsed plan's {line: amount} budget lines, with missing lines as zero."""
+    return {field: inputs[field] or 0.0 for field in BUDGET_FIELDS}
+
+
+def budget_growth_by_age(lines, current_age, model='deterministic', end_age=100):
+    """
+    Cost at each age (0 ... end_age) of one today's dollar of budget split
+    like lines, so a rescaled budget keeps the plan's mix and each line's
+    growth above inflation. Ones throughout when the lines are all zero.
+    """
+    planned = sum(lines.values())
+    if not planned:
+        return np.ones(end_age + 1)
+    return budget_lines_by_age(lines, current_age, model, end_age) / planned
@@ -0,0 +1,53 @@
+"""
+Monthly time-step helpers for the Retirement Planning Calculator.
+Cashflows are laid out as contiguous (years, 12) float64 matrices: paychecks,
+contributions, Social Security and spending land in the month they happen,
+so a claim at 66y4m starts paying in month 4 of age 66. Annual rows are
+recovered by summing or compounding along the month axis.
+"""
+
+import numpy as np
+
+MONTHS_PER_YEAR = 12
+MONTH_OFFSETS = np.arange(MONTHS_PER_YEAR)
+
+TIME_STEPS = ('annual', 'monthly')
+
+
+def parse_time_step(value):
+    """Schema coercer for a time step: one of TIME_STEPS."""
+    if value not in TIME_STEPS:
+        raise ValueError(f"Unknown time step: {value}")
+    return value
+
+
+def monthly_rate(annual_rate):
+    """Monthly rate that compounds to annual_rate over a year."""
+    return (1 + np.asarray(annual_rate, dtype=float)) ** (1 / MONTHS_PER_YEAR) - 1
+
+
+def month_ages(ages):
+    """Age in whole months for every month of the years starting at ages, shaped ages.shape + (12,)."""
+    return np.rint(np.asarray(ages, dtype=float) * MONTHS_PER_YEAR).astype(int)[..., None] + MONTH_OFFSETS
+
+
+def social_security_by_month(months, social_security_streams):
+    """Monthly Social Security at each age in months from (start_age, annual_benefit) streams."""
+    total = np.zeros(np.shape(months))
+    for start_age, annual_benefit in social_security_streams:
+        start_month = round(start_age * MONTHS_PER_YEAR)
+        total += np.where(months >= start_month, annual_benefit / MONTHS_PER_YEAR, 0.0)
+    return total
+
+
+def year_end_value(monthly_cashflows, annual_rates):
+    """
+    Value at year end of end-of-month cashflows growing at each year's rate,
+    i.e. sum over m of cashflow[m] * (1 + r)^((11 - m) / 12).
+
+    Feeding this to an annual projection gives the same balances as stepping
+    month by month at the equivalent monthly rate.
+    """
+    exponents = (MONTHS_PER_YEAR - 1 - MONTH_OFFSETS) / MONTHS_PER_YEAR
+    weights = (1 + np.asarray(annual_rates, dtype=float))[..., None] ** exponents
+    return (monthly_cashflows * weights).sum(axis=-1)
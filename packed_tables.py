@@ -0,0 +1,58 @@
+"""
+Shared loading for the packed binary tables (aca_tables, historical).
+Each table is compiled from CSV sources into a file that is memory-mapped at
+startup; this module decides when a rebuild is due and writes the file so
+concurrent readers never see it half-written.
+"""
+
+import os
+
+
+def write_packed(path, write):
+    """
+    Call write(f) on a temporary file and swap it in at path.
+    Workers starting together never read a partial file.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            write(f)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def is_stale(path, sources):
+    """True when path is missing or older than any of the source files."""
+    if not os.path.exists(path):
+        return True
+    built = os.path.getmtime(path)
+    return any(os.path.getmtime(source) > built for source in sources)
+
+
+class PackedTable:
+    """
+    Base for memory-mapped tables built from CSV sources.
+
+    Subclasses set PATH (the default binary), SOURCES (the CSV paths it is
+    built from) and compile (a function writing the binary to a given path),
+    and read the file in __init__(path).
+    """
+
+    PATH = None
+    SOURCES = ()
+    compile = None
+
+    @classmethod
+    def load(cls, path=None):
+        """Load the compiled table, compiling it first if missing or older than its sources."""
+        path = path or cls.PATH
+        if is_stale(path, cls.SOURCES):
+            try:
+                cls.compile(path)
+            except OSError:
+                # Read-only deployments keep using the committed binary
+                if not os.path.exists(path):
+                    raise
+        return cls(path)
@@ -0,0 +1,118 @@
+"""
+Multi-asset portfolio model for the Retirement Planning Calculator.
+Stocks, bonds, cash and real estate each have an expected annual return and
+volatility, tied together by a correlation matrix. A plan holds a mix of the
+four (a market profile preset or a custom allocation) that can follow a glide
+path by age, and is rebalanced back to that year's mix every year, so its
+return in a year is the weighted sum of the asset returns.
+"""
+
+import numpy as np
+
+ASSET_CLASSES = ('stocks', 'bonds', 'cash', 'realEstate')
+
+# Expected annual return and volatility of each asset class, in ASSET_CLASSES order
+ASSET_MEANS = np.array([0.10, 0.045, 0.03, 0.08])
+ASSET_VOLATILITIES = np.array([0.18, 0.07, 0.01, 0.16])
+
+ASSET_CORRELATIONS = np.array([
+    [1.0, 0.1, 0.0, 0.6],
+    [0.1, 1.0, 0.3, 0.2],
+    [0.0, 0.3, 1.0, 0.0],
+    [0.6, 0.2, 0.0, 1.0]
+])
+
+ASSET_COVARIANCE = np.outer(ASSET_VOLATILITIES, ASSET_VOLATILITIES) * ASSET_CORRELATIONS
+
+# Market profiles as asset mixes, chosen so their expected returns stay near 5%, 7% and 9%
+ALLOCATION_PRESETS = {
+    'Conservative': np.array([0.10, 0.70, 0.15, 0.05]),
+    'Moderate': np.array([0.40, 0.45, 0.05, 0.10]),
+    'Aggressive': np.array([0.75, 0.15, 0.00, 0.10])
+}
+
+# 'static' holds the mix at every age; 'targetDate' moves it to the
+# Conservative preset over the GLIDE_YEARS before retirement
+GLIDE_PATHS = ('static', 'targetDate')
+GLIDE_YEARS = 10
+
+
+def preset_allocation(market_profile):
+    """Asset mix of a market profile, defaulting to Aggressive like the form handler."""
+    return ALLOCATION_PRESETS.get(market_profile, ALLOCATION_PRESETS['Aggressive'])
+
+
+def portfolio_moments(weights):
+    """Expected return and volatility of asset mixes along the last axis."""
+    weights = np.asarray(weights, dtype=float)
+    variance = np.einsum('...a,ab,...b->...', weights, ASSET_COVARIANCE, weights)
+    return weights @ ASSET_MEANS, np.sqrt(variance)
+
+
+def _weights(value):
+    """An asset mix from a {asset: weight} mapping, normalized to sum to 1."""
+    if not isinstance(value, dict):
+        raise ValueError("Allocations must map asset classes to weights")
+    unknown = set(value) - set(ASSET_CLASSES) - {'age'}
+    if unknown:
+        raise ValueError(f"Unknown asset class: {sorted(unknown)[0]}")
+    weights = np.array([float(value.get(asset, 0.0)) for asset in ASSET_CLASSES])
+    if (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError("Allocation weights must be non-negative and not all zero")
+    return weights / weights.sum()
+
+
+def parse_allocation(value):
+    """Schema coercer for a custom {stocks, bonds, cash, realEstate} mix."""
+    return _weights(value)
+
+
+def parse_glide_path(value):
+    """
+    Schema coercer for a glide path: a GLIDE_PATHS name, or a list of
+    {"age", stocks, bonds, cash, realEstate} points interpolated linearly by
+    age (held flat before the first and after the last point). Custom points
+    come back as an (ages, weights) pair.
+    """
+    if isinstance(value, str):
+        if value not in GLIDE_PATHS:
+            raise ValueError(f"Unknown glide path: {value}")
+        return value
+    if not isinstance(value, list) or not value:
+        raise ValueError("Glide paths must be a name or a non-empty list of points")
+    if not all(isinstance(point, dict) and 'age' in point for point in value):
+        raise ValueError("Every glide path point needs an age")
+    points = sorted(value, key=lambda point: float(point['age']))
+    return (np.array([float(point['age']) for point in points]),
+            np.array([_weights(point) for point in points]))
+
+
+def allocation_path(market_profile, ages, retirement_age, glide_path='static', allocation=None):
+    """
+    Asset mix held at each age, shaped like ages broadcast against
+    retirement_age, plus a trailing assets axis.
+
+    The starting mix is the custom allocation if given, else the profile's
+    preset. ages and retirement_age broadcast, so a (scenarios, years) age grid
+    with a (scenarios, 1) retirement column gives one path per scenario.
+    """
+    retirement_age = np.asarray(retirement_age, dtype=float)
+    ages = np.broadcast_to(np.asarray(ages, dtype=float), np.broadcast_shapes(np.shape(ages), retirement_age.shape))
+    if isinstance(glide_path, tuple):
+        point_ages, point_weights = glide_path
+        return np.stack([np.interp(ages, point_ages, point_weights[:, asset])
+                         for asset in range(len(ASSET_CLASSES))], axis=-1)
+
+    start = preset_allocation(market_profile) if allocation is None else np.asarray(allocation, dtype=float)
+    if glide_path == 'static':
+        return np.broadcast_to(start, ages.shape + start.shape)
+
+    end = ALLOCATION_PRESETS['Conservative']
+    progress = np.clip((ages - (retirement_age - GLIDE_YEARS)) / GLIDE_YEARS, 0.0, 1.0)
+    return start + progress[..., None] * (end - start)
+
+
+def expected_returns(market_profile, ages, retirement_age, glide_path='static', allocation=None):
+    """Expected portfolio return at each age of the allocation path."""
+    return allocation_path(market_profile, ages, retirement_age, glide_path, allocation) @ ASSET_MEANS
+
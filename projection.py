@@ -0,0 +1,219 @@
+"""
+Closed-form deterministic projections for the Retirement Planning Calculator.
+One canonical timeline is computed per plan as array operations; the
+forecast table, balance chart and extended asset chart are column views of
+it, and per-year rows are only built when something actually reads them.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from inflation import INFLATION_MEAN, cola_levels, expected_inflation, price_levels
+from monthly import MONTHS_PER_YEAR, month_ages, social_security_by_month, year_end_value
+from portfolio import expected_returns
+from simulation import PLANNING_HORIZON_AGE, budget_by_age
+
+# Number of retirement years shown in the annual forecast table
+FORECAST_RETIREMENT_YEARS = 30
+
+
+class LazyRows(Sequence):
+    """
+    Read-only list of per-year dicts backed by column arrays.
+
+    Rows are assembled on access, so callers that only need the arrays (batch
+    jobs, JSON encoders working column-wise) never pay for the dicts.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self._size = len(next(iter(columns.values()))) if columns else 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('row index out of range')
+        return {name: column.item(index) for name, column in self.columns.items()}
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self[index]
+
+
+def future_value(initial_balance, annual_contribution, years, rate):
+    """
+    Balance after compounding with end-of-year contributions: B*(1+r)^n + C*((1+r)^n-1)/r.
+
+    Works elementwise on arrays; negative year counts leave the balance unchanged.
+    """
+    years = np.maximum(years, 0)
+    rate = np.asarray(rate, dtype=float)
+    growth = (1 + rate) ** years
+    safe_rate = np.where(rate == 0, 1.0, rate)
+    annuity_factor = np.where(rate == 0, years, (growth - 1) / safe_rate)
+    return initial_balance * growth + annual_contribution * annuity_factor
+
+
+def project_balances(initial_balance, rates, cashflows):
+    """
+    Starting balance of every year plus the final ending balance (length years + 1).
+
+    Each year grows at rates[t] and then receives cashflows[t]. With G_t the
+    cumulative growth factor, B_t = G_t * (B_0 + sum_{s<t} cashflows[s] / G_{s+1}).
+    Years run along the last axis, so a (scenarios, years) grid projects every
+    scenario at once when initial_balance has one entry per scenario.
+    """
+    rates = np.asarray(rates, dtype=float)
+    cashflows = np.broadcast_to(np.asarray(cashflows, dtype=float), rates.shape)
+    shape = rates.shape[:-1] + (rates.shape[-1] + 1,)
+
+    growth = np.empty(shape)
+    growth[..., 0] = 1.0
+    np.cumprod(1.0 + rates, axis=-1, out=growth[..., 1:])
+
+    discounted = np.zeros(shape)
+    np.cumsum(cashflows / growth[..., 1:], axis=-1, out=discounted[..., 1:])
+    return growth * (np.asarray(initial_balance, dtype=float)[..., None] + discounted)
+
+
+def social_security_by_age(ages, social_security_streams):
+    """Total Social Security received at each age from (start_age, annual_benefit) streams."""
+    total = np.zeros(np.shape(ages))
+    for start_age, annual_benefit in social_security_streams:
+        total += np.where(ages >= start_age, annual_benefit, 0.0)
+    return total
+
+
+def _monthly_components(ages, working, rates, steady_cashflows, annual_budget, social_security_streams,
+                        levels, cola_index):
+    """
+    Per-row Social Security, spending and year-end cashflow with every flow
+    landing in its own month. steady_cashflows (contributions, real estate)
+    are spread evenly; benefits start in the claim month. Spending is paid at
+    the year's price level and benefits at its COLA index.
+    """
+    months = month_ages(ages)
+    social_security = np.where(working[:, None], 0.0, social_security_by_month(months, social_security_streams)
+                               * cola_index[:, None])
+    spending = np.where(working[:, None], 0.0, budget_by_age(months // MONTHS_PER_YEAR, annual_budget)
+                        / MONTHS_PER_YEAR * levels[:, None])
+    flows = steady_cashflows[:, None] / MONTHS_PER_YEAR + social_security - spending
+    return social_security.sum(axis=-1), spending.sum(axis=-1), year_end_value(flows, rates)
+
+
+def _whole_dollars(values):
+    """Round to whole dollars the way the row builders always have (half to even)."""
+    return np.rint(values).astype(np.int64)
+
+
+def build_timeline(current_age, current_year, retirement_age, liquid_assets, annual_contribution,
+                   annual_budget, real_estate_cashflow, social_security_streams, market_profile, monthly=False,
+                   glide_path='static', allocation=None, inflation_model='none', inflation_rate=INFLATION_MEAN):
+    """
+    The canonical deterministic projection: one row per age from today.
+
+    Working years (before retirement_age) add the contribution; retirement
+    years add real estate income and Social Security and pay the budget (flat
+    or per-age, see budget_by_age). Every year grows at the expected return of
+    that age's asset mix (see allocation_path), the same expectation the Monte
+    Carlo engine draws around.
+    The timeline runs to PLANNING_HORIZON_AGE, or further when the forecast's
+    FORECAST_RETIREMENT_YEARS of retirement need it. With monthly=True every
+    flow is booked in its month and rows show the year's totals.
+
+    Inputs are in today's dollars. Unless inflation_model is 'none', flows are
+    paid at the expected price level (Social Security a year behind, as its
+    COLA is), so the money columns are nominal; the real columns deflate the
+    ending balance and spending back to today's dollars.
+    """
+    end_age = max(PLANNING_HORIZON_AGE, max(retirement_age, current_age) + FORECAST_RETIREMENT_YEARS - 1)
+    ages = np.arange(current_age, end_age + 1)
+    working = ages < retirement_age
+    rates = expected_returns(market_profile, ages, retirement_age, glide_path, allocation)
+    levels = price_levels(expected_inflation(len(ages), inflation_model, inflation_rate))
+    year_levels = levels[:-1]
+
+    contributions = np.where(working, annual_contribution, 0.0) * year_levels
+    real_estate = np.where(working, 0.0, real_estate_cashflow) * year_levels
+    if monthly:
+        social_security, spending, cashflows = _monthly_components(
+            ages, working, rates, contributions + real_estate, annual_budget, social_security_streams,
+            year_levels, cola_levels(levels)
+        )
+    else:
+        social_security = np.where(working, 0.0, social_security_by_age(ages, social_security_streams)
+                                   * cola_levels(levels))
+        spending = np.where(working, 0.0, budget_by_age(ages, annual_budget) * year_levels)
+        cashflows = contributions + real_estate + social_security - spending
+
+    balances = project_balances(liquid_assets, rates, cashflows)
+    starting = balances[:-1]
+    if monthly:
+        # Gains include growth on money that arrived during the year
+        gains = balances[1:] - starting - (contributions + real_estate + social_security - spending)
+    else:
+        gains = starting * rates
+
+    return LazyRows({
+        'age': ages,
+        'year': current_year + (ages - current_age),
+        'startingBalance': _whole_dollars(starting),
+        'investmentGains': _whole_dollars(gains),
+        'realEstateCashflow': _whole_dollars(real_estate),
+        'socialSecurity': _whole_dollars(social_security),
+        'spending': _whole_dollars(spending),
+        'endingBalance': _whole_dollars(balances[1:]),
+        'contribution': _whole_dollars(contributions),
+        'period': np.where(working, 'Working', 'Retirement').astype(object),
+        'realEndingBalance': _whole_dollars(balances[1:] / levels[1:]),
+        'realSpending': _whole_dollars(spending / year_levels)
+    })
+
+
+def _head(timeline, rows, names):
+    """LazyRows over the first rows of the timeline, renaming columns; the arrays are views, not copies."""
+    columns = timeline.columns
+    return LazyRows({name: columns[source][:rows] for name, source in names.items()})
+
+
+def build_forecast(timeline, retirement_age):
+    """Annual forecast table: the timeline from today through FORECAST_RETIREMENT_YEARS of retirement."""
+    ages = timeline.columns['age']
+    retirement_start = max(retirement_age, ages[0]) if len(ages) else retirement_age
+    rows = int(np.count_nonzero(ages < retirement_start + FORECAST_RETIREMENT_YEARS))
+    return _head(timeline, rows, {name: name for name in timeline.columns})
+
+
+def build_balance_chart(forecast):
+    """Portfolio balance chart view over the forecast columns, without copying rows."""
+    columns = forecast.columns
+    return LazyRows({
+        'year': columns['year'],
+        'age': columns['age'],
+        'balance': columns['endingBalance'],
+        'period': columns['period']
+    })
+
+
+def build_extended_chart(timeline, end_age=PLANNING_HORIZON_AGE):
+    """Total asset chart: the timeline from today to end_age."""
+    rows = int(np.count_nonzero(timeline.columns['age'] <= end_age))
+    return _head(timeline, rows, {
+        'year': 'year',
+        'age': 'age',
+        'totalAssets': 'endingBalance',
+        'realTotalAssets': 'realEndingBalance',
+        'period': 'period',
+        'contributions': 'contribution',
+        'investmentGains': 'investmentGains',
+        'realEstateIncome': 'realEstateCashflow',
+        'socialSecurity': 'socialSecurity',
+        'spending': 'spending'
+    })
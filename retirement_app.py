@@ -4,16 +4,49 @@ Retirement Planning Calculator
 A comprehensive web application for retirement planning with advanced financial modeling.
 """
 
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, url_for
+from markupsafe import Markup
+import gzip
+import hashlib
 import math
-import random
-import requests
 import json
+import numpy as np
 import os
 from datetime import datetime
 
+try:
+    import brotli
+except ImportError:  # Optional: responses fall back to gzip without it
+    brotli = None
+
+from aca_tables import rating_tables
+from batch import BATCH_CHUNK_SIZE, evaluate_scenarios
+from claiming import optimize_claiming
+from healthcare_cache import premium_cache, premium_cache_key
+from healthcare_client import lookup_executor, marketplace_client
+from healthcare_costs import MEDICARE_AGE, household_cost_curve
+from inflation import (INFLATION_MEAN, budget_lines_by_age, cola_levels, expected_inflation, healthcare_growth_by_age,
+                       plan_budget_lines, price_levels)
+from monthly import MONTHS_PER_YEAR, year_end_value
+from portfolio import allocation_path, expected_returns
+from projection import LazyRows, build_balance_chart, build_extended_chart, build_forecast, build_timeline, project_balances
+from roth_conversions import optimize_conversions
+from schema import parse_amount, parse_latest_age, parse_path_count, parse_plan_inputs
+from solver import (LATEST_RETIREMENT_AGE, MAX_SOLVER_PATHS, earliest_retirement_age, max_sustainable_spending,
+                    retirement_age_candidates)
+from social_security import claim_adjustment
+from streaming import STREAM_FORMATS, stream_rows
+from taxes import ACCOUNT_TYPES, TAX_MODELS, after_tax_value, filing_status, rmd_start_age, simulate_tax_accounts
+from simulation import (DEFAULT_PATHS, PLANNING_HORIZON_AGE, budget_by_age, build_lifecycle_cashflows, draw_market,
+                        market_price_levels, resolve_seed, run_simulation)
+from sweep import MAX_SWEEP_PATH_CELLS, SWEEP_PATHS, expand_axis, run_sweep
+from withdrawals import compare_strategies, retirement_paths
+
 app = Flask(__name__)
 
+# Static assets are fingerprinted, so browsers may keep them for a year
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 365 * 24 * 3600
+
 # Error handlers for production
 @app.errorhandler(500)
 def internal_error(error):
@@ -23,1393 +56,87 @@ def internal_error(error):
 def not_found_error(error):
     return "Page not found.", 404
 
-# HTML template for the application
-HTML_TEMPLATE = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Retirement Planning Calculator</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', sans-serif;
-            background-color: #f8fafc;
-            color: #1e293b;
-            line-height: 1.6;
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 2rem;
-        }
-        
-        .header {
-            text-align: center;
-            margin-bottom: 3rem;
-        }
-        
-        .header h1 {
-            font-size: 2.5rem;
-            color: #0f172a;
-            margin-bottom: 0.5rem;
-        }
-        
-        .header p {
-            font-size: 1.1rem;
-            color: #64748b;
-        }
-        
-        .form-section {
-            background: white;
-            border-radius: 12px;
-            padding: 2rem;
-            margin-bottom: 2rem;
-            box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1);
-        }
-        
-        .form-section h2 {
-            color: #0f172a;
-            margin-bottom: 1.5rem;
-            font-size: 1.5rem;
-            border-bottom: 2px solid #e2e8f0;
-            padding-bottom: 0.5rem;
-        }
-        
-        .form-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 1.5rem;
-        }
-        
-        .form-group {
-            display: flex;
-            flex-direction: column;
-        }
-        
-        .form-group label {
-            font-weight: 600;
-            margin-bottom: 0.5rem;
-            color: #374151;
-        }
-        
-        .form-group input,
-        .form-group select {
-            padding: 0.75rem;
-            border: 1px solid #d1d5db;
-            border-radius: 6px;
-            font-size: 1rem;
-            transition: border-color 0.2s;
-        }
-        
-        .form-group input:focus,
-        .form-group select:focus {
-            outline: none;
-            border-color: #3b82f6;
-            box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.1);
-        }
-        
-        .btn {
-            background: #3b82f6;
-            color: white;
-            border: none;
-            padding: 0.75rem 1.5rem;
-            border-radius: 6px;
-            font-size: 1rem;
-            font-weight: 600;
-            cursor: pointer;
-            transition: background-color 0.2s;
-        }
-        
-        .btn:hover {
-            background: #2563eb;
-        }
-        
-        .btn:disabled {
-            background: #9ca3af;
-            cursor: not-allowed;
-        }
-        
-        .btn-secondary {
-            background: #6b7280;
-        }
-        
-        .btn-secondary:hover {
-            background: #4b5563;
-        }
-        
-        .profile-section {
-            background: #f8fafc;
-            border: 1px solid #e2e8f0;
-            border-radius: 8px;
-            padding: 1.5rem;
-            margin-top: 1.5rem;
-        }
-        
-        .profile-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 1rem;
-            margin-bottom: 1rem;
-        }
-        
-        .profile-input {
-            width: 100%;
-            padding: 0.5rem;
-            border: 1px solid #d1d5db;
-            border-radius: 4px;
-            font-size: 0.9rem;
-        }
-        
-        .profile-actions {
-            display: flex;
-            gap: 0.5rem;
-            flex-wrap: wrap;
-        }
-        
-        .profile-message {
-            margin-top: 1rem;
-            padding: 0.75rem;
-            border-radius: 4px;
-            display: none;
-            font-size: 0.9rem;
-        }
-        
-        .results-section {
-            background: white;
-            border-radius: 12px;
-            padding: 2rem;
-            margin-bottom: 2rem;
-            box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1);
-        }
-        
-        .results-section h2 {
-            color: #0f172a;
-            margin-bottom: 1.5rem;
-            font-size: 1.5rem;
-            border-bottom: 2px solid #e2e8f0;
-            padding-bottom: 0.5rem;
-        }
-        
-        .forecast-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 1rem;
-            font-size: 0.9rem;
-        }
-        
-        .forecast-table th,
-        .forecast-table td {
-            padding: 0.75rem;
-            text-align: right;
-            border-bottom: 1px solid #e5e7eb;
-        }
-        
-        .forecast-table th {
-            background: #f9fafb;
-            font-weight: 600;
-            color: #374151;
-        }
-        
-        .forecast-table th:first-child,
-        .forecast-table td:first-child {
-            text-align: left;
-        }
-        
-        .summary-cards {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 1rem;
-            margin-top: 1.5rem;
-        }
-        
-        .summary-card {
-            background: #f8fafc;
-            border: 1px solid #e2e8f0;
-            border-radius: 8px;
-            padding: 1.5rem;
-            text-align: center;
-        }
-        
-        .summary-card h3 {
-            color: #64748b;
-            font-size: 0.875rem;
-            margin-bottom: 0.5rem;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-        }
-        
-        .summary-card .value {
-            font-size: 1.5rem;
-            font-weight: 700;
-            color: #0f172a;
-        }
-        
-        .summary-card .positive {
-            color: #059669;
-        }
-        
-        .summary-card .negative {
-            color: #dc2626;
-        }
-        
-        .spouse-section {
-            border: 1px solid #e2e8f0;
-            border-radius: 8px;
-            padding: 1rem;
-            margin-top: 1rem;
-            background: #f8fafc;
-        }
-        
-        .spouse-section h4 {
-            margin-bottom: 1rem;
-            color: #374151;
-        }
-        
-        .error {
-            color: #dc2626;
-            font-size: 0.875rem;
-            margin-top: 0.25rem;
-        }
-        
-        .success {
-            color: #059669;
-            font-size: 0.875rem;
-            margin-top: 0.25rem;
-        }
-        
-        .chart-container {
-            margin-top: 2rem;
-            height: auto;
-            min-height: 200px;
-            background: #f8fafc;
-            border-radius: 8px;
-            padding: 1rem;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            border: 1px solid #e2e8f0;
-        }
-        
-        /* Results Layout Improvements */
-        #results {
-            max-width: 100%;
-            overflow-x: hidden;
-        }
-        
-        #results .chart-container {
-            break-inside: avoid;
-            page-break-inside: avoid;
-        }
-        
-        /* Responsive Grid Adjustments */
-        @media (max-width: 768px) {
-            #results [style*="grid-template-columns"] {
-                grid-template-columns: 1fr !important;
-            }
-            
-            #results .chart-container {
-                margin-bottom: 1rem;
-            }
-        }
-        
-        .chart-placeholder {
-            text-align: center;
-            color: #64748b;
-        }
-        
-        .chart-placeholder h3 {
-            margin-bottom: 1rem;
-            color: #374151;
-        }
-        
-        @media (max-width: 768px) {
-            .container {
-                padding: 1rem;
-            }
-            
-            .form-grid {
-                grid-template-columns: 1fr;
-            }
-            
-            .forecast-table {
-                font-size: 0.8rem;
-            }
-            
-            .forecast-table th,
-            .forecast-table td {
-                padding: 0.5rem 0.25rem;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>Retirement Planning Calculator</h1>
-            <p>Plan your retirement with comprehensive financial analysis and forecasting</p>
-        </div>
-
-        <!-- Test Cases Section -->
-        <div class="form-section">
-            <h2>Test Cases - Social Security Benefit Examples</h2>
-            
-            <!-- Spouse Retirement Age Explanation -->
-            <div style="background-color: #fef3c7; border: 1px solid #f59e0b; border-radius: 8px; padding: 1rem; margin-bottom: 1.5rem;">
-                <h4 style="color: #92400e; margin-top: 0;">💡 Important: Social Security Claim Ages</h4>
-                <p style="margin-bottom: 0.5rem; color: #92400e;"><strong>Both spouses specify their Social Security claim age in Simulation Settings!</strong></p>
-                <p style="margin-bottom: 0; color: #92400e;">Even if your spouse doesn't work, they can still claim Social Security benefits based on your work record. The claim age determines when benefits start and affects the benefit amount.</p>
-            </div>
-            
-            <!-- Maximum Benefit Information -->
-            <div style="background: #fef3c7; border: 1px solid #f59e0b; border-radius: 8px; padding: 1.5rem; margin-bottom: 1.5rem;">
-                <h3 style="color: #92400e; margin-bottom: 1rem;">⚠️ Important: Social Security Maximum Benefit Cap</h3>
-                <p style="color: #92400e; margin-bottom: 0.5rem;"><strong>2024 Maximum Benefit at Full Retirement Age (67): $45,864/year</strong></p>
-                <p style="color: #92400e; font-size: 0.9rem;">
-                    Even if your income suggests a higher benefit, Social Security caps the maximum monthly benefit at $3,822 ($45,864/year) at FRA.
-                    This cap applies to all calculations in this application.
-                </p>
-            </div>
-            
-            <div style="background: #f0f9ff; border: 1px solid #0ea5e9; border-radius: 8px; padding: 1.5rem; margin-bottom: 1rem;">
-                <h3 style="color: #0c4a6e; margin-bottom: 1rem;">Case 1: Couple, Only One Spouse Working</h3>
-                <p><strong>Worker:</strong> Birth year 1965, Income $100,000, Years worked 35, Retirement age 62</p>
-                <p><strong>Spouse:</strong> Birth year 1967, Not working</p>
-                <p><strong>Expected Results:</strong></p>
-                <ul>
-                    <li>Worker FRA benefit: $40,000/year (at age 67) - <em>Below max cap</em></li>
-                    <li>Worker benefit at 62: $28,000/year (70% of FRA)</li>
-                    <li>Spouse benefit at 62: $14,000/year (35% of worker's FRA)</li>
-                    <li><strong>Total: $42,000/year starting at age 62</strong></li>
-                </ul>
-            </div>
-            
-            <div style="background: #f0f9ff; border: 1px solid #0ea5e9; border-radius: 8px; padding: 1.5rem; margin-bottom: 1rem;">
-                <h3 style="color: #0c4a6e; margin-bottom: 1rem;">Case 2: Couple, Both Working</h3>
-                <p><strong>Spouse A:</strong> Birth year 1965, Income $100,000, Years worked 35, Retirement age 67</p>
-                <p><strong>Spouse B:</strong> Birth year 1967, Income $60,000, Years worked 35, Retirement age 67</p>
-                <p><strong>Expected Results:</strong></p>
-                <ul>
-                    <li>Spouse A benefit: $40,000/year (at FRA 67) - <em>Below max cap</em></li>
-                    <li>Spouse B benefit: $24,000/year (at FRA 67)</li>
-                    <li><strong>Total: $64,000/year starting at age 67</strong></li>
-                </ul>
-            </div>
-            
-            <div style="background: #f0f9ff; border: 1px solid #0ea5e9; border-radius: 8px; padding: 1.5rem;">
-                <h3 style="color: #0c4a6e; margin-bottom: 1rem;">Case 3: High-Income Worker (Above Max Cap)</h3>
-                <p><strong>Worker:</strong> Birth year 1965, Income $200,000, Years worked 35, Retirement age 67</p>
-                <p><strong>Expected Results:</strong></p>
-                <ul>
-                    <li>Calculated FRA benefit: $80,000/year (40% of $200,000)</li>
-                    <li><strong>Actual FRA benefit: $45,864/year (capped at maximum)</strong></li>
-                    <li>Early claim at 62: $32,105/year (70% of capped amount)</li>
-                </ul>
-            </div>
-        </div>
-
-        <form method="POST" action="/calculate">
-            <!-- Personal Information -->
-            <div class="form-section">
-                <h2>Personal Information</h2>
-                <div class="form-grid">
-                    <div class="form-group">
-                        <label for="maritalStatus">Marital Status</label>
-                        <select id="maritalStatus" name="maritalStatus" onchange="toggleSpouseFields()">
-                            <option value="single">Single</option>
-                            <option value="married">Married</option>
-                            <option value="couple">Couple (Unmarried)</option>
-                        </select>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="birthYear">Year of Birth</label>
-                        <input type="number" id="birthYear" name="birthYear" min="1940" max="2010" placeholder="e.g., 1980" required>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="retirementAge">Desired Retirement Age</label>
-                        <input type="number" id="retirementAge" name="retirementAge" min="55" max="75" placeholder="e.g., 65" required>
-                    </div>
-
-                    <div class="form-group" id="spouseFields" style="display: none;">
-                        <label for="spouseBirthYear">Spouse Year of Birth</label>
-                        <input type="number" id="spouseBirthYear" name="spouseBirthYear" min="1940" max="2010" placeholder="e.g., 1982">
-                    </div>
-
-
-
-                    <div class="form-group" id="bothWorkingFields" style="display: none;">
-                        <label for="bothWorking">Both Spouses Working?</label>
-                        <select id="bothWorking" name="bothWorking" onchange="toggleSpouseFinancialFields()">
-                            <option value="both">Both Working</option>
-                            <option value="one">Only One Working</option>
-                        </select>
-                    </div>
-                </div>
-            </div>
-
-            <!-- Financial Information -->
-            <div class="form-section">
-                <h2>Financial Information</h2>
-                <div class="form-grid">
-                    <div class="form-group">
-                        <label for="liquidAssets">Current Liquid Assets (Stock Market)</label>
-                        <input type="number" id="liquidAssets" name="liquidAssets" min="0" step="1000" placeholder="e.g., 500000" required>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="realEstateCashflow">Real Estate Annual Net Cashflow</label>
-                        <input type="number" id="realEstateCashflow" name="realEstateCashflow" step="1000" placeholder="e.g., 24000">
-                    </div>
-
-                    <div class="form-group">
-                        <label for="annualIncome">Current Annual Income</label>
-                        <input type="number" id="annualIncome" name="annualIncome" min="0" step="1000" placeholder="e.g., 80000" required>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="yearsWorked">Years Worked</label>
-                        <input type="number" id="yearsWorked" name="yearsWorked" min="0" max="50" placeholder="e.g., 15" required>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="annualContribution">Annual Contributions Until Retirement</label>
-                        <input type="number" id="annualContribution" name="annualContribution" min="0" step="1000" placeholder="e.g., 20000">
-                    </div>
-
-                    <div class="form-group" id="spouseIncomeFields" style="display: none;">
-                        <label for="spouseAnnualIncome">Spouse Annual Income</label>
-                        <input type="number" id="spouseAnnualIncome" name="spouseAnnualIncome" min="0" step="1000" placeholder="e.g., 75000">
-                    </div>
-
-                    <div class="form-group" id="spouseYearsFields" style="display: none;">
-                        <label for="spouseYearsWorked">Spouse Years Worked</label>
-                        <input type="number" id="spouseYearsWorked" name="spouseYearsWorked" min="0" max="50" placeholder="e.g., 12">
-                    </div>
-
-                    <div class="form-group" id="spouseContributionFields" style="display: none;">
-                        <label for="spouseAnnualContribution">Spouse Annual Contributions</label>
-                        <input type="number" id="spouseAnnualContribution" name="spouseAnnualContribution" min="0" step="1000" placeholder="e.g., 18000">
-                    </div>
-                </div>
-            </div>
-
-            <!-- Simulation Settings -->
-            <div class="form-section">
-                <h2>Simulation Settings</h2>
-                <div class="form-grid">
-                    <div class="form-group">
-                        <label for="marketProfile">Market Return Assumptions</label>
-                        <select id="marketProfile" name="marketProfile">
-                            <option value="Conservative">Conservative (5% avg, 12% volatility)</option>
-                            <option value="Moderate" selected>Moderate (7% avg, 15% volatility)</option>
-                            <option value="Aggressive">Aggressive (9% avg, 18% volatility)</option>
-                        </select>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="calculationMethod">Calculation Method</label>
-                        <select id="calculationMethod" name="calculationMethod">
-                            <option value="deterministic" selected>Deterministic Growth</option>
-                            <option value="monteCarlo">Monte Carlo Simulation</option>
-                        </select>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="socialSecurityClaimAge">Social Security Claim Age</label>
-                        <select id="socialSecurityClaimAge" name="socialSecurityClaimAge">
-                            <option value="62">Early (62) - 70% of FRA benefit</option>
-                            <option value="67" selected>Full Retirement Age (67) - 100% of FRA benefit</option>
-                            <option value="70">Delayed (70) - 132% of FRA benefit</option>
-                        </select>
-                    </div>
-
-                    <div class="form-group" id="spouseSSFields" style="display: none;">
-                        <label for="spouseSocialSecurityClaimAge">Spouse Social Security Claim Age</label>
-                        <select id="spouseSocialSecurityClaimAge" name="spouseSocialSecurityClaimAge">
-                            <option value="62">Early (62) - 70% of FRA benefit</option>
-                            <option value="67" selected>Full Retirement Age (67) - 100% of FRA benefit</option>
-                            <option value="70">Delayed (70) - 132% of FRA benefit</option>
-                        </select>
-                    </div>
-                </div>
-            </div>
-
-            <!-- Budget Breakdown -->
-            <div class="form-section">
-                <h2>Retirement Budget Breakdown</h2>
-                <div class="form-grid">
-                    <div class="form-group">
-                        <label for="housing">Housing / Mortgage</label>
-                        <input type="number" id="housing" name="housing" min="0" step="1000" placeholder="e.g., 24000" required>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="state">State</label>
-                        <select id="state" name="state" required>
-                            <option value="">Select State</option>
-                            <option value="AL">Alabama</option>
-                            <option value="AK">Alaska</option>
-                            <option value="AZ">Arizona</option>
-                            <option value="AR">Arkansas</option>
-                            <option value="CA">California</option>
-                            <option value="CO">Colorado</option>
-                            <option value="CT">Connecticut</option>
-                            <option value="DE">Delaware</option>
-                            <option value="FL">Florida</option>
-                            <option value="GA">Georgia</option>
-                            <option value="HI">Hawaii</option>
-                            <option value="ID">Idaho</option>
-                            <option value="IL">Illinois</option>
-                            <option value="IN">Indiana</option>
-                            <option value="IA">Iowa</option>
-                            <option value="KS">Kansas</option>
-                            <option value="KY">Kentucky</option>
-                            <option value="LA">Louisiana</option>
-                            <option value="ME">Maine</option>
-                            <option value="MD">Maryland</option>
-                            <option value="MA">Massachusetts</option>
-                            <option value="MI">Michigan</option>
-                            <option value="MN">Minnesota</option>
-                            <option value="MS">Mississippi</option>
-                            <option value="MO">Missouri</option>
-                            <option value="MT">Montana</option>
-                            <option value="NE">Nebraska</option>
-                            <option value="NV">Nevada</option>
-                            <option value="NH">New Hampshire</option>
-                            <option value="NJ">New Jersey</option>
-                            <option value="NM">New Mexico</option>
-                            <option value="NY">New York</option>
-                            <option value="NC">North Carolina</option>
-                            <option value="ND">North Dakota</option>
-                            <option value="OH">Ohio</option>
-                            <option value="OK">Oklahoma</option>
-                            <option value="OR">Oregon</option>
-                            <option value="PA">Pennsylvania</option>
-                            <option value="RI">Rhode Island</option>
-                            <option value="SC">South Carolina</option>
-                            <option value="SD">South Dakota</option>
-                            <option value="TN">Tennessee</option>
-                            <option value="TX">Texas</option>
-                            <option value="UT">Utah</option>
-                            <option value="VT">Vermont</option>
-                            <option value="VA">Virginia</option>
-                            <option value="WA">Washington</option>
-                            <option value="WV">West Virginia</option>
-                            <option value="WI">Wisconsin</option>
-                            <option value="WY">Wyoming</option>
-                        </select>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="zipCode">ZIP Code</label>
-                        <input type="text" id="zipCode" name="zipCode" pattern="[0-9]{5}" placeholder="e.g., 12345" required>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="tobaccoUse">Tobacco Use</label>
-                        <select id="tobaccoUse" name="tobaccoUse">
-                            <option value="false">No</option>
-                            <option value="true">Yes</option>
-                        </select>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="healthcare">Healthcare Premiums & Expenses (Both Spouses)</label>
-                        <input type="number" id="healthcare" name="healthcare" min="0" step="1000" placeholder="Auto-estimated for both spouses" readonly>
-                        <small style="color: #6b7280; font-size: 0.875rem;">
-                            Premium auto-estimated for both spouses at retirement age using CMS Marketplace API data based on age, income, state, ZIP code, and tobacco use
-                        </small>
-                    </div>
-
-                    <div class="form-group">
-                        <label for="foodLiving">Food & Living Expenses</label>
-                        <input type="number" id="foodLiving" name="foodLiving" min="0" step="1000" placeholder="e.g., 18000" required>
-                    </div>
+# Year-by-year series /api/v1/forecast can stream
+FORECAST_SERIES = ('forecast', 'extendedAssetChart')
 
-                    <div class="form-group">
-                        <label for="travelLeisure">Travel / Leisure</label>
-                        <input type="number" id="travelLeisure" name="travelLeisure" min="0" step="1000" placeholder="e.g., 15000" required>
-                    </div>
+# Plan inputs /api/v1/solve can search for
+SOLVE_TARGETS = ('annualBudget', 'retirementAge')
 
-                    <div class="form-group">
-                        <label for="otherDiscretionary">Other Discretionary</label>
-                        <input type="number" id="otherDiscretionary" name="otherDiscretionary" min="0" step="1000" placeholder="e.g., 10000" required>
-                    </div>
-                </div>
+# Calculation methods that simulate paths, and the return model each draws from
+SIMULATION_METHODS = {
+    'monteCarlo': 'normal',
+    'historical': 'historical'
+}
 
-                <div style="margin-top: 1rem; padding: 1rem; background: #f8fafc; border-radius: 6px;">
-                    <strong>Total Annual Budget: </strong>
-                    <span id="totalBudget" style="font-size: 1.2rem; font-weight: bold; color: #0f172a;">$0</span>
-                </div>
-            </div>
+# Responses smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
 
-            <div class="form-section">
-                <div style="display: flex; gap: 1rem; justify-content: center; flex-wrap: wrap;">
-                    <button type="submit" class="btn">Calculate Retirement Plan</button>
-                    <button type="button" class="btn btn-secondary" onclick="resetForm()">Reset Form</button>
-                    <button type="button" class="btn btn-secondary" onclick="saveProfile()">Save Profile</button>
-                    <button type="button" class="btn btn-secondary" onclick="loadProfile()">Load Profile</button>
-                </div>
-                
-                <!-- Profile Management Section -->
-                <div class="profile-section">
-                    <h4 style="margin-top: 0; color: #374151;">Profile Management</h4>
-                    <div class="profile-grid">
-                        <div>
-                            <label for="profileName" style="display: block; margin-bottom: 0.5rem; font-weight: 600; color: #374151;">Profile Name:</label>
-                            <input type="text" id="profileName" class="profile-input" placeholder="e.g., Default, Conservative, Aggressive">
-                        </div>
-                        <div>
-                            <label for="profileAction" style="display: block; margin-bottom: 0.5rem; font-weight: 600; color: #374151;">Action:</label>
-                            <select id="profileAction" class="profile-input">
-                                <option value="save">Save Current Profile</option>
-                                <option value="load">Load Selected Profile</option>
-                                <option value="delete">Delete Selected Profile</option>
-                            </select>
-                        </div>
-                        <div>
-                            <label for="profileSelect" style="display: block; margin-bottom: 0.5rem; font-weight: 600; color: #374151;">Select Profile:</label>
-                            <select id="profileSelect" class="profile-input">
-                                <option value="">No profiles saved</option>
-                            </select>
-                        </div>
-                    </div>
-                    <div class="profile-actions">
-                        <button type="button" class="btn btn-secondary" onclick="executeProfileAction()" style="font-size: 0.9rem;">Execute Action</button>
-                        <button type="button" class="btn btn-secondary" onclick="exportProfiles()" style="font-size: 0.9rem;">Export All Profiles</button>
-                        <button type="button" class="btn btn-secondary" onclick="importProfiles()" style="font-size: 0.9rem;">Import Profiles</button>
-                    </div>
-                    <div id="profileMessage" class="profile-message"></div>
-                </div>
-            </div>
-        </form>
+def _json_default(value):
+    """Serialize lazily built row sequences and numpy values."""
+    if isinstance(value, LazyRows):
+        return list(value)
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
-        {% if results %}
-        <div class="results-section">
-            <h2>Retirement Forecast Results</h2>
-            
-            <!-- Summary Cards -->
-            <div class="summary-cards">
-                <div class="summary-card">
-                    <h3>Portfolio at Retirement</h3>
-                    <div class="value positive">${{ "{:,.0f}".format(results.summary.portfolioAtRetirement) }}</div>
-                </div>
-                <div class="summary-card">
-                    <h3>Safe Annual Withdrawal</h3>
-                    <div class="value positive">${{ "{:,.0f}".format(results.summary.safeAnnualWithdrawal) }}</div>
-                </div>
-                <div class="summary-card">
-                    <h3>Total Annual Income</h3>
-                    <div class="value positive">${{ "{:,.0f}".format(results.summary.totalAnnualIncome) }}</div>
-                </div>
-                <div class="summary-card">
-                    <h3>Annual Budget</h3>
-                    <div class="value">${{ "{:,.0f}".format(results.summary.annualBudget) }}</div>
-                </div>
-                <div class="summary-card">
-                    <h3>Surplus/Deficit</h3>
-                    <div class="value {{ 'positive' if results.summary.surplusDeficit >= 0 else 'negative' }}">
-                        ${{ "{:,.0f}".format(results.summary.surplusDeficit) }}
-                    </div>
-                </div>
-            </div>
+def compress_body(body):
+    """Compress a response body with the best encoding the client accepts; returns (body, encoding)."""
+    accepted = request.headers.get('Accept-Encoding', '').lower()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if brotli is not None and 'br' in accepted:
+        return brotli.compress(body, quality=4), 'br'
+    if 'gzip' in accepted:
+        return gzip.compress(body, compresslevel=5), 'gzip'
+    return body, None
 
-            <!-- Results Grid Layout - First Row -->
-            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(450px, 1fr)); gap: 2.5rem; margin-bottom: 3rem;">
-                
-                <!-- Portfolio Balance Chart -->
-                <div style="background: #ffffff; padding: 2rem; border-radius: 12px; border: 1px solid #e2e8f0; box-shadow: 0 4px 6px rgba(0,0,0,0.05); height: fit-content;">
-                    <h3 style="margin-top: 0; color: #1e40af; font-size: 1.25rem;">Portfolio Balance Over Time</h3>
-                    <p style="color: #475569; margin-bottom: 1.5rem;">Portfolio balance projection from current age ({{ results.forecast[0].age }}) through retirement to age {{ results.forecast[-1].age }}</p>
-                    <div style="display: grid; grid-template-columns: 1fr; gap: 1rem;">
-                        <div style="padding: 1rem; background: #f8fafc; border-radius: 8px; border-left: 4px solid #3b82f6;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Working Years:</strong><br>${{ "{:,.0f}".format(results.forecast[0].startingBalance) }} → ${{ "{:,.0f}".format(results.forecast[results.yearsToRetirement].endingBalance) }}</p>
-                        </div>
-                        <div style="padding: 1rem; background: #f8fafc; border-radius: 8px; border-left: 4px solid #10b981;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Retirement Years:</strong><br>${{ "{:,.0f}".format(results.forecast[results.yearsToRetirement + 1].startingBalance) }} → ${{ "{:,.0f}".format(results.forecast[-1].endingBalance) }}</p>
-                        </div>
-                        <div style="padding: 1rem; background: #fef3c7; border-radius: 8px; border-left: 4px solid #f59e0b;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Peak Portfolio Value:</strong><br>${{ "{:,.0f}".format(results.forecast|max(attribute='endingBalance')|attr('endingBalance') or 0) }}</p>
-                        </div>
-                        <div style="padding: 1rem; background: #f0f9ff; border-radius: 8px; border-left: 4px solid #0ea5e9;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Total Growth Period:</strong><br>{{ results.forecast[-1].year - results.forecast[0].year }} years</p>
-                        </div>
-                    </div>
-                </div>
+def json_response(payload, status=200):
+    """Compact JSON response, compressed when the client allows it."""
+    body = json.dumps(payload, separators=(',', ':'), default=_json_default).encode('utf-8')
+    body, encoding = compress_body(body)
+    response = Response(body, status=status, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
 
-                <!-- Spending Breakdown Chart -->
-                <div style="background: #ffffff; padding: 2rem; border-radius: 12px; border: 1px solid #e2e8f0; box-shadow: 0 4px 6px rgba(0,0,0,0.05); height: fit-content;">
-                    <h3 style="margin-top: 0; color: #1e40af; font-size: 1.25rem;">Spending Breakdown by Category</h3>
-                    <div style="display: grid; grid-template-columns: 1fr; gap: 1rem;">
-                        <div style="padding: 1rem; background: #fef2f2; border-radius: 8px; border-left: 4px solid #ef4444;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Housing:</strong> ${{ "{:,.0f}".format(results.budget.housing) }} <span style="color: #6b7280; font-weight: normal;">({{ "%.1f".format(results.budget.housing / results.summary.annualBudget * 100) if results.summary.annualBudget > 0 else 0 }}%)</span></p>
-                        </div>
-                        <div style="padding: 1rem; background: #f0f9ff; border-radius: 8px; border-left: 4px solid #0ea5e9;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Healthcare:</strong> ${{ "{:,.0f}".format(results.budget.healthcare) }} <span style="color: #6b7280; font-weight: normal;">({{ "%.1f".format(results.budget.healthcare / results.summary.annualBudget * 100) if results.summary.annualBudget > 0 else 0 }}%)</span></p>
-                        </div>
-                        <div style="padding: 1rem; background: #f0fdf4; border-radius: 8px; border-left: 4px solid #22c55e;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Food & Living:</strong> ${{ "{:,.0f}".format(results.budget.foodLiving) }} <span style="color: #6b7280; font-weight: normal;">({{ "%.1f".format(results.budget.foodLiving / results.summary.annualBudget * 100) if results.summary.annualBudget > 0 else 0 }}%)</span></p>
-                        </div>
-                        <div style="padding: 1rem; background: #fefce8; border-radius: 8px; border-left: 4px solid #eab308;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Travel & Leisure:</strong> ${{ "{:,.0f}".format(results.budget.travelLeisure) }} <span style="color: #6b7280; font-weight: normal;">({{ "%.1f".format(results.budget.travelLeisure / results.summary.annualBudget * 100) if results.summary.annualBudget > 0 else 0 }}%)</span></p>
-                        </div>
-                        <div style="padding: 1rem; background: #f3f4f6; border-radius: 8px; border-left: 4px solid #6b7280;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Other:</strong> ${{ "{:,.0f}".format(results.budget.otherDiscretionary) }} <span style="color: #6b7280; font-weight: normal;">({{ "%.1f".format(results.budget.otherDiscretionary / results.summary.annualBudget * 100) if results.summary.annualBudget > 0 else 0 }}%)</span></p>
-                        </div>
-                    </div>
-                </div>
-            </div>
+def html_response(body, status=200):
+    """HTML response, compressed when the client allows it."""
+    body, encoding = compress_body(body.encode('utf-8'))
+    response = Response(body, status=status, mimetype='text/html')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
 
-            <!-- Extended Asset Growth Chart to Age 100 -->
-            <div style="background: #ffffff; padding: 2rem; border-radius: 12px; border: 1px solid #e2e8f0; box-shadow: 0 4px 6px rgba(0,0,0,0.05); margin-bottom: 3rem;">
-                <h3 style="margin-top: 0; color: #1e40af; font-size: 1.25rem;">Total Asset Growth: Current Age to 100</h3>
-                {% if results.extendedAssetChart and results.extendedAssetChart|length > 0 %}
-                    <p style="color: #475569; margin-bottom: 1.5rem;">Long-term projection showing total asset value growth from age {{ results.extendedAssetChart[0].age }} to age 100</p>
-                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 1.5rem; margin-bottom: 2rem;">
-                        <div style="padding: 1.5rem; background: #f0fdf4; border-radius: 8px; border-left: 4px solid #22c55e;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Current Assets:</strong><br><span style="font-size: 1.1rem; color: #166534;">${{ "{:,.0f}".format(results.extendedAssetChart[0].totalAssets) }}</span></p>
-                        </div>
-                        <div style="padding: 1.5rem; background: #fef3c7; border-radius: 8px; border-left: 4px solid #f59e0b;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Peak Assets:</strong><br><span style="font-size: 1.1rem; color: #92400e;">
-                                {% set peak_assets = results.extendedAssetChart|max(attribute='totalAssets') %}
-                                {% if peak_assets %}
-                                    ${{ "{:,.0f}".format(peak_assets.totalAssets) }}
-                                {% else %}
-                                    $0
-                                {% endif %}
-                            </span></p>
-                        </div>
-                        <div style="padding: 1.5rem; background: #f0f9ff; border-radius: 8px; border-left: 4px solid #0ea5e9;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Assets at Age 100:</strong><br><span style="font-size: 1.1rem; color: #0369a1;">${{ "{:,.0f}".format(results.extendedAssetChart[-1].totalAssets) }}</span></p>
-                        </div>
-                        <div style="padding: 1.5rem; background: #f3f4f6; border-radius: 8px; border-left: 4px solid #6b7280;">
-                            <p style="margin: 0; font-weight: 600;"><strong>Total Growth Period:</strong><br><span style="font-size: 1.1rem; color: #374151;">{{ results.extendedAssetChart[-1].year - results.extendedAssetChart[0].year }} years</span></p>
-                        </div>
-                    </div>
-                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 1rem; margin-bottom: 1.5rem;">
-                        <p style="color: #6b7280; font-size: 0.9rem; margin: 0; padding: 0.75rem; background: #f9fafb; border-radius: 6px;">📊 Extended chart data: {{ results.extendedAssetChart|length }} data points</p>
-                        <p style="color: #6b7280; font-size: 0.9rem; margin: 0; padding: 0.75rem; background: #f9fafb; border-radius: 6px;">📈 Sample values: Age 50: ${{ "{:,.0f}".format(results.extendedAssetChart[1].totalAssets) if results.extendedAssetChart|length > 1 else 'N/A' }}, Age 60: ${{ "{:,.0f}".format(results.extendedAssetChart[11].totalAssets) if results.extendedAssetChart|length > 11 else 'N/A' }}</p>
-                    </div>
-                
-                    <!-- Key Milestones -->
-                    <div style="margin-top: 1.5rem; padding: 1.5rem; background: #f0f9ff; border-radius: 8px; border: 1px solid #0ea5e9;">
-                        <h4 style="margin-top: 0; color: #0369a1; font-size: 1.1rem;">🎯 Key Milestones</h4>
-                        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 1rem; font-size: 0.95rem;">
-                            <div style="padding: 1rem; background: #ffffff; border-radius: 6px; border: 1px solid #dbeafe;">
-                                <strong style="color: #1e40af;">Retirement Age ({{ results.extendedAssetChart[results.yearsToRetirement].age }}):</strong><br>
-                                <span style="font-size: 1.1rem; color: #1e40af;">${{ "{:,.0f}".format(results.extendedAssetChart[results.yearsToRetirement].totalAssets) }}</span>
-                            </div>
-                            <div style="padding: 1rem; background: #ffffff; border-radius: 6px; border: 1px solid #dbeafe;">
-                                <strong style="color: #1e40af;">Age 70:</strong><br>
-                                <span style="font-size: 1.1rem; color: #1e40af;">
-                                    {% if results.yearsToRetirement + 5 < results.extendedAssetChart|length %}
-                                        ${{ "{:,.0f}".format(results.extendedAssetChart[results.yearsToRetirement + 5].totalAssets) }}
-                                    {% else %}
-                                        N/A
-                                    {% endif %}
-                                </span>
-                            </div>
-                            <div style="padding: 1rem; background: #ffffff; border-radius: 6px; border: 1px solid #dbeafe;">
-                                <strong style="color: #1e40af;">Age 80:</strong><br>
-                                <span style="font-size: 1.1rem; color: #1e40af;">
-                                    {% if results.yearsToRetirement + 15 < results.extendedAssetChart|length %}
-                                        ${{ "{:,.0f}".format(results.extendedAssetChart[results.yearsToRetirement + 15].totalAssets) }}
-                                    {% else %}
-                                        N/A
-                                    {% endif %}
-                                </span>
-                            </div>
-                            <div style="padding: 1rem; background: #ffffff; border-radius: 6px; border: 1px solid #dbeafe;">
-                                <strong style="color: #1e40af;">Age 90:</strong><br>
-                                <span style="font-size: 1.1rem; color: #1e40af;">
-                                    {% if results.yearsToRetirement + 25 < results.extendedAssetChart|length %}
-                                        ${{ "{:,.0f}".format(results.extendedAssetChart[results.yearsToRetirement + 25].totalAssets) }}
-                                    {% else %}
-                                        N/A
-                                    {% endif %}
-                                </span>
-                            </div>
-                        </div>
-                {% else %}
-                    <p style="color: #6b7280;">Extended asset chart data not available</p>
-                {% endif %}
-            </div>
+def _fingerprint(filename):
+    with open(os.path.join(app.static_folder, filename), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
 
-            <!-- Annual Forecast Table -->
-            <h3>Comprehensive Financial Forecast</h3>
-            <p style="color: #6b7280; margin-bottom: 1rem;">Forecast data: {{ results.forecast|length }} years</p>
-            <div style="overflow-x: auto;">
-                <table class="forecast-table">
-                    <thead>
-                        <tr>
-                            <th>Year</th>
-                            <th>Age</th>
-                            <th>Period</th>
-                            <th>Starting Balance</th>
-                            <th>Investment Gains</th>
-                            <th>Contributions</th>
-                            <th>Real Estate CF</th>
-                            <th>Social Security</th>
-                            <th>Spending</th>
-                            <th>Ending Balance</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {% for year in results.forecast %}
-                        <tr style="background-color: {{ '#f8fafc' if year.period == 'Working' else 'white' }};">
-                            <td>{{ year.year }}</td>
-                            <td>{{ year.age }}</td>
-                            <td>
-                                <span style="padding: 0.25rem 0.5rem; border-radius: 4px; font-size: 0.8rem; font-weight: 600; 
-                                           background-color: {{ '#dbeafe' if year.period == 'Working' else '#dcfce7' }};
-                                           color: {{ '#1e40af' if year.period == 'Working' else '#166534' }};">
-                                    {{ year.period }}
-                                </span>
-                            </td>
-                            <td>${{ "{:,.0f}".format(year.startingBalance) }}</td>
-                            <td>${{ "{:,.0f}".format(year.investmentGains) }}</td>
-                            <td>${{ "{:,.0f}".format(year.contribution) }}</td>
-                            <td>${{ "{:,.0f}".format(year.realEstateCashflow) }}</td>
-                            <td>${{ "{:,.0f}".format(year.socialSecurity) }}</td>
-                            <td>${{ "{:,.0f}".format(year.spending) }}</td>
-                            <td>${{ "{:,.0f}".format(year.endingBalance) }}</td>
-                        </tr>
-                        {% endfor %}
-                    </tbody>
-                </table>
-            </div>
-            
-            <div style="margin-top: 1rem; padding: 1rem; background: #f0f9ff; border-radius: 6px; border: 1px solid #0ea5e9;">
-                <p style="margin: 0; color: #0369a1; font-size: 0.9rem;">
-                    <strong>Legend:</strong> 
-                    <span style="background: #dbeafe; color: #1e40af; padding: 0.2rem 0.4rem; border-radius: 3px; font-size: 0.8rem;">Working</span> = 
-                    Accumulation phase with contributions, 
-                    <span style="background: #dcfce7; color: #166534; padding: 0.2rem 0.4rem; border-radius: 3px; font-size: 0.8rem;">Retirement</span> = 
-                    Distribution phase with Social Security and spending
-                </p>
-            </div>
-
-            <!-- Second Row: Social Security and Safe Spending -->
-            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(450px, 1fr)); gap: 3rem; margin-bottom: 3rem;">
-                
-                <!-- Social Security Validation -->
-                <div style="background: #fef3c7; padding: 2rem; border-radius: 12px; border: 1px solid #f59e0b; box-shadow: 0 4px 6px rgba(0,0,0,0.05); height: fit-content;">
-                    <h3 style="color: #92400e; margin-top: 0; margin-bottom: 1.5rem; font-size: 1.25rem;">Social Security Benefit Validation</h3>
-                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1.5rem; margin-bottom: 1.5rem;">
-                        <div style="padding: 1rem; background: #ffffff; border-radius: 8px; border: 1px solid #fbbf24;">
-                            <strong style="color: #92400e;">Primary Worker FRA Benefit (age 67):</strong><br>
-                            <span style="font-size: 1.1rem; color: #92400e; font-weight: 600;">${{ "{:,.0f}".format(results.socialSecurityDetails.primaryFRA) }}/year</span>
-                            {% if results.socialSecurityDetails.primaryFRA >= 45864 %}
-                            <br><small style="color: #dc2626;">⚠️ Capped at maximum</small>
-                            {% endif %}
-                        </div>
-                        <div style="padding: 1rem; background: #ffffff; border-radius: 8px; border: 1px solid #fbbf24;">
-                            <strong style="color: #92400e;">Primary Worker Claimed Benefit:</strong><br>
-                            <span style="font-size: 1.1rem; color: #92400e; font-weight: 600;">${{ "{:,.0f}".format(results.socialSecurityDetails.primaryClaimed) }}/year</span>
-                        </div>
-                        <div style="padding: 1rem; background: #ffffff; border-radius: 8px; border: 1px solid #fbbf24;">
-                            <strong style="color: #92400e;">Spousal FRA Benefit (age 67):</strong><br>
-                            <span style="font-size: 1.1rem; color: #92400e; font-weight: 600;">${{ "{:,.0f}".format(results.socialSecurityDetails.spousalFRA) }}/year</span>
-                            {% if results.socialSecurityDetails.spousalFRA >= 22932 %}
-                            <br><small style="color: #dc2626;">⚠️ Capped at maximum</small>
-                            {% endif %}
-                        </div>
-                        <div style="padding: 1rem; background: #ffffff; border-radius: 8px; border: 1px solid #fbbf24;">
-                            <strong style="color: #92400e;">Spousal Claimed Benefit:</strong><br>
-                            <span style="font-size: 1.1rem; color: #92400e; font-weight: 600;">${{ "{:,.0f}".format(results.socialSecurityDetails.spousalClaimed) }}/year</span>
-                        </div>
-                    </div>
-                    <div style="background: #ffffff; padding: 1.5rem; border-radius: 8px; border: 1px solid #fbbf24; margin-bottom: 1rem;">
-                        <strong style="color: #92400e;">Total Social Security Benefits:</strong><br>
-                        <span style="font-size: 1.3rem; font-weight: bold; color: #92400e;">
-                            FRA (age 67): ${{ "{:,.0f}".format(results.socialSecurityDetails.totalFRA) }}/year<br>
-                            Claimed: ${{ "{:,.0f}".format(results.socialSecurityDetails.totalClaimed) }}/year
-                        </span>
-                    </div>
-                    <div style="padding: 1rem; background: #fef3c7; border-radius: 8px; border: 1px solid #f59e0b;">
-                        <small style="color: #92400e;">
-                            <strong>Note:</strong> 2024 maximum benefit at FRA is $45,864/year. Spousal benefits are capped at 50% of the maximum ($22,932/year).
-                        </small>
-                    </div>
-                </div>
+# Content hashes of the static files the page links to
+ASSET_VERSIONS = {filename: _fingerprint(filename) for filename in ('css/app.css', 'js/app.js')}
 
-                <!-- Safe Sustainable Spending Estimate -->
-                <div style="background: #f0f9ff; padding: 2rem; border-radius: 12px; border: 1px solid #0ea5e9; box-shadow: 0 4px 6px rgba(0,0,0,0.05); height: fit-content;">
-                    <h3 style="color: #0c4a6e; margin-top: 0; margin-bottom: 1.5rem; font-size: 1.25rem;">Safe Sustainable Annual Spending Estimate</h3>
-                    <div style="font-size: 2rem; font-weight: bold; color: #0c4a6e; text-align: center; margin-bottom: 1rem;">
-                        ${{ "{:,.0f}".format(results.summary.safeSustainableSpending) }}
-                    </div>
-                    <p style="margin-top: 0.5rem; color: #0369a9; font-size: 1rem; text-align: center; margin-bottom: 1.5rem;">
-                        Maximum annual spending based on 4% withdrawal rule, real estate income, and Social Security benefits
-                    </p>
-                    <div style="padding: 1.5rem; background: #ffffff; border-radius: 8px; border: 1px solid #0ea5e9;">
-                        <strong style="color: #0c4a6e; font-size: 1.1rem;">Breakdown:</strong><br><br>
-                        <div style="display: grid; grid-template-columns: 1fr; gap: 0.75rem;">
-                            <div style="padding: 0.75rem; background: #f0f9ff; border-radius: 6px; border-left: 3px solid #0ea5e9;">
-                                <strong>4% Portfolio Withdrawal:</strong> ${{ "{:,.0f}".format(results.summary.safeAnnualWithdrawal) }}/year
-                            </div>
-                            <div style="padding: 0.75rem; background: #f0f9ff; border-radius: 6px; border-left: 3px solid #0ea5e9;">
-                                <strong>Real Estate Income:</strong> ${{ "{:,.0f}".format(results.realEstateCashflow) }}/year
-                            </div>
-                            <div style="padding: 0.75rem; background: #f0f9ff; border-radius: 6px; border-left: 3px solid #0ea5e9;">
-                                <strong>Social Security Benefits:</strong> ${{ "{:,.0f}".format(results.socialSecurityDetails.totalClaimed) }}/year
-                            </div>
-                        </div>
-                        <div style="margin-top: 1rem; padding: 1rem; background: #0ea5e9; border-radius: 6px; text-align: center;">
-                            <strong style="color: #ffffff; font-size: 1.1rem;">Total Sustainable Income: ${{ "{:,.0f}".format(results.summary.safeSustainableSpending) }}/year</strong>
-                        </div>
-                    </div>
-                </div>
-            </div>
+@app.template_global()
+def asset_url(filename):
+    """Static URL carrying the file's content hash, so a changed file gets a new URL."""
+    return url_for('static', filename=filename, v=ASSET_VERSIONS[filename])
 
-            <!-- Third Row: Extended Asset Growth Summary -->
-            {% if results.extendedAssetChart and results.extendedAssetChart|length > 0 %}
-            <div style="background: #fefce8; border: 1px solid #eab308; border-radius: 12px; padding: 2rem; margin-bottom: 3rem; box-shadow: 0 4px 6px rgba(0,0,0,0.05);">
-                <h3 style="color: #92400e; margin-top: 0; margin-bottom: 1.5rem; font-size: 1.25rem;">Long-Term Asset Growth Insights (Current Age to 100)</h3>
-                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 2rem;">
-                    <div style="background: #ffffff; padding: 1.5rem; border-radius: 8px; border: 1px solid #fbbf24;">
-                        <h4 style="color: #92400e; margin-top: 0; font-size: 1.1rem;">📈 Growth Trajectory</h4>
-                        <div style="display: grid; grid-template-columns: 1fr; gap: 1rem;">
-                            <div style="padding: 0.75rem; background: #fefce8; border-radius: 6px; border-left: 3px solid #eab308;">
-                                <strong style="color: #92400e;">Current Assets:</strong><br>
-                                <span style="font-size: 1.1rem; color: #92400e;">${{ "{:,.0f}".format(results.extendedAssetChart[0].totalAssets) }}</span>
-                            </div>
-                            <div style="padding: 0.75rem; background: #fefce8; border-radius: 6px; border-left: 3px solid #eab308;">
-                                <strong style="color: #92400e;">Peak Assets:</strong><br>
-                                <span style="font-size: 1.1rem; color: #92400e;">
-                                    {% set peak_assets = results.extendedAssetChart|max(attribute='totalAssets') %}
-                                    {% if peak_assets %}
-                                        ${{ "{:,.0f}".format(peak_assets.totalAssets) }}
-                                    {% else %}
-                                        $0
-                                    {% endif %}
-                                </span>
-                            </div>
-                            <div style="padding: 0.75rem; background: #fefce8; border-radius: 6px; border-left: 3px solid #eab308;">
-                                <strong style="color: #92400e;">Final Assets (Age 100):</strong><br>
-                                <span style="font-size: 1.1rem; color: #92400e;">${{ "{:,.0f}".format(results.extendedAssetChart[-1].totalAssets) }}</span>
-                            </div>
-                        </div>
-                    </div>
-                    <div style="background: #ffffff; padding: 1.5rem; border-radius: 8px; border: 1px solid #fbbf24;">
-                        <h4 style="color: #92400e; margin-top: 0; font-size: 1.1rem;">🎯 Key Milestones</h4>
-                        <div style="display: grid; grid-template-columns: 1fr; gap: 1rem;">
-                            <div style="padding: 0.75rem; background: #fefce8; border-radius: 6px; border-left: 3px solid #eab308;">
-                                <strong style="color: #92400e;">Retirement (Age {{ results.extendedAssetChart[results.yearsToRetirement].age }}):</strong><br>
-                                <span style="font-size: 1.1rem; color: #92400e;">${{ "{:,.0f}".format(results.extendedAssetChart[results.yearsToRetirement].totalAssets) }}</span>
-                            </div>
-                            <div style="padding: 0.75rem; background: #fefce8; border-radius: 6px; border-left: 3px solid #eab308;">
-                                <strong style="color: #92400e;">Age 80:</strong><br>
-                                <span style="font-size: 1.1rem; color: #92400e;">
-                                    {% if results.yearsToRetirement + 15 < results.extendedAssetChart|length %}
-                                        ${{ "{:,.0f}".format(results.extendedAssetChart[results.yearsToRetirement + 15].totalAssets) }}
-                                    {% else %}
-                                        N/A
-                                    {% endif %}
-                                </span>
-                            </div>
-                            <div style="padding: 0.75rem; background: #fefce8; border-radius: 6px; border-left: 3px solid #eab308;">
-                                <strong style="color: #92400e;">Age 90:</strong><br>
-                                <span style="font-size: 1.1rem; color: #92400e;">
-                                    {% if results.yearsToRetirement + 25 < results.extendedAssetChart|length %}
-                                        ${{ "{:,.0f}".format(results.extendedAssetChart[results.yearsToRetirement + 25].totalAssets) }}
-                                    {% else %}
-                                        N/A
-                                    {% endif %}
-                                </span>
-                            </div>
-                        </div>
-                    </div>
-                    <div style="background: #ffffff; padding: 1.5rem; border-radius: 8px; border: 1px solid #fbbf24;">
-                        <h4 style="color: #92400e; margin-top: 0; font-size: 1.1rem;">💡 Planning Insights</h4>
-                        <div style="display: grid; grid-template-columns: 1fr; gap: 1rem;">
-                            <div style="padding: 1rem; background: #fefce8; border-radius: 6px; border-left: 3px solid #eab308;">
-                                <strong style="color: #92400e;">Working Years:</strong><br>
-                                <span style="color: #92400e; font-size: 0.95rem;">Asset accumulation through contributions and investment growth</span>
-                            </div>
-                            <div style="padding: 1rem; background: #fefce8; border-radius: 6px; border-left: 3px solid #eab308;">
-                                <strong style="color: #92400e;">Retirement Years:</strong><br>
-                                <span style="color: #92400e; font-size: 0.95rem;">Asset distribution with Social Security and real estate income</span>
-                            </div>
-                            <div style="padding: 1rem; background: #fefce8; border-radius: 6px; border-left: 3px solid #eab308;">
-                                <strong style="color: #92400e;">Longevity Planning:</strong><br>
-                                <span style="color: #92400e; font-size: 0.95rem;">Assets projected to age 100 for comprehensive planning</span>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            {% endif %}
-        </div>
-        {% endif %}
-    </div>
+# Everything on the page except the results is static: render the shell once
+# at startup and splice the results fragment into it per request
+RESULTS_SLOT = '<!-- results -->'
 
-    <script>
-        function toggleSpouseFields() {
-            const maritalStatus = document.getElementById('maritalStatus').value;
-            const spouseFields = document.getElementById('spouseFields');
-            const bothWorkingFields = document.getElementById('bothWorkingFields');
-            const spouseSSFields = document.getElementById('spouseSSFields');
-            
-            if (maritalStatus !== 'single') {
-                spouseFields.style.display = 'block';
-                bothWorkingFields.style.display = 'block';
-                spouseSSFields.style.display = 'block';
-            } else {
-                spouseFields.style.display = 'none';
-                bothWorkingFields.style.display = 'none';
-                spouseSSFields.style.display = 'none';
-                toggleSpouseFinancialFields();
-            }
-        }
-        
-        function toggleSpouseFinancialFields() {
-            const bothWorking = document.getElementById('bothWorking').value;
-            const spouseIncomeFields = document.getElementById('spouseIncomeFields');
-            const spouseYearsFields = document.getElementById('spouseYearsFields');
-            const spouseContributionFields = document.getElementById('spouseContributionFields');
-            
-            if (bothWorking === 'both') {
-                spouseIncomeFields.style.display = 'block';
-                spouseYearsFields.style.display = 'block';
-                spouseContributionFields.style.display = 'block';
-            } else {
-                spouseIncomeFields.style.display = 'none';
-                spouseYearsFields.style.display = 'none';
-                spouseContributionFields.style.display = 'none';
-            }
-        }
-        
+with app.test_request_context():
+    PAGE_HEAD, PAGE_TAIL = render_template('index.html', results_fragment=Markup(RESULTS_SLOT)).split(RESULTS_SLOT)
+    app.jinja_env.get_template('_results.html')
 
-        
-        function resetForm() {
-            document.querySelector('form').reset();
-            toggleSpouseFields();
-            updateTotalBudget();
-        }
-        
-        function updateTotalBudget() {
-            const housing = parseFloat(document.getElementById('housing').value) || 0;
-            const healthcare = parseFloat(document.getElementById('healthcare').value) || 0;
-            const foodLiving = parseFloat(document.getElementById('foodLiving').value) || 0;
-            const travelLeisure = parseFloat(document.getElementById('travelLeisure').value) || 0;
-            const otherDiscretionary = parseFloat(document.getElementById('otherDiscretionary').value) || 0;
-            
-            const total = housing + healthcare + foodLiving + travelLeisure + otherDiscretionary;
-            document.getElementById('totalBudget').textContent = '$' + total.toLocaleString();
-        }
-        
-        // Add event listeners for budget fields
-        document.addEventListener('DOMContentLoaded', function() {
-            const budgetFields = ['housing', 'healthcare', 'foodLiving', 'travelLeisure', 'otherDiscretionary'];
-            budgetFields.forEach(field => {
-                document.getElementById(field).addEventListener('input', updateTotalBudget);
-            });
-            
-                    // Add event listeners for healthcare estimation
-        const healthcareFields = ['birthYear', 'annualIncome', 'state', 'zipCode', 'tobaccoUse'];
-        healthcareFields.forEach(field => {
-            document.getElementById(field).addEventListener('change', estimateHealthcare);
-        });
-        
-        toggleSpouseFields();
-        loadProfileList(); // Load saved profiles on page load
-    });
-    
-    // Profile Management Functions
-    function saveProfile() {
-        const profileName = document.getElementById('profileName').value.trim();
-        if (!profileName) {
-            showProfileMessage('Please enter a profile name', 'error');
-            return;
-        }
-        
-        const profileData = collectFormData();
-        const profiles = getProfiles();
-        profiles[profileName] = profileData;
-        localStorage.setItem('retirementProfiles', JSON.stringify(profiles));
-        
-        showProfileMessage(`Profile "${profileName}" saved successfully!`, 'success');
-        loadProfileList();
-        document.getElementById('profileName').value = '';
-    }
-    
-    function loadProfile() {
-        const profileSelect = document.getElementById('profileSelect');
-        const selectedProfile = profileSelect.value;
-        
-        if (!selectedProfile) {
-            showProfileMessage('Please select a profile to load', 'error');
-            return;
-        }
-        
-        const profiles = getProfiles();
-        const profileData = profiles[selectedProfile];
-        
-        if (profileData) {
-            populateForm(profileData);
-            showProfileMessage(`Profile "${selectedProfile}" loaded successfully!`, 'success');
-        } else {
-            showProfileMessage('Profile not found', 'error');
-        }
-    }
-    
-    function executeProfileAction() {
-        const action = document.getElementById('profileAction').value;
-        const profileSelect = document.getElementById('profileSelect');
-        const selectedProfile = profileSelect.value;
-        
-        switch (action) {
-            case 'save':
-                saveProfile();
-                break;
-            case 'load':
-                if (selectedProfile) {
-                    loadProfile();
-                } else {
-                    showProfileMessage('Please select a profile to load', 'error');
-                }
-                break;
-            case 'delete':
-                if (selectedProfile) {
-                    deleteProfile(selectedProfile);
-                } else {
-                    showProfileMessage('Please select a profile to delete', 'error');
-                }
-                break;
-        }
-    }
-    
-    function deleteProfile(profileName) {
-        if (confirm(`Are you sure you want to delete profile "${profileName}"?`)) {
-            const profiles = getProfiles();
-            delete profiles[profileName];
-            localStorage.setItem('retirementProfiles', JSON.stringify(profiles));
-            
-            showProfileMessage(`Profile "${profileName}" deleted successfully!`, 'success');
-            loadProfileList();
-        }
-    }
-    
-    function exportProfiles() {
-        const profiles = getProfiles();
-        const dataStr = JSON.stringify(profiles, null, 2);
-        const dataBlob = new Blob([dataStr], {type: 'application/json'});
-        
-        const link = document.createElement('a');
-        link.href = URL.createObjectURL(dataBlob);
-        link.download = 'retirement_profiles.json';
-        link.click();
-        
-        showProfileMessage('All profiles exported successfully!', 'success');
-    }
-    
-    function importProfiles() {
-        const input = document.createElement('input');
-        input.type = 'file';
-        input.accept = '.json';
-        input.onchange = function(e) {
-            const file = e.target.files[0];
-            const reader = new FileReader();
-            
-            reader.onload = function(e) {
-                try {
-                    const importedProfiles = JSON.parse(e.target.result);
-                    const existingProfiles = getProfiles();
-                    
-                    // Merge profiles, with imported ones taking precedence
-                    const mergedProfiles = { ...existingProfiles, ...importedProfiles };
-                    localStorage.setItem('retirementProfiles', JSON.stringify(mergedProfiles));
-                    
-                    showProfileMessage('Profiles imported successfully!', 'success');
-                    loadProfileList();
-                } catch (error) {
-                    showProfileMessage('Error importing profiles: Invalid file format', 'error');
-                }
-            };
-            
-            reader.readAsText(file);
-        };
-        
-        input.click();
-    }
-    
-    function collectFormData() {
-        const form = document.querySelector('form');
-        const formData = new FormData(form);
-        const data = {};
-        
-        // Collect all form fields
-        for (let [key, value] of formData.entries()) {
-            data[key] = value;
-        }
-        
-        // Add timestamp
-        data.timestamp = new Date().toISOString();
-        
-        return data;
-    }
-    
-    function populateForm(profileData) {
-        const form = document.querySelector('form');
-        
-        // Populate all form fields
-        for (let key in profileData) {
-            if (profileData.hasOwnProperty(key) && key !== 'timestamp') {
-                const field = form.querySelector(`[name="${key}"]`);
-                if (field) {
-                    if (field.type === 'checkbox') {
-                        field.checked = profileData[key] === 'true';
-                    } else {
-                        field.value = profileData[key];
-                    }
-                }
-            }
-        }
-        
-        // Trigger necessary UI updates
-        toggleSpouseFields();
-        updateTotalBudget();
-        
-        // Trigger healthcare estimation if location fields are filled
-        if (profileData.state && profileData.zipCode) {
-            estimateHealthcare();
-        }
-    }
-    
-    function getProfiles() {
-        const profiles = localStorage.getItem('retirementProfiles');
-        return profiles ? JSON.parse(profiles) : {};
-    }
-    
-    function loadProfileList() {
-        const profileSelect = document.getElementById('profileSelect');
-        const profiles = getProfiles();
-        
-        // Clear existing options
-        profileSelect.innerHTML = '';
-        
-        if (Object.keys(profiles).length === 0) {
-            profileSelect.innerHTML = '<option value="">No profiles saved</option>';
-            return;
-        }
-        
-        // Add profile options
-        Object.keys(profiles).forEach(profileName => {
-            const option = document.createElement('option');
-            option.value = profileName;
-            option.textContent = profileName;
-            profileSelect.appendChild(option);
-        });
-    }
-    
-    function showProfileMessage(message, type) {
-        const messageDiv = document.getElementById('profileMessage');
-        messageDiv.textContent = message;
-        messageDiv.style.display = 'block';
-        
-        // Set styling based on message type
-        if (type === 'success') {
-            messageDiv.style.backgroundColor = '#d1fae5';
-            messageDiv.style.color = '#065f46';
-            messageDiv.style.border = '1px solid #10b981';
-        } else if (type === 'error') {
-            messageDiv.style.backgroundColor = '#fee2e2';
-            messageDiv.style.color = '#991b1b';
-            messageDiv.style.border = '1px solid #ef4444';
-        }
-        
-        // Auto-hide after 5 seconds
-        setTimeout(() => {
-            messageDiv.style.display = 'none';
-        }, 5000);
-    }
-    
-    function estimateHealthcare() {
-            const birthYear = document.getElementById('birthYear').value;
-            const annualIncome = document.getElementById('annualIncome').value;
-            const state = document.getElementById('state').value;
-            const zipCode = document.getElementById('zipCode').value;
-            const tobaccoUse = document.getElementById('tobaccoUse').value;
-            
-            if (birthYear && annualIncome && state && zipCode) {
-                const currentYear = new Date().getFullYear();
-                const age = currentYear - parseInt(birthYear);
-                
-                // Make API call to estimate healthcare premiums
-                fetch('/estimate_healthcare', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({
-                        age: age,
-                        income: parseInt(annualIncome),
-                        state: state,
-                        zip_code: zipCode,
-                        tobacco_use: tobaccoUse === 'true'
-                    })
-                })
-                .then(response => response.json())
-                .then(data => {
-                    if (data.success) {
-                        document.getElementById('healthcare').value = data.estimated_annual_cost;
-                        updateTotalBudget();
-                        
-                        // Show premium breakdown
-                        showHealthcareBreakdown(data);
-                    }
-                })
-                .catch(error => {
-                    console.error('Error estimating healthcare:', error);
-                });
-            }
-        }
-        
-        function showHealthcareBreakdown(data) {
-            // Create or update healthcare breakdown display
-            let breakdownDiv = document.getElementById('healthcareBreakdown');
-            if (!breakdownDiv) {
-                breakdownDiv = document.createElement('div');
-                breakdownDiv.id = 'healthcareBreakdown';
-                breakdownDiv.style.cssText = 'margin-top: 1rem; padding: 1rem; background: #f0f9ff; border-radius: 6px; border: 1px solid #0ea5e9;';
-                document.getElementById('healthcare').parentNode.appendChild(breakdownDiv);
-            }
-            
-            breakdownDiv.innerHTML = `
-                <h4 style="color: #0c4a6e; margin-bottom: 0.5rem;">Healthcare Premium Estimates</h4>
-                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 0.5rem; margin-bottom: 1rem;">
-                    <div><strong>Bronze:</strong> $${data.premiums.Bronze.monthly}/mo</div>
-                    <div><strong>Silver:</strong> $${data.premiums.Silver.monthly}/mo</div>
-                    <div><strong>Gold:</strong> $${data.premiums.Gold.monthly}/mo</div>
-                    <div><strong>Platinum:</strong> $${data.premiums.Platinum.monthly}/mo</div>
-                </div>
-                <div style="font-size: 0.9rem; color: #0369a1; margin-bottom: 0.5rem;">
-                    <strong>Recommended:</strong> ${data.recommended_tier} Plan
-                    ${data.subsidy_eligible ? `(Eligible for ${data.subsidy_percentage}% subsidy)` : ''}
-                </div>
-                <div style="font-size: 0.8rem; color: #6b7280; padding-top: 0.5rem; border-top: 1px solid #e2e8f0;">
-                    <strong>Data Source:</strong> ${data.source || 'CMS Marketplace API'}
-                </div>
-            `;
-        }
-    </script>
-</body>
-</html>
-'''
+PAGE_ETAG = hashlib.sha256((PAGE_HEAD + PAGE_TAIL).encode('utf-8')).hexdigest()[:16]
 
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    response = html_response(PAGE_HEAD + PAGE_TAIL)
+    response.set_etag(PAGE_ETAG)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 @app.route('/estimate_healthcare', methods=['POST'])
 def estimate_healthcare():
@@ -1447,361 +174,590 @@ def estimate_healthcare():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/v1/healthcare/cache', methods=['GET'])
+def healthcare_cache_stats():
+    """Hit/miss counters for the healthcare premium cache in this worker."""
+    return json_response({'success': True, 'cache': premium_cache.stats()})
+
 @app.route('/calculate', methods=['POST'])
 def calculate():
+    """Full page with results, or just the results fragment with ?partial=1 for in-page updates."""
     try:
-        # Get form data
-        marital_status = request.form.get('maritalStatus')
-        birth_year = int(request.form.get('birthYear'))
-        retirement_age = int(request.form.get('retirementAge'))
-        liquid_assets = float(request.form.get('liquidAssets'))
-        real_estate_cashflow = float(request.form.get('realEstateCashflow') or 0)
-        annual_income = float(request.form.get('annualIncome'))
-        years_worked = int(request.form.get('yearsWorked'))
-        annual_contribution = float(request.form.get('annualContribution') or 0)
-        market_profile = request.form.get('marketProfile')
-        calculation_method = request.form.get('calculationMethod')
-        social_security_claim_age = int(request.form.get('socialSecurityClaimAge'))
+        inputs = parse_plan_inputs(request.form)
+        results = calculate_plan(inputs)
+        fragment = render_template('_results.html', results=results)
+        if request.args.get('partial'):
+            return html_response(fragment)
+        return html_response(PAGE_HEAD + fragment + PAGE_TAIL)
         
-        # Spouse data
-        spouse_birth_year = request.form.get('spouseBirthYear')
-        
-        both_working = request.form.get('bothWorking')
-        spouse_annual_income = request.form.get('spouseAnnualIncome')
-        spouse_years_worked = request.form.get('spouseYearsWorked')
-        spouse_annual_contribution = request.form.get('spouseAnnualContribution')
-        spouse_social_security_claim_age = request.form.get('spouseSocialSecurityClaimAge')
-        
-        # Budget data
-        housing = float(request.form.get('housing'))
-        
-        # Get healthcare estimate if not provided
-        healthcare_input = request.form.get('healthcare')
-        if healthcare_input and float(healthcare_input) > 0:
-            healthcare = float(healthcare_input)
-        else:
-            # Auto-estimate healthcare based on age, income, and location
-            state = request.form.get('state')
-            zip_code = request.form.get('zipCode')
-            tobacco_use = request.form.get('tobaccoUse') == 'true'
-            
-            if state and zip_code:
-                # Estimate healthcare for primary person at retirement age
-                primary_healthcare = estimate_healthcare_premiums(
-                    age=retirement_age,
-                    income=annual_income,
-                    state=state,
-                    zip_code=zip_code,
-                    tobacco_use=tobacco_use
-                )
-                
-                # Estimate healthcare for spouse at their retirement age if applicable
-                spouse_healthcare = 0
-                if marital_status != 'single' and spouse_birth_year:
-                    # Calculate spouse's age at primary person's retirement
-                    spouse_age_at_retirement = retirement_age - (birth_year - int(spouse_birth_year))
-                    spouse_income = spouse_annual_income if both_working == 'both' else annual_income
-                    
-                    spouse_healthcare_estimate = estimate_healthcare_premiums(
-                        age=spouse_age_at_retirement,
-                        income=spouse_income,
-                        state=state,
-                        zip_code=zip_code,
-                        tobacco_use=tobacco_use
-                    )
-                    spouse_healthcare = spouse_healthcare_estimate['estimated_annual_cost']
-                
-                healthcare = primary_healthcare['estimated_annual_cost'] + spouse_healthcare
-            else:
-                # Default fallback - estimate for both if couple
-                if marital_status != 'single':
-                    healthcare = 24000  # $12,000 per person for couple
-                else:
-                    healthcare = 12000  # $12,000 for single person
-        
-        food_living = float(request.form.get('foodLiving'))
-        travel_leisure = float(request.form.get('travelLeisure'))
-        other_discretionary = float(request.form.get('otherDiscretionary'))
+    except Exception as e:
+        return f"Error: {str(e)}", 400
+
+@app.route('/api/v1/calculate', methods=['POST'])
+def api_calculate():
+    """JSON API for plan calculations; accepts the same fields as the form."""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        inputs = parse_plan_inputs(data)
+        results = calculate_plan(inputs)
+    except Exception as e:
+        return json_response({'success': False, 'error': str(e)}, status=400)
+    
+    return json_response({
+        'success': True,
+        'summary': results['summary'],
+        'forecast': results['forecast'],
+        'socialSecurityDetails': results['socialSecurityDetails'],
+        'extendedAssetChart': results['extendedAssetChart'],
+        'budget': results['budget'],
+        'yearsToRetirement': results['yearsToRetirement'],
+        'monteCarlo': results['monteCarlo'],
+        'withdrawalStrategies': results['withdrawalStrategies'],
+        'taxes': results['taxes'],
+        'claimingStrategy': results['claimingStrategy']
+    })
+
+@app.route('/api/v1/forecast', methods=['POST'])
+def api_forecast():
+    """
+    Stream one year-by-year series of a plan as NDJSON (default) or CSV.
+    
+    Takes the usual plan fields plus "series" (forecast or extendedAssetChart)
+    and "format" (ndjson or csv, also accepted as a query parameter).
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        series = data.get('series', 'forecast')
+        if series not in FORECAST_SERIES:
+            raise ValueError(f"Unknown series: {series}")
+        fmt = request.args.get('format') or data.get('format', 'ndjson')
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"Unknown format: {fmt}")
+        inputs = parse_plan_inputs(data)
+        results = calculate_plan(inputs)
+    except Exception as e:
+        return json_response({'success': False, 'error': str(e)}, status=400)
+    
+    return Response(stream_rows(results[series].columns, fmt), mimetype=STREAM_FORMATS[fmt])
+
+@app.route('/api/v1/batch', methods=['POST'])
+def api_batch():
+    """
+    Evaluate many scenarios in one request.
+    
+    Accepts a JSON array (or {"scenarios": [...]}) or NDJSON with one scenario
+    per line, and streams back one NDJSON result per scenario, in order.
+    """
+    try:
+        scenarios = read_batch_scenarios()
+    except ValueError as e:
+        return json_response({'success': False, 'error': str(e)}, status=400)
+    
+    return Response(stream_batch_results(scenarios, datetime.now().year), mimetype='application/x-ndjson')
+
+def read_batch_scenarios():
+    """Parse the request body into a list of raw scenario objects."""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        lines = request.get_data(as_text=True).splitlines()
+        try:
+            return [json.loads(line) for line in lines if line.strip()]
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid NDJSON line: {e}")
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('scenarios')
+    if not isinstance(data, list):
+        raise ValueError("Request body must be a JSON array of scenarios or NDJSON")
+    return data
+
+def stream_batch_results(scenarios, current_year):
+    """Yield one NDJSON line per scenario, evaluating BATCH_CHUNK_SIZE scenarios per vectorized pass."""
+    healthcare_cache = {}
+    
+    for start in range(0, len(scenarios), BATCH_CHUNK_SIZE):
+        lines = {}
+        valid = []
+        for index, raw in enumerate(scenarios[start:start + BATCH_CHUNK_SIZE], start):
+            try:
+                if not isinstance(raw, dict):
+                    raise ValueError("Scenario must be a JSON object")
+                inputs = parse_plan_inputs(raw)
+                # Households that share inputs share one healthcare lookup
+                key = tuple(inputs[name] for name in HEALTHCARE_INPUTS)
+                if key not in healthcare_cache:
+                    healthcare_cache[key] = resolve_healthcare_costs(inputs, current_year)
+                valid.append((index, inputs, healthcare_cache[key]))
+            except Exception as e:
+                lines[index] = {'index': index, 'success': False, 'error': str(e)}
+        
+        for index, result in evaluate_batch_chunk(valid, current_year):
+            lines[index] = result
+        
+        for index in sorted(lines):
+            yield json.dumps(lines[index], separators=(',', ':')) + '\n'
+
+def evaluate_batch_chunk(valid, current_year):
+    """Evaluate a chunk in one pass; if the pass fails, isolate the failing scenarios one by one."""
+    if not valid:
+        return []
+    try:
+        evaluated = evaluate_scenarios([v[1] for v in valid], [v[2] for v in valid], current_year)
+        return [(index, {'index': index, 'success': True, **result})
+                for (index, _, _), result in zip(valid, evaluated)]
+    except Exception:
+        pass
+    
+    results = []
+    for index, inputs, healthcare in valid:
+        try:
+            result = evaluate_scenarios([inputs], [healthcare], current_year)[0]
+            results.append((index, {'index': index, 'success': True, **result}))
+        except Exception as e:
+            results.append((index, {'index': index, 'success': False, 'error': str(e)}))
+    return results
+
+@app.route('/api/v1/sweep', methods=['POST'])
+def api_sweep():
+    """
+    Evaluate a grid of retirement ages, claim ages and budgets for one household.
+    
+    Takes the usual plan fields plus a "sweep" object whose retirementAge,
+    socialSecurityClaimAge, spouseSocialSecurityClaimAge and annualBudget
+    entries are value lists or start/stop/step ranges, and returns a
+    heatmap-ready nested array of the chosen metric.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        inputs = parse_plan_inputs(data)
+        axes_spec = data.get('sweep') or {}
+        metric = data.get('metric', 'successProbability')
+        n_paths = parse_path_count(data.get('paths'), SWEEP_PATHS, MAX_SWEEP_PATH_CELLS)
+        seed = resolve_seed(inputs['seed'])
+        
+        annual_budget = sum(plan_budget_lines(inputs).values())
+        spouse_claim_default = (inputs['spouse_social_security_claim_age']
+                                if inputs['marital_status'] != 'single' else None)
+        axes = {
+            'retirementAge': expand_axis(axes_spec.get('retirementAge'), inputs['retirement_age']),
+            'socialSecurityClaimAge': expand_axis(axes_spec.get('socialSecurityClaimAge'),
+                                                  inputs['social_security_claim_age']),
+            'spouseSocialSecurityClaimAge': expand_axis(axes_spec.get('spouseSocialSecurityClaimAge'),
+                                                        spouse_claim_default),
+            'annualBudget': expand_axis(axes_spec.get('annualBudget'), annual_budget)
+        }
+        
+        # The budget axis excludes healthcare, which follows the household's per-age cost
+        # curve for each retirement age (ACA premiums depend on the age coverage starts)
+        healthcare_by_age = healthcare_costs_by_retirement_age(inputs, datetime.now().year, axes['retirementAge'])
+        
+        values = run_sweep(
+            inputs, datetime.now().year,
+            axes['retirementAge'], axes['socialSecurityClaimAge'],
+            axes['spouseSocialSecurityClaimAge'], axes['annualBudget'],
+            metric=metric, n_paths=n_paths, seed=seed, healthcare_by_age=healthcare_by_age
+        )
+    except Exception as e:
+        return json_response({'success': False, 'error': str(e)}, status=400)
+    
+    values = (values * 100).round(1) if metric == 'successProbability' else values.round().astype(int)
+    fmt = data.get('format', 'json')
+    if fmt in STREAM_FORMATS:
+        # One row per grid cell, in row-major order
+        cells = np.indices(values.shape).reshape(len(values.shape), -1)
+        columns = {name: np.array(axis, dtype=object)[index] for (name, axis), index in zip(axes.items(), cells)}
+        columns[metric] = values.ravel()
+        return Response(stream_rows(columns, fmt), mimetype=STREAM_FORMATS[fmt])
+    return json_response({
+        'success': True,
+        'metric': metric,
+        'axes': axes,
+        'shape': list(values.shape),
+        'values': values.tolist(),
+        'seed': seed if metric == 'successProbability' else None
+    })
+
+@app.route('/api/v1/solve', methods=['POST'])
+def api_solve():
+    """
+    Solve one plan input for a target instead of guessing it.
+    
+    Takes the usual plan fields plus "solveFor" ("annualBudget" or
+    "retirementAge") and a "targetSuccess" probability in percent (default 90).
+    The budget solver also takes an optional "targetEndingBalance" in today's
+    dollars the successful paths must keep at 100; the retirement age solver
+    an optional "latestAge" to search up to.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        inputs = parse_plan_inputs(data)
+        solve_for = data.get('solveFor', 'annualBudget')
+        if solve_for not in SOLVE_TARGETS:
+            raise ValueError(f"Unknown solve target: {solve_for}")
+        target_success = float(data.get('targetSuccess', 90))
+        ending_balance = parse_amount('targetEndingBalance', data.get('targetEndingBalance'))
+        n_paths = parse_path_count(data.get('paths'), DEFAULT_PATHS, MAX_SOLVER_PATHS)
         
-        # Calculate current age and years to retirement
         current_year = datetime.now().year
-        current_age = current_year - birth_year
-        years_to_retirement = retirement_age - current_age
-        
-        # Calculate portfolio growth during working years
-        portfolio_balance = liquid_assets
-        if calculation_method == 'monteCarlo':
-            portfolio_balance = monte_carlo_simulation(
-                portfolio_balance, annual_contribution, years_to_retirement, market_profile
+        primary_benefit, spouse_benefit = household_social_security(inputs)
+        if solve_for == 'retirementAge':
+            # Each candidate age buys Marketplace coverage from its own retirement until Medicare
+            current_age = current_year - inputs['birth_year']
+            latest_age = parse_latest_age(data.get('latestAge'), LATEST_RETIREMENT_AGE, current_age)
+            candidates = retirement_age_candidates(current_age, latest_age)
+            healthcare_by_age = healthcare_costs_by_retirement_age(inputs, current_year, candidates)
+            solution = earliest_retirement_age(
+                inputs, current_year, primary_benefit, spouse_benefit, healthcare_by_age,
+                target_success=target_success, latest_age=latest_age, n_paths=n_paths, seed=inputs['seed']
             )
         else:
-            portfolio_balance = deterministic_growth(
-                portfolio_balance, annual_contribution, years_to_retirement, market_profile
+            healthcare_by_age = resolve_healthcare_costs(inputs, current_year)
+            solution = max_sustainable_spending(
+                inputs, current_year, primary_benefit, spouse_benefit, healthcare_by_age,
+                target_success=target_success, ending_balance=ending_balance, n_paths=n_paths, seed=inputs['seed']
             )
-        
-        # Calculate Social Security benefits
-        primary_social_security = 0
-        spousal_social_security = 0
-        
-        # Calculate Social Security benefits - they start at claim age regardless of retirement age
-        primary_social_security = calculate_social_security_benefit(
-            birth_year, annual_income, years_worked, social_security_claim_age
+    except Exception as e:
+        return json_response({'success': False, 'error': str(e)}, status=400)
+    
+    return json_response({'success': True, 'solveFor': solve_for, **solution})
+
+def calculate_plan(inputs):
+    """Run the full retirement plan calculation for parsed inputs and return the results dict."""
+    marital_status = inputs['marital_status']
+    birth_year = inputs['birth_year']
+    retirement_age = inputs['retirement_age']
+    liquid_assets = inputs['liquid_assets']
+    real_estate_cashflow = inputs['real_estate_cashflow']
+    annual_income = inputs['annual_income']
+    years_worked = inputs['years_worked']
+    annual_contribution = inputs['annual_contribution']
+    market_profile = inputs['market_profile']
+    glide_path = inputs['glide_path']
+    allocation = inputs['allocation']
+    calculation_method = inputs['calculation_method']
+    seed = inputs['seed']
+    monthly = inputs['time_step'] == 'monthly'
+    inflation_model = inputs['inflation_model']
+    inflation_rate = inputs['inflation_rate']
+    social_security_claim_age = inputs['social_security_claim_age']
+    
+    # Spouse data
+    spouse_birth_year = inputs['spouse_birth_year']
+    both_working = inputs['both_working']
+    spouse_annual_income = inputs['spouse_annual_income']
+    spouse_years_worked = inputs['spouse_years_worked']
+    spouse_social_security_claim_age = inputs['spouse_social_security_claim_age']
+    
+    # Budget data
+    housing = inputs['housing']
+    
+    food_living = inputs['food_living']
+    travel_leisure = inputs['travel_leisure']
+    other_discretionary = inputs['other_discretionary']
+    
+    # Calculate current age and years to retirement
+    current_year = datetime.now().year
+    current_age = current_year - birth_year
+    years_to_retirement = retirement_age - current_age
+    
+    # Healthcare cost at every age (estimated if not provided); the budget
+    # shows the first retirement year's cost
+    healthcare_by_age = resolve_healthcare_costs(inputs, current_year)
+    first_retirement_age = min(max(retirement_age, current_age), PLANNING_HORIZON_AGE)
+    healthcare = round(float(healthcare_by_age[first_retirement_age]))
+    
+    # Calculate Social Security benefits - they start at claim age regardless of retirement age
+    primary_social_security, spousal_social_security = household_social_security(inputs)
+    
+    # Social Security streams as (start age, annual benefit) pairs
+    social_security_streams = [(social_security_claim_age, primary_social_security)]
+    if marital_status != 'single' and spouse_social_security_claim_age:
+        social_security_streams.append((spouse_social_security_claim_age, spousal_social_security))
+    
+    # Calculate annual budget: the first retirement year for the summary, and
+    # every age for the projections as healthcare costs change. Both are in
+    # today's dollars; each line also grows at its own rate above inflation.
+    annual_budget = housing + healthcare + food_living + travel_leisure + other_discretionary
+    spending_by_age = budget_lines_by_age({
+        'housing': housing,
+        'food_living': food_living,
+        'travel_leisure': travel_leisure,
+        'other_discretionary': other_discretionary
+    }, current_age, inflation_model) + healthcare_by_age
+    
+    # Calculate portfolio growth during working years, nominal and in today's dollars
+    portfolio_balance = liquid_assets
+    monte_carlo = market = None
+    if calculation_method in SIMULATION_METHODS:
+        # Simulate every path from today through age 100 in one pass
+        lifecycle_cashflows, social_security_cashflows = build_lifecycle_cashflows(
+            current_age, retirement_age, annual_contribution, spending_by_age,
+            real_estate_cashflow, social_security_streams, monthly=monthly, split_social_security=True
         )
-        
-        if marital_status != 'single':
-            if both_working == 'both' and spouse_annual_income and spouse_years_worked:
-                # Both working - calculate separately
-                if spouse_social_security_claim_age:
-                    spousal_social_security = calculate_social_security_benefit(
-                        int(spouse_birth_year), float(spouse_annual_income), 
-                        int(spouse_years_worked), int(spouse_social_security_claim_age)
-                    )
-            else:
-                # Only one working - calculate spousal benefit
-                spousal_social_security = calculate_spousal_benefit(
-                    primary_social_security, int(spouse_birth_year), birth_year
-                )
-        
-        # Calculate total annual income
-        real_estate_income = real_estate_cashflow
-        total_social_security = primary_social_security + spousal_social_security
-        safe_withdrawal = calculate_safe_withdrawal(portfolio_balance)
-        total_annual_income = safe_withdrawal + real_estate_income + total_social_security
-        
-        # Calculate annual budget
-        annual_budget = housing + healthcare + food_living + travel_leisure + other_discretionary
-        surplus_deficit = total_annual_income - annual_budget
-        
-        # Generate comprehensive forecast including working years and retirement
-        forecast = []
-        current_portfolio = liquid_assets  # Start with current assets
-        
-        # First, show working years (from current age to retirement)
-        for year in range(years_to_retirement + 1):
-            current_year_age = current_age + year
-            starting_balance = current_portfolio
-            
-            # Calculate investment gains during working years
-            if market_profile == 'Conservative':
-                mean_return = 0.05
-            elif market_profile == 'Moderate':
-                mean_return = 0.07
-            else:  # Aggressive
-                mean_return = 0.09
-            
-            investment_gains = starting_balance * mean_return
-            
-            # During working years: no real estate income, no Social Security, no retirement spending
-            real_estate_cashflow_year = 0
-            social_security_year = 0
-            spending = 0
-            
-            # Add annual contribution during working years
-            contribution = annual_contribution if year < years_to_retirement else 0
-            
-            # Ending balance
-            ending_balance = starting_balance + investment_gains + contribution
-            current_portfolio = ending_balance
-            
-            forecast.append({
-                'age': current_year_age,
-                'year': current_year + year,
-                'startingBalance': round(starting_balance),
-                'investmentGains': round(investment_gains),
-                'realEstateCashflow': round(real_estate_cashflow_year),
-                'socialSecurity': round(social_security_year),
-                'spending': round(spending),
-                'endingBalance': round(ending_balance),
-                'contribution': round(contribution),
-                'period': 'Working'
-            })
-        
-        # Then show retirement years (30 years of retirement)
-        for year in range(30):
-            age = retirement_age + year
-            starting_balance = current_portfolio
-            
-            # Calculate investment gains during retirement
-            if market_profile == 'Conservative':
-                mean_return = 0.05
-            elif market_profile == 'Moderate':
-                mean_return = 0.07
-            else:  # Aggressive
-                mean_return = 0.09
-            
-            investment_gains = starting_balance * mean_return
-            
-            # Real estate income starts in retirement
-            real_estate_cashflow_year = real_estate_income
-            
-            # Social Security starts at specified claim age
-            social_security_year = 0
-            if age >= social_security_claim_age:
-                social_security_year += primary_social_security
-            if marital_status != 'single' and spouse_social_security_claim_age and age >= int(spouse_social_security_claim_age):
-                social_security_year += spousal_social_security
-            
-            # Retirement spending starts
-            spending = annual_budget
-            
-            # Ending balance
-            ending_balance = starting_balance + investment_gains + real_estate_cashflow_year + social_security_year - spending
-            current_portfolio = ending_balance
-            
-            forecast.append({
-                'age': age,
-                'year': current_year + years_to_retirement + year,
-                'startingBalance': round(starting_balance),
-                'investmentGains': round(investment_gains),
-                'realEstateCashflow': round(real_estate_cashflow_year),
-                'socialSecurity': round(social_security_year),
-                'spending': round(spending),
-                'endingBalance': round(ending_balance),
-                'contribution': 0,
-                'period': 'Retirement'
-            })
-        
-        # Calculate safe sustainable spending
-        safe_sustainable_spending = calculate_sustainable_spending(
-            portfolio_balance, real_estate_income, total_social_security, annual_budget
+        allocations = allocation_path(
+            market_profile, np.arange(current_age, PLANNING_HORIZON_AGE), retirement_age, glide_path, allocation
         )
-        
-        # Generate chart data for portfolio balance over time
-        portfolio_balance_chart = []
-        for year_data in forecast:
-            portfolio_balance_chart.append({
-                'year': year_data['year'],
-                'age': year_data['age'],
-                'balance': year_data['endingBalance'],
-                'period': year_data['period']
-            })
-        
-        # Generate extended asset growth chart to age 100
-        extended_asset_chart = []
-        current_age = current_year - birth_year
-        current_portfolio_value = liquid_assets
-        
-        # Project from current year to age 100
-        for age in range(current_age, 101):
-            year = current_year + (age - current_age)
-            
-            if age < retirement_age:
-                # Working years: contributions + investment growth
-                if age == current_age:
-                    starting_balance = current_portfolio_value
-                else:
-                    starting_balance = extended_asset_chart[-1]['totalAssets']
-                
-                # Investment growth based on risk tolerance
-                if market_profile == 'Conservative':
-                    mean_return = 0.06
-                elif market_profile == 'Moderate':
-                    mean_return = 0.075
-                else:  # Aggressive
-                    mean_return = 0.09
-                
-                investment_gains = starting_balance * mean_return
-                contribution = annual_contribution
-                real_estate_income = 0
-                social_security = 0
-                spending = 0
-                
-                ending_balance = starting_balance + investment_gains + contribution + real_estate_income + social_security - spending
-                total_assets = ending_balance
-                
-            else:
-                # Retirement years: withdrawals + investment growth
-                if age == retirement_age:
-                    starting_balance = portfolio_balance
-                else:
-                    starting_balance = extended_asset_chart[-1]['totalAssets']
-                
-                # Investment growth based on risk tolerance
-                if market_profile == 'Conservative':
-                    mean_return = 0.05  # Slightly more conservative in retirement
-                elif market_profile == 'Moderate':
-                    mean_return = 0.065
-                else:  # Aggressive
-                    mean_return = 0.08
-                
-                investment_gains = starting_balance * mean_return
-                contribution = 0
-                
-                # Real estate income
-                real_estate_income = real_estate_cashflow
-                
-                # Social Security
-                social_security = 0
-                if age >= social_security_claim_age:
-                    social_security += primary_social_security
-                if marital_status != 'single' and spouse_social_security_claim_age and age >= int(spouse_social_security_claim_age):
-                    social_security += spousal_social_security
-                
-                # Retirement spending
-                spending = annual_budget
-                
-                ending_balance = starting_balance + investment_gains + contribution + real_estate_income + social_security - spending
-                total_assets = ending_balance
-            
-            extended_asset_chart.append({
-                'year': year,
-                'age': age,
-                'totalAssets': round(total_assets),
-                'period': 'Working' if age < retirement_age else 'Retirement',
-                'contributions': contribution,
-                'investmentGains': round(investment_gains),
-                'realEstateIncome': round(real_estate_income),
-                'socialSecurity': round(social_security),
-                'spending': round(spending)
-            })
-        
-        # Add Social Security calculation details for validation
-        social_security_details = {
-            'primaryFRA': calculate_social_security_benefit(birth_year, annual_income, years_worked, 67),
-            'primaryClaimed': primary_social_security,
-            'spousalFRA': calculate_spousal_benefit(
-                calculate_social_security_benefit(birth_year, annual_income, years_worked, 67), 
-                int(spouse_birth_year) if spouse_birth_year else 0, 
-                birth_year
-            ) if marital_status != 'single' else 0,
-            'spousalClaimed': spousal_social_security,
-            'totalFRA': calculate_social_security_benefit(birth_year, annual_income, years_worked, 67) + 
-                       (calculate_spousal_benefit(
-                           calculate_social_security_benefit(birth_year, annual_income, years_worked, 67), 
-                           int(spouse_birth_year) if spouse_birth_year else 0, 
-                           birth_year
-                       ) if marital_status != 'single' else 0),
-            'totalClaimed': total_social_security
-        }
-        
-        results = {
-            'forecast': forecast,
-            'summary': {
-                'portfolioAtRetirement': round(portfolio_balance),
-                'safeAnnualWithdrawal': round(safe_withdrawal),
-                'totalAnnualIncome': round(total_annual_income),
-                'annualBudget': round(annual_budget),
-                'surplusDeficit': round(surplus_deficit),
-                'safeSustainableSpending': round(safe_sustainable_spending)
-            },
-            'budget': {
-                'housing': housing,
-                'healthcare': healthcare,
-                'foodLiving': food_living,
-                'travelLeisure': travel_leisure,
-                'otherDiscretionary': other_discretionary
-            },
-            'socialSecurityDetails': social_security_details,
-            'realEstateCashflow': round(real_estate_income),
-            'portfolioBalanceChart': portfolio_balance_chart,
-            'extendedAssetChart': extended_asset_chart,
-            'yearsToRetirement': years_to_retirement
-        }
-        
-        return render_template_string(HTML_TEMPLATE, results=results)
-        
-    except Exception as e:
-        return f"Error: {str(e)}", 400
+        # Drawn once here so the tax projection runs on the same paths
+        seed = resolve_seed(seed)
+        market = draw_market(DEFAULT_PATHS, len(allocations), market_profile, seed,
+                             SIMULATION_METHODS[calculation_method], allocations, inflation_model, inflation_rate)
+        monte_carlo = monte_carlo_simulation(portfolio_balance, lifecycle_cashflows, market_profile, seed=seed,
+                                             return_model=SIMULATION_METHODS[calculation_method],
+                                             allocations=allocations, inflation_model=inflation_model,
+                                             inflation_rate=inflation_rate, cola_cashflows=social_security_cashflows,
+                                             market=market)
+        retirement_row = max(years_to_retirement, 0)
+        nominal_portfolio_balance = float(monte_carlo['median_balances'][retirement_row])
+        portfolio_balance = float(monte_carlo.get('real_median_balances', monte_carlo['median_balances'])[retirement_row])
+    else:
+        working_ages = np.arange(current_age, retirement_age)
+        working_rates = expected_returns(market_profile, working_ages, retirement_age, glide_path, allocation)
+        levels = price_levels(expected_inflation(len(working_ages), inflation_model, inflation_rate))
+        nominal_portfolio_balance = deterministic_growth(
+            portfolio_balance, annual_contribution, working_rates, monthly=monthly, levels=levels[:-1]
+        )
+        portfolio_balance = nominal_portfolio_balance / levels[-1]
+    
+    # Calculate total annual income
+    real_estate_income = real_estate_cashflow
+    total_social_security = primary_social_security + spousal_social_security
+    safe_withdrawal = calculate_safe_withdrawal(portfolio_balance)
+    total_annual_income = safe_withdrawal + real_estate_income + total_social_security
+    surplus_deficit = total_annual_income - annual_budget
+    
+    # Project the plan once; the forecast table and both charts are views of this timeline
+    timeline = build_timeline(
+        current_age, current_year, retirement_age, liquid_assets, annual_contribution,
+        spending_by_age, real_estate_income, social_security_streams, market_profile, monthly=monthly,
+        glide_path=glide_path, allocation=allocation, inflation_model=inflation_model, inflation_rate=inflation_rate
+    )
+    forecast = build_forecast(timeline, retirement_age)
+    portfolio_balance_chart = build_balance_chart(forecast)
+    extended_asset_chart = build_extended_chart(timeline)
+    
+    # Calculate safe sustainable spending
+    safe_sustainable_spending = calculate_sustainable_spending(
+        portfolio_balance, real_estate_income, total_social_security, annual_budget
+    )
+    
+    # Add Social Security calculation details for validation
+    social_security_details = {
+        'primaryFRA': calculate_social_security_benefit(birth_year, annual_income, years_worked, 67),
+        'primaryClaimed': primary_social_security,
+        'spousalFRA': calculate_spousal_benefit(
+            calculate_social_security_benefit(birth_year, annual_income, years_worked, 67), 
+            spouse_birth_year if spouse_birth_year else 0, 
+            birth_year
+        ) if marital_status != 'single' else 0,
+        'spousalClaimed': spousal_social_security,
+        'totalFRA': calculate_social_security_benefit(birth_year, annual_income, years_worked, 67) + 
+                   (calculate_spousal_benefit(
+                       calculate_social_security_benefit(birth_year, annual_income, years_worked, 67), 
+                       spouse_birth_year if spouse_birth_year else 0, 
+                       birth_year
+                   ) if marital_status != 'single' else 0),
+        'totalClaimed': total_social_security
+    }
+    
+    # Search every monthly claim-age pair for the household; the portfolio
+    # objective scores each pair on the plan's own deterministic projection
+    claiming_projection = None
+    if inputs['claiming_objective'] == 'portfolio':
+        projection_ages = np.arange(current_age, PLANNING_HORIZON_AGE)
+        projection_levels = price_levels(expected_inflation(len(projection_ages), inflation_model, inflation_rate))
+        claiming_projection = {
+            'initial_balance': liquid_assets,
+            'rates': expected_returns(market_profile, projection_ages, retirement_age, glide_path, allocation),
+            'cashflows': build_lifecycle_cashflows(current_age, retirement_age, annual_contribution, spending_by_age,
+                                                   real_estate_cashflow, []) * projection_levels[:-1],
+            'cola_index': cola_levels(projection_levels),
+            'paid': projection_ages >= retirement_age,
+            'level': projection_levels[-1]
+        }
+    claiming_strategy = optimize_claiming(
+        current_age, annual_income, years_worked, social_security_claim_age,
+        couple=marital_status != 'single',
+        spouse_age=current_year - spouse_birth_year if spouse_birth_year else None,
+        spouse_earns=bool(both_working == 'both' and spouse_annual_income and spouse_years_worked),
+        spouse_annual_income=spouse_annual_income or 0.0,
+        spouse_years_worked=spouse_years_worked or 0,
+        spouse_chosen_claim_age=spouse_social_security_claim_age,
+        objective=inputs['claiming_objective'],
+        projection=claiming_projection
+    )
+    
+    # Compare withdrawal strategies on the simulation's own paths (or fresh normal draws)
+    withdrawal_strategies = None
+    if inputs['withdrawal_strategies']:
+        withdrawal_strategies = withdrawal_strategy_comparison(
+            inputs['withdrawal_strategies'], current_age, retirement_age, liquid_assets, annual_contribution,
+            spending_by_age, real_estate_income, social_security_streams, market_profile,
+            seed=monte_carlo['seed'] if monte_carlo else seed,
+            return_model=SIMULATION_METHODS.get(calculation_method, 'normal'),
+            glide_path=glide_path, allocation=allocation,
+            inflation_model=inflation_model, inflation_rate=inflation_rate, market=market
+        )
+    
+    # Split the portfolio into taxable, traditional and Roth accounts and tax every year
+    taxes = None
+    if inputs['tax_model'] != 'none':
+        taxes = tax_projection(inputs, current_age, spending_by_age, social_security_streams, market=market)
+    
+    results = {
+        'forecast': forecast,
+        'summary': {
+            'portfolioAtRetirement': round(portfolio_balance),
+            'portfolioAtRetirementNominal': round(nominal_portfolio_balance),
+            'safeAnnualWithdrawal': round(safe_withdrawal),
+            'totalAnnualIncome': round(total_annual_income),
+            'annualBudget': round(annual_budget),
+            'surplusDeficit': round(surplus_deficit),
+            'safeSustainableSpending': round(safe_sustainable_spending)
+        },
+        'budget': {
+            'housing': housing,
+            'healthcare': healthcare,
+            'foodLiving': food_living,
+            'travelLeisure': travel_leisure,
+            'otherDiscretionary': other_discretionary
+        },
+        'healthcareCosts': {
+            'ages': list(range(first_retirement_age, PLANNING_HORIZON_AGE + 1)),
+            'annualCost': [round(cost) for cost in healthcare_by_age[first_retirement_age:]]
+        },
+        'socialSecurityDetails': social_security_details,
+        'realEstateCashflow': round(real_estate_income),
+        'portfolioBalanceChart': portfolio_balance_chart,
+        'extendedAssetChart': extended_asset_chart,
+        'yearsToRetirement': years_to_retirement,
+        'monteCarlo': {
+            'paths': monte_carlo['paths'],
+            'seed': monte_carlo['seed'],
+            'returnModel': monte_carlo['return_model'],
+            'ages': list(range(current_age, current_age + monte_carlo['years'] + 1)),
+            'successProbability': round(monte_carlo['success_probability'] * 100, 1),
+            'medianAtRetirement': round(portfolio_balance),
+            'medianEndingBalance': round(monte_carlo['median_ending_balance']),
+            'percentiles': monte_carlo['percentiles'],
+            'realPercentiles': monte_carlo.get('real_percentiles', monte_carlo['percentiles']),
+            'ruinProbability': monte_carlo['ruin_probability']
+        } if monte_carlo else None,
+        'withdrawalStrategies': withdrawal_strategies,
+        'taxes': taxes,
+        'claimingStrategy': claiming_strategy
+    }
+    
+    return results
+
+# Inputs that determine the healthcare cost curve
+HEALTHCARE_INPUTS = (
+    'healthcare', 'marital_status', 'birth_year', 'retirement_age', 'annual_income', 'spouse_birth_year',
+    'both_working', 'spouse_annual_income', 'state', 'zip_code', 'tobacco_use',
+    'housing', 'food_living', 'travel_leisure', 'other_discretionary', 'inflation_model'
+)
+
+def resolve_healthcare_costs(inputs, current_year):
+    """
+    Annual household healthcare cost at each of the primary's ages (index = age, 0 ... 100):
+    the entered amount every year, or ACA estimates before 65 and Medicare after.
+    Either grows by the medical spread under the plan's inflation model (see
+    inflation.healthcare_growth_by_age).
+    """
+    growth = healthcare_growth_by_age(current_year - inputs['birth_year'], inputs['inflation_model'])
+    if inputs['healthcare'] and inputs['healthcare'] > 0:
+        return float(inputs['healthcare']) * growth
+    
+    marital_status = inputs['marital_status']
+    birth_year = inputs['birth_year']
+    retirement_age = inputs['retirement_age']
+    annual_income = inputs['annual_income']
+    spouse_birth_year = inputs['spouse_birth_year']
+    
+    # Auto-estimate healthcare based on age, income, and location
+    # (without a location the rating tables' national averages apply)
+    state = inputs['state']
+    zip_code = inputs['zip_code']
+    tobacco_use = inputs['tobacco_use']
+    
+    # Retirement income for IRMAA: what the non-healthcare budget has to be funded with
+    magi = inputs['housing'] + inputs['food_living'] + inputs['travel_leisure'] + inputs['other_discretionary']
+    
+    # Marketplace premiums are only needed for whoever retires before Medicare;
+    # the primary and spouse lookups run concurrently
+    primary_lookup = None
+    if retirement_age < MEDICARE_AGE:
+        primary_lookup = lookup_executor.submit(
+            estimate_healthcare_premiums,
+            age=retirement_age,
+            income=annual_income,
+            state=state,
+            zip_code=zip_code,
+            tobacco_use=tobacco_use
+        )
+    
+    spouse_age_offset = None
+    spouse_age_at_retirement = None
+    spouse_lookup = None
+    if marital_status != 'single' and spouse_birth_year:
+        # Spouse's age at the primary person's retirement
+        spouse_age_offset = birth_year - spouse_birth_year
+        spouse_age_at_retirement = retirement_age + spouse_age_offset
+        spouse_income = inputs['spouse_annual_income'] if inputs['both_working'] == 'both' else annual_income
+        
+        if spouse_age_at_retirement < MEDICARE_AGE:
+            spouse_lookup = lookup_executor.submit(
+                estimate_healthcare_premiums,
+                age=spouse_age_at_retirement,
+                income=spouse_income,
+                state=state,
+                zip_code=zip_code,
+                tobacco_use=tobacco_use
+            )
+    
+    return growth * household_cost_curve(
+        primary_lookup.result() if primary_lookup else None, retirement_age, magi,
+        spouse_age_offset=spouse_age_offset,
+        spouse_estimate=spouse_lookup.result() if spouse_lookup else None,
+        spouse_anchor_age=spouse_age_at_retirement
+    )
+
+def healthcare_costs_by_retirement_age(inputs, current_year, retirement_ages):
+    """
+    One resolve_healthcare_costs curve per retirement age, as a (len(retirement_ages), ages) array.
+    Pre-Medicare premiums are looked up at each retirement age rather than the plan's own.
+    """
+    curves = {}
+    for age in {int(np.ceil(age)) for age in retirement_ages}:
+        curves[age] = resolve_healthcare_costs(dict(inputs, retirement_age=age), current_year)
+    return np.stack([curves[int(np.ceil(age))] for age in retirement_ages])
+
+def household_social_security(inputs):
+    """Annual (primary, spouse) Social Security benefits at the plan's claim ages."""
+    birth_year = inputs['birth_year']
+    primary = calculate_social_security_benefit(
+        birth_year, inputs['annual_income'], inputs['years_worked'], inputs['social_security_claim_age']
+    )
+    spouse = 0
+    if inputs['marital_status'] != 'single':
+        if inputs['both_working'] == 'both' and inputs['spouse_annual_income'] and inputs['spouse_years_worked']:
+            # Both working - calculate separately
+            if inputs['spouse_social_security_claim_age']:
+                spouse = calculate_social_security_benefit(
+                    inputs['spouse_birth_year'], inputs['spouse_annual_income'],
+                    inputs['spouse_years_worked'], inputs['spouse_social_security_claim_age']
+                )
+        else:
+            # Only one working - calculate spousal benefit
+            spouse = calculate_spousal_benefit(primary, inputs['spouse_birth_year'], birth_year)
+    return primary, spouse
 
 def calculate_social_security_benefit(birth_year, annual_income, years_worked, claim_age):
     """Calculate Social Security benefit based on birth year, income, years worked, and claim age."""
@@ -1820,16 +776,8 @@ def calculate_social_security_benefit(birth_year, annual_income, years_worked, c
     # Apply maximum benefit cap
     fra_benefit = min(fra_benefit, MAX_FRA_BENEFIT)
     
-    # Adjust for early/late claiming
-    if claim_age == 62:
-        benefit = fra_benefit * 0.7  # 70% of FRA benefit (as per worked example)
-    elif claim_age == 70:
-        benefit = fra_benefit * 1.32  # 132% of FRA benefit
-    else:
-        # Linear interpolation for ages between 62 and 70
-        age_diff = claim_age - 62
-        benefit_increase = (0.32 * age_diff) / 8
-        benefit = fra_benefit * (0.7 + benefit_increase)
+    # Adjust for early/late claiming: 70% at 62, 100% at FRA, 132% at 70
+    benefit = fra_benefit * float(claim_adjustment(claim_age))
     
     return round(benefit)
 
@@ -1853,39 +801,182 @@ def calculate_spousal_benefit(working_spouse_benefit, non_working_spouse_birth_y
     
     return round(spousal_benefit)
 
-def monte_carlo_simulation(initial_balance, annual_contribution, years, market_profile):
-    """Monte Carlo simulation for portfolio growth."""
-    if market_profile == 'Conservative':
-        mean, std_dev = 0.05, 0.12
-    elif market_profile == 'Moderate':
-        mean, std_dev = 0.07, 0.15
-    else:  # Aggressive
-        mean, std_dev = 0.09, 0.18
+def monte_carlo_simulation(initial_balance, cashflows, market_profile, n_paths=DEFAULT_PATHS, seed=None,
+                           **options):
+    """
+    Monte Carlo simulation of the portfolio through a year-by-year cashflow schedule.
+    options (return model, allocations, inflation) pass through to run_simulation.
+    """
+    return run_simulation(initial_balance, cashflows, len(cashflows), market_profile, n_paths=n_paths, seed=seed,
+                          **options)
+
+def withdrawal_strategy_comparison(strategies, current_age, retirement_age, initial_balance, annual_contribution,
+                                   spending_by_age, real_estate_cashflow, social_security_streams, market_profile,
+                                   n_paths=DEFAULT_PATHS, seed=None, return_model='normal', glide_path='static',
+                                   allocation=None, inflation_model='none', inflation_rate=INFLATION_MEAN,
+                                   market=None):
+    """
+    Run each withdrawal strategy from retirement to age 100 on one shared set
+    of market paths, in today's dollars. Every path accumulates the same way
+    until retirement, so only the withdrawal policy differs between strategies.
+    market is the Monte Carlo run's (returns, levels) from draw_market, drawn
+    from seed; without it the paths are drawn here.
+    """
+    seed = resolve_seed(seed)
+    ages = np.arange(current_age, PLANNING_HORIZON_AGE)
+    if market is None:
+        allocations = allocation_path(market_profile, ages, retirement_age, glide_path, allocation)
+        market = draw_market(n_paths, len(ages), market_profile, seed,
+                             return_model, allocations, inflation_model, inflation_rate)
+    returns, levels = market
     
-    current_balance = initial_balance
+    working = int(np.clip(retirement_age - current_age, 0, len(ages)))
+    start_balance, growth = retirement_paths(initial_balance, np.full(working, float(annual_contribution)),
+                                             returns, levels)
+    retirement_ages = ages[working:]
+    social_security = np.zeros(len(retirement_ages))
+    for start_age, benefit in social_security_streams:
+        social_security += np.where(retirement_ages >= start_age, benefit, 0.0)
     
-    for year in range(years):
-        # Generate random return for this year
-        random_return = mean + (random.random() - 0.5) * 2 * std_dev
-        current_balance = current_balance * (1 + random_return) + annual_contribution
+    # VPW amortizes at the real return expected on the mix held at retirement
+    inflation = expected_inflation(1, inflation_model, inflation_rate)[0]
+    expected = float(expected_returns(market_profile, max(retirement_age, current_age), retirement_age,
+                                      glide_path, allocation))
+    real_return = (1 + expected) / (1 + inflation) - 1
     
-    return current_balance
+    return {
+        'paths': int(returns.shape[0]),
+        'seed': seed,
+        'ages': retirement_ages.tolist(),
+        'strategies': compare_strategies(
+            strategies, start_balance, growth, retirement_ages, budget_by_age(retirement_ages, spending_by_age),
+            real_estate_cashflow + social_security, real_return
+        )
+    }
 
-def deterministic_growth(initial_balance, annual_contribution, years, market_profile):
-    """Deterministic growth calculation."""
-    if market_profile == 'Conservative':
-        mean = 0.05
-    elif market_profile == 'Moderate':
-        mean = 0.07
-    else:  # Aggressive
-        mean = 0.09
+def tax_projection(inputs, current_age, spending_by_age, social_security_streams, market=None):
+    """
+    Project the plan's taxable, traditional and Roth accounts through age 100
+    with income taxes, year by year on expected returns and, when market
+    holds the Monte Carlo run's (returns, levels) from draw_market, across
+    those same paths too. With a rothConversionObjective the expected
+    projection also gets an optimized Roth conversion schedule. Figures are
+    in today's dollars.
+    """
+    tax_model = inputs['tax_model']
+    if tax_model not in TAX_MODELS:
+        raise ValueError(f"Unknown tax model: {tax_model}")
+    if inputs['contribution_account'] not in ACCOUNT_TYPES:
+        raise ValueError(f"Unknown contribution account: {inputs['contribution_account']}")
     
-    current_balance = initial_balance
+    market_profile = inputs['market_profile']
+    retirement_age = inputs['retirement_age']
+    inflation_model = inputs['inflation_model']
+    ages = np.arange(current_age, PLANNING_HORIZON_AGE)
+    working = ages < retirement_age
+    _, social_security = build_lifecycle_cashflows(
+        current_age, retirement_age, inputs['annual_contribution'], spending_by_age,
+        inputs['real_estate_cashflow'], social_security_streams, split_social_security=True
+    )
+    taxable = inputs['liquid_assets'] - inputs['traditional_assets'] - inputs['roth_assets']
+    basis = inputs['taxable_cost_basis']
+    accounts = {
+        'taxable': taxable,
+        'basis': taxable if basis is None else min(basis, taxable),
+        'traditional': inputs['traditional_assets'],
+        'roth': inputs['roth_assets']
+    }
+    plan = {
+        'accounts': accounts,
+        'contributions': np.where(working, inputs['annual_contribution'], 0.0),
+        'contribution_account': inputs['contribution_account'],
+        'spending': np.where(working, 0.0, budget_by_age(ages, spending_by_age)),
+        'income': np.where(working, 0.0, inputs['real_estate_cashflow']),
+        'social_security': social_security,
+        'ages': ages
+    }
+    options = {
+        'marital_status': inputs['marital_status'],
+        'state': inputs['state'],
+        'tax_model': tax_model,
+        'order': inputs['withdrawal_order'],
+        'rmd_age': rmd_start_age(inputs['birth_year'])
+    }
+    
+    def real_totals(projection, levels):
+        """Lifetime taxes and the after-tax value at 100 of each path, in today's dollars."""
+        federal = (projection['federal_tax'] / levels[:-1]).sum(axis=0)
+        state = (projection['state_tax'] / levels[:-1]).sum(axis=0)
+        ending = after_tax_value(*(projection[f'{account}_balance'][-1] for account in ACCOUNT_TYPES)) / levels[-1]
+        return federal, state, ending
     
-    for year in range(years):
-        current_balance = current_balance * (1 + mean) + annual_contribution
+    # The year-by-year schedule follows expected returns and expected inflation
+    rates = expected_returns(market_profile, ages, retirement_age, inputs['glide_path'], inputs['allocation'])
+    levels = market_price_levels(len(ages), 'none' if inflation_model == 'none' else 'deterministic',
+                                 inputs['inflation_rate'])
+    levels = np.ones((len(ages) + 1, 1)) if levels is None else levels
+    expected = simulate_tax_accounts(**plan, returns=rates[None, :], levels=levels, **options)
+    federal, state, ending = real_totals(expected, levels)
+    depleted = expected['ruined'][:, 0]
+    
+    def schedule(name):
+        # Flows are deflated by the year's price level, year-end balances by the next year's
+        values = expected[name][:, 0]
+        deflator = levels[1:, 0] if len(values) > len(ages) else levels[:-1, 0]
+        return (values[-len(ages):] / deflator).round().tolist()
+    
+    result = {
+        'taxModel': tax_model,
+        'filingStatus': filing_status(inputs['marital_status']),
+        'rmdAge': options['rmd_age'],
+        'lifetimeFederalTax': round(float(federal[0])),
+        'lifetimeStateTax': round(float(state[0])),
+        'afterTaxEndingBalance': round(float(ending[0])),
+        'depletionAge': int(ages[depleted.argmax()]) if depleted.any() else None,
+        'schedule': {
+            'ages': ages.tolist(),
+            **{f'{account}Balance': schedule(f'{account}_balance') for account in ACCOUNT_TYPES},
+            **{f'{account}Withdrawal': schedule(f'{account}_withdrawal') for account in ACCOUNT_TYPES},
+            'taxableSocialSecurity': schedule('taxable_social_security'),
+            'federalTax': schedule('federal_tax'),
+            'stateTax': schedule('state_tax')
+        },
+        'monteCarlo': None,
+        'rothConversions': None
+    }
     
-    return current_balance
+    # Conversions are planned on the same expected returns and prices as the schedule
+    if inputs['roth_conversion_objective']:
+        result['rothConversions'] = optimize_conversions(plan, rates, levels, retirement_age,
+                                                         inputs['roth_conversion_objective'], **options)
+    
+    if market is not None:
+        returns, levels = market
+        levels = np.ones((len(ages) + 1, 1)) if levels is None else levels
+        paths = simulate_tax_accounts(**plan, returns=returns, levels=levels, **options)
+        federal, state, ending = real_totals(paths, levels)
+        result['monteCarlo'] = {
+            'successProbability': round(float(1.0 - paths['ruined'][-1].mean()) * 100, 1),
+            'medianLifetimeTax': round(float(np.median(federal + state))),
+            'medianAfterTaxEndingBalance': round(float(np.median(ending)))
+        }
+    return result
+
+def deterministic_growth(initial_balance, annual_contribution, rates, monthly=False, levels=1.0):
+    """
+    Deterministic growth through the working years, each year at its own
+    expected return, optionally with monthly contributions. levels scales
+    each year's contribution to that year's price level.
+    """
+    rates = np.asarray(rates, dtype=float)
+    if not len(rates):
+        return float(initial_balance)
+    yearly = np.broadcast_to(annual_contribution * np.asarray(levels, dtype=float), rates.shape)
+    if monthly:
+        contributions = year_end_value(np.repeat(yearly[:, None] / MONTHS_PER_YEAR, MONTHS_PER_YEAR, axis=1), rates)
+    else:
+        contributions = yearly
+    return float(project_balances(initial_balance, rates, contributions)[-1])
 
 def calculate_safe_withdrawal(portfolio_balance):
     """Calculate safe withdrawal rate (4% rule)."""
@@ -1902,9 +993,6 @@ def estimate_healthcare_premiums(age, income, state, zip_code, tobacco_use=False
     - GitHub: https://github.com/Quantum-One-DLT/aca-marketplace-api-js
     """
     try:
-        # CMS Marketplace API endpoint for plan search
-        api_url = "https://marketplace.cms.gov/api/v1/plans/search"
-        
         # Prepare the API request payload according to CMS documentation
         payload = {
             "year": year,
@@ -1919,94 +1007,65 @@ def estimate_healthcare_premiums(age, income, state, zip_code, tobacco_use=False
             "limit": 50
         }
         
-        # Make the API request to CMS Marketplace
-        headers = {
-            'Content-Type': 'application/json',
-            'User-Agent': 'Retirement-Planning-App/1.0'
-        }
+        # Query the CMS Marketplace through the premium cache and the pooled,
+        # circuit-broken client; None means the API is unavailable and the
+        # fallback model applies
+        api_data = premium_cache.get_or_fetch(
+            premium_cache_key(state, zip_code, age, income, tobacco_use, year),
+            lambda: marketplace_client.search_plans(payload)
+        ) if state and zip_code else None
         
-        try:
-            response = requests.post(api_url, json=payload, headers=headers, timeout=10)
+        if api_data is not None:
+            # Extract premium information from the API response
+            premiums = {}
+            out_of_pocket_info = {}
+            
+            for plan in api_data.get('plans', []):
+                metal_level = plan.get('metal_level')
+                if metal_level not in premiums:
+                    premiums[metal_level] = {
+                        'monthly': plan.get('premium', 0),
+                        'annual': plan.get('premium', 0) * 12
+                    }
+                    out_of_pocket_info[metal_level] = {
+                        'deductible': plan.get('deductible', 0),
+                        'max_out_of_pocket': plan.get('max_out_of_pocket', 0)
+                    }
             
-            if response.status_code == 200:
-                # Parse the CMS API response
-                api_data = response.json()
+            # If API returns data, use it
+            if premiums:
+                # Calculate subsidies based on income and federal poverty level
+                fpl_single = 14580  # 2024 Federal Poverty Level for single person
+                subsidy_eligible = income <= fpl_single * 4  # 400% of FPL
                 
-                # Extract premium information from the API response
-                premiums = {}
-                out_of_pocket_info = {}
+                if subsidy_eligible:
+                    # Apply ACA subsidies to Silver plan
+                    subsidy_percentage = max(0, (fpl_single * 4 - income) / (fpl_single * 4))
+                    if 'Silver' in premiums:
+                        premiums['Silver']['monthly'] *= (1 - subsidy_percentage * 0.8)
+                        premiums['Silver']['annual'] = premiums['Silver']['monthly'] * 12
+                else:
+                    subsidy_percentage = 0
                 
-                for plan in api_data.get('plans', []):
-                    metal_level = plan.get('metal_level')
-                    if metal_level not in premiums:
-                        premiums[metal_level] = {
-                            'monthly': plan.get('premium', 0),
-                            'annual': plan.get('premium', 0) * 12
-                        }
-                        out_of_pocket_info[metal_level] = {
-                            'deductible': plan.get('deductible', 0),
-                            'max_out_of_pocket': plan.get('max_out_of_pocket', 0)
-                        }
+                # Determine recommended plan and estimated annual cost
+                recommended_tier = 'Silver' if subsidy_eligible else 'Bronze'
+                estimated_annual_cost = premiums[recommended_tier]['annual'] + out_of_pocket_info[recommended_tier]['deductible']
                 
-                # If API returns data, use it
-                if premiums:
-                    # Calculate subsidies based on income and federal poverty level
-                    fpl_single = 14580  # 2024 Federal Poverty Level for single person
-                    subsidy_eligible = income <= fpl_single * 4  # 400% of FPL
-                    
-                    if subsidy_eligible:
-                        # Apply ACA subsidies to Silver plan
-                        subsidy_percentage = max(0, (fpl_single * 4 - income) / (fpl_single * 4))
-                        if 'Silver' in premiums:
-                            premiums['Silver']['monthly'] *= (1 - subsidy_percentage * 0.8)
-                            premiums['Silver']['annual'] = premiums['Silver']['monthly'] * 12
-                    else:
-                        subsidy_percentage = 0
-                    
-                    # Determine recommended plan and estimated annual cost
-                    recommended_tier = 'Silver' if subsidy_eligible else 'Bronze'
-                    estimated_annual_cost = premiums[recommended_tier]['annual'] + out_of_pocket_info[recommended_tier]['deductible']
-                    
-                    return {
-                        'premiums': premiums,
-                        'out_of_pocket': out_of_pocket_info,
-                        'subsidy_eligible': subsidy_eligible,
-                        'subsidy_percentage': round(subsidy_percentage * 100, 1) if subsidy_eligible else 0,
-                        'estimated_annual_cost': estimated_annual_cost,
-                        'recommended_tier': recommended_tier,
-                        'source': 'CMS Marketplace API'
-                    }
-        
-        except requests.exceptions.RequestException as e:
-            print(f"API request failed: {e}")
-            # Fall through to fallback calculation
+                return {
+                    'premiums': premiums,
+                    'out_of_pocket': out_of_pocket_info,
+                    'subsidy_eligible': subsidy_eligible,
+                    'subsidy_percentage': round(subsidy_percentage * 100, 1) if subsidy_eligible else 0,
+                    'estimated_annual_cost': estimated_annual_cost,
+                    'recommended_tier': recommended_tier,
+                    'source': 'CMS Marketplace API'
+                }
         
         # Fallback calculation using realistic estimates based on CMS data patterns
         # This provides estimates when the API is unavailable or returns no data
         
-        # Base premium estimates by age and income (based on CMS marketplace data)
-        base_premiums = {
-            'Bronze': {
-                'monthly': 350 + (age - 50) * 15,  # Base + age adjustment
-                'annual': 0
-            },
-            'Silver': {
-                'monthly': 450 + (age - 50) * 20,
-                'annual': 0
-            },
-            'Gold': {
-                'monthly': 550 + (age - 50) * 25,
-                'annual': 0
-            },
-            'Platinum': {
-                'monthly': 700 + (age - 50) * 30,
-                'annual': 0
-            }
-        }
-        
-        # Calculate annual premiums
-        for tier in base_premiums:
-            base_premiums[tier]['annual'] = base_premiums[tier]['monthly'] * 12
+        # Unsubsidized premiums by age, state and tobacco use from the precompiled ACA rating tables
+        monthly = rating_tables.monthly_premiums(state, age, tobacco_use)
         
         # Income-based adjustments (ACA subsidies)
         fpl_single = 14580
@@ -2016,34 +1075,19 @@ def estimate_healthcare_premiums(age, income, state, zip_code, tobacco_use=False
             subsidy_threshold = fpl_single * 4
             subsidy_percentage = max(0, (subsidy_threshold - income) / subsidy_threshold)
             # Apply subsidies to Silver plan (most common for subsidies)
-            base_premiums['Silver']['monthly'] *= (1 - subsidy_percentage * 0.8)  # Max 80% subsidy
-            base_premiums['Silver']['annual'] = base_premiums['Silver']['monthly'] * 12
+            monthly = monthly.copy()
+            monthly[rating_tables.tiers.index('Silver')] *= (1 - subsidy_percentage * 0.8)  # Max 80% subsidy
         else:
             subsidy_percentage = 0
         
-        # Tobacco use adjustment (typically 50% increase)
-        if tobacco_use:
-            for tier in base_premiums:
-                base_premiums[tier]['monthly'] *= 1.5
-                base_premiums[tier]['annual'] *= 1.5
-        
-        # State-specific adjustments (based on CMS data patterns)
-        state_adjustments = {
-            'CA': 1.1, 'NY': 1.15, 'TX': 0.9, 'FL': 0.95, 'IL': 1.05,
-            'PA': 1.0, 'OH': 0.9, 'GA': 0.85, 'NC': 0.9, 'MI': 0.95
+        base_premiums = {
+            tier: {'monthly': float(monthly[i]), 'annual': float(monthly[i] * 12)}
+            for i, tier in enumerate(rating_tables.tiers)
         }
-        
-        if state in state_adjustments:
-            for tier in base_premiums:
-                base_premiums[tier]['monthly'] *= state_adjustments[state]
-                base_premiums[tier]['annual'] *= state_adjustments[state]
-        
-        # Add out-of-pocket maximums and deductibles (typical CMS values)
         out_of_pocket_info = {
-            'Bronze': {'deductible': 7000, 'max_out_of_pocket': 9100},
-            'Silver': {'deductible': 5000, 'max_out_of_pocket': 9100},
-            'Gold': {'deductible': 2000, 'max_out_of_pocket': 9100},
-            'Platinum': {'deductible': 0, 'max_out_of_pocket': 9100}
+            tier: {'deductible': float(rating_tables.deductible[i]),
+                   'max_out_of_pocket': float(rating_tables.max_out_of_pocket[i])}
+            for i, tier in enumerate(rating_tables.tiers)
         }
         
         # Determine recommended plan and estimated annual cost
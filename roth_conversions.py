@@ -0,0 +1,163 @@
+"""
+Roth conversion ladder optimizer.
+Chooses how much of the traditional account to convert to Roth in each year
+from retirement until RMDs start, either to minimize lifetime taxes or to
+maximize the after-tax value left at the planning horizon. Every candidate
+schedule is one column of a single simulate_tax_accounts run on the plan's
+expected returns, so a whole batch of schedules costs about as much as one.
+"""
+
+import numpy as np
+
+from taxes import (ACCOUNT_TYPES, HEIR_TAX_RATE, ORDINARY_BRACKETS, SENIOR_AGE, SENIOR_DEDUCTION, STANDARD_DEDUCTION,
+                   after_tax_value, filing_status, simulate_tax_accounts)
+
+CONVERSION_OBJECTIVES = ('lifetimeTaxes', 'afterTaxWealth')
+
+# Bracket-fill candidates top taxable ordinary income up to FILL_LEVELS evenly
+# spaced targets (plus every bracket edge) up to the top of the 32% bracket
+FILL_LEVELS = 40
+FILL_CEILING_BRACKET = 5
+
+# Level candidates convert the same amount every year of the window, up to
+# LEVEL_CEILING times the even split of the traditional balance at its start
+LEVEL_AMOUNTS = 24
+LEVEL_CEILING = 1.5
+
+# Coordinate refinement: each round moves every window year up or down by a
+# step (starting at the fill grid spacing) and halves the step when nothing improves
+REFINE_ROUNDS = 6
+
+
+def conversion_window(ages, retirement_age, rmd_age):
+    """Flags the years conversions are planned in: from retirement up to the year RMDs start."""
+    ages = np.asarray(ages)
+    return (ages >= retirement_age) & (ages < rmd_age)
+
+
+def _ordinary_deduction(ages, marital_status):
+    """Standard deduction of each year in today's dollars (an unmarried couple takes two single ones)."""
+    status = filing_status(marital_status)
+    deduction = STANDARD_DEDUCTION[status] + np.where(np.asarray(ages) >= SENIOR_AGE, SENIOR_DEDUCTION[status], 0.0)
+    return 2 * deduction if marital_status == 'couple' else deduction
+
+
+def optimize_conversions(plan, rates, levels, retirement_age, objective='lifetimeTaxes', **options):
+    """
+    Year-by-year Roth conversions for a plan, on expected returns.
+
+    plan holds simulate_tax_accounts' accounts and today's-dollar flows
+    (accounts, contributions, contribution_account, spending, income,
+    social_security and ages), rates the expected return of each year,
+    levels the (years + 1, 1) expected price levels and options the tax
+    options (marital_status, state, tax_model, order, rmd_age).
+
+    lifetimeTaxes counts federal and state tax plus the HEIR_TAX_RATE heirs
+    pay on the traditional balance left at the horizon, so deferring taxes
+    to them does not count as saving them; afterTaxWealth maximizes the
+    after-tax value at the horizon. Schedules that run the plan dry earlier
+    than converting nothing are ruled out. Candidates start from bracket-fill
+    and level-amount schedules, and the best is refined one year at a time.
+    Amounts are in today's dollars.
+    """
+    if objective not in CONVERSION_OBJECTIVES:
+        raise ValueError(f"Unknown conversion objective: {objective}")
+    ages = np.asarray(plan['ages'])
+    window = conversion_window(ages, retirement_age, options.get('rmd_age', 73))
+    rates = np.asarray(rates, dtype=float)
+    evaluations = 0
+
+    def evaluate(schedules):
+        """Score (n, years) conversion schedules; lower is better."""
+        nonlocal evaluations
+        evaluations += len(schedules)
+        returns = np.broadcast_to(rates, (len(schedules), len(ages)))
+        projection = simulate_tax_accounts(**plan, returns=returns, levels=levels,
+                                           conversions=np.ascontiguousarray(schedules.T), **options)
+        taxes = ((projection['federal_tax'] + projection['state_tax']) / levels[:-1]).sum(axis=0)
+        balances = [projection[f'{account}_balance'][-1] / levels[-1, 0] for account in ACCOUNT_TYPES]
+        lifetime = taxes + HEIR_TAX_RATE * balances[1]
+        wealth = after_tax_value(*balances)
+        score = lifetime if objective == 'lifetimeTaxes' else -wealth
+        return score, projection['ruined'].sum(axis=0), lifetime, wealth, projection
+
+    if not window.any():
+        return None
+    baseline = np.zeros((1, len(ages)))
+    _, base_ruined, base_lifetime, base_wealth, projection = evaluate(baseline)
+
+    # Ordinary income before conversions, from the plan without any
+    other = ((projection['traditional_withdrawal'] + projection['taxable_social_security'])[:, 0] / levels[:-1, 0]
+             + np.maximum(plan['income'], 0.0))
+    headroom = _ordinary_deduction(ages, options.get('marital_status')) - other
+    scale = 2 if options.get('marital_status') == 'couple' else 1
+    edges = ORDINARY_BRACKETS[filing_status(options.get('marital_status'))].thresholds[1:FILL_CEILING_BRACKET + 1]
+    targets = np.union1d(np.linspace(0.0, edges[-1], FILL_LEVELS), edges) * scale
+    fill_schedules = np.where(window, np.maximum(targets[:, None] + headroom, 0.0), 0.0)
+
+    start = np.flatnonzero(window)[0]
+    traditional = projection['traditional_balance'][start, 0] / levels[start, 0]
+    amounts = np.linspace(0.0, LEVEL_CEILING * traditional / window.sum(), LEVEL_AMOUNTS)
+    level_schedules = np.where(window, amounts[:, None], 0.0)
+
+    def feasible_scores(schedules):
+        score, ruined = evaluate(schedules)[:2]
+        return np.where(ruined > base_ruined[0], np.inf, score)
+
+    schedules = np.vstack([baseline, fill_schedules, level_schedules])
+    scores = feasible_scores(schedules)
+    schedule, score = schedules[scores.argmin()], scores.min()
+
+    # Coordinate refinement around the best schedule; the improving moves of
+    # a round are tried together in the next one
+    years = np.flatnonzero(window)
+    step = targets[1] - targets[0]
+    pending = None
+    for _ in range(REFINE_ROUNDS):
+        moves = np.repeat(schedule[None, :], 2 * len(years), axis=0)
+        moves[np.arange(len(years)), years] += step
+        moves[len(years) + np.arange(len(years)), years] -= step
+        np.maximum(moves, 0.0, out=moves)
+        batch = moves if pending is None else np.vstack([pending, moves])
+        scores = feasible_scores(batch)
+        best = int(scores.argmin())
+        if scores[best] >= score - 0.5:
+            pending = None
+            step /= 2
+            continue
+        pending = None
+        if best >= len(batch) - len(moves):
+            up, down = scores[-len(moves):-len(years)], scores[-len(years):]
+            combined = schedule.copy()
+            combined[years] += np.where((up < score) & (up <= down), step, 0.0)
+            combined[years] -= np.where((down < score) & (down < up), step, 0.0)
+            pending = np.maximum(combined, 0.0)[None, :]
+        schedule, score = batch[best], scores[best]
+
+    _, _, lifetime, wealth, final = evaluate(schedule[None, :])
+
+    def real(name):
+        return (final[name][window, 0] / levels[:-1][window, 0]).round().tolist()
+
+    return {
+        'objective': objective,
+        'startAge': int(ages[window][0]),
+        'endAge': int(ages[window][-1]),
+        'totalConverted': round(float((final['roth_conversion'][:, 0] / levels[:-1, 0]).sum())),
+        'lifetimeTax': round(float(lifetime[0])),
+        'afterTaxEndingBalance': round(float(wealth[0])),
+        'baseline': {
+            'lifetimeTax': round(float(base_lifetime[0])),
+            'afterTaxEndingBalance': round(float(base_wealth[0]))
+        },
+        'taxSavings': round(float(base_lifetime[0] - lifetime[0])),
+        'wealthGain': round(float(wealth[0] - base_wealth[0])),
+        'schedule': {
+            'ages': ages[window].tolist(),
+            'conversion': real('roth_conversion'),
+            'traditionalWithdrawal': real('traditional_withdrawal'),
+            'federalTax': real('federal_tax'),
+            'stateTax': real('state_tax')
+        },
+        'evaluations': evaluations
+    }
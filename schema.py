@@ -0,0 +1,154 @@
+"""
+Request schema for retirement plan calculations.
+Shared by the HTML form handler and the JSON API so both accept the same
+field names and coerce them the same way.
+"""
+
+import math
+from datetime import datetime
+
+from inflation import INFLATION_MEAN
+from monthly import parse_time_step
+from portfolio import parse_allocation, parse_glide_path
+from simulation import PLANNING_HORIZON_AGE
+from withdrawals import parse_strategies
+
+
+def _to_bool(value):
+    """Accept real booleans as well as the 'true'/'false' strings the form sends."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('true', '1', 'yes', 'on')
+
+
+# Field name -> (python name, type, required, default)
+PLAN_FIELDS = {
+    'maritalStatus': ('marital_status', str, False, 'single'),
+    'birthYear': ('birth_year', int, True, None),
+    'retirementAge': ('retirement_age', int, True, None),
+    'liquidAssets': ('liquid_assets', float, True, None),
+    'realEstateCashflow': ('real_estate_cashflow', float, False, 0.0),
+    'annualIncome': ('annual_income', float, True, None),
+    'yearsWorked': ('years_worked', int, True, None),
+    'annualContribution': ('annual_contribution', float, False, 0.0),
+    'marketProfile': ('market_profile', str, False, 'Moderate'),
+    # A custom {stocks, bonds, cash, realEstate} mix replaces the profile's preset
+    'allocation': ('allocation', parse_allocation, False, None),
+    'glidePath': ('glide_path', parse_glide_path, False, 'static'),
+    'calculationMethod': ('calculation_method', str, False, 'deterministic'),
+    'seed': ('seed', int, False, None),
+    'timeStep': ('time_step', parse_time_step, False, 'annual'),
+    # Inputs are in today's dollars; see inflation.INFLATION_MODELS
+    'inflationModel': ('inflation_model', str, False, 'deterministic'),
+    'inflationRate': ('inflation_rate', float, False, INFLATION_MEAN),
+    # 'all' or a list of withdrawals.WITHDRAWAL_STRATEGIES to compare side by side
+    'withdrawalStrategies': ('withdrawal_strategies', parse_strategies, False, None),
+    # Tax-aware projection (see taxes.TAX_MODELS); liquidAssets outside the
+    # traditional and Roth accounts is taxable, at cost basis unless given
+    'taxModel': ('tax_model', str, False, 'none'),
+    'traditionalAssets': ('traditional_assets', float, False, 0.0),
+    'rothAssets': ('roth_assets', float, False, 0.0),
+    'taxableCostBasis': ('taxable_cost_basis', float, False, None),
+    'contributionAccount': ('contribution_account', str, False, 'traditional'),
+    'withdrawalOrder': ('withdrawal_order', str, False, 'conventional'),
+    # Plan Roth conversions from retirement to RMD age (see roth_conversions.CONVERSION_OBJECTIVES)
+    'rothConversionObjective': ('roth_conversion_objective', str, False, None),
+    # Claim ages may be fractional (66.3333 = 66 years 4 months)
+    'socialSecurityClaimAge': ('social_security_claim_age', float, True, None),
+    'claimingObjective': ('claiming_objective', str, False, 'lifetimeBenefits'),
+    'spouseBirthYear': ('spouse_birth_year', int, False, None),
+    'bothWorking': ('both_working', str, False, None),
+    'spouseAnnualIncome': ('spouse_annual_income', float, False, None),
+    'spouseYearsWorked': ('spouse_years_worked', int, False, None),
+    'spouseAnnualContribution': ('spouse_annual_contribution', float, False, None),
+    'spouseSocialSecurityClaimAge': ('spouse_social_security_claim_age', float, False, None),
+    'housing': ('housing', float, True, None),
+    'healthcare': ('healthcare', float, False, None),
+    'state': ('state', str, False, None),
+    'zipCode': ('zip_code', str, False, None),
+    'tobaccoUse': ('tobacco_use', _to_bool, False, False),
+    'foodLiving': ('food_living', float, True, None),
+    'travelLeisure': ('travel_leisure', float, True, None),
+    'otherDiscretionary': ('other_discretionary', float, True, None)
+}
+
+
+def _coerce(field, field_type, value):
+    """Convert one raw value, turning conversion failures into a readable error."""
+    try:
+        if field_type is int and isinstance(value, str):
+            # Form inputs can arrive as "65.0"; accept them when they are whole numbers
+            number = float(value)
+            if not number.is_integer():
+                raise ValueError
+            return int(number)
+        return field_type(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for {field}: {value!r}")
+
+
+def _parse_whole_number(field, value, default, lowest, highest):
+    """Validate a whole-number request field from lowest to highest, default when missing."""
+    if value is None or (isinstance(value, str) and value.strip() == ''):
+        return default
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"Invalid value for {field}: {value!r}")
+    number = _coerce(field, int, value)
+    if not lowest <= number <= highest:
+        raise ValueError(f"{field} must be between {lowest} and {highest}")
+    return number
+
+
+def parse_path_count(value, default, limit):
+    """Validate a request's Monte Carlo path count: a whole number from 1 to limit, default when missing."""
+    return _parse_whole_number('paths', value, default, 1, limit)
+
+
+def parse_amount(field, value, default=0.0):
+    """Validate a request's dollar amount: a finite, non-negative number, default when missing."""
+    if value is None or (isinstance(value, str) and value.strip() == ''):
+        return default
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid value for {field}: {value!r}")
+    amount = _coerce(field, float, value)
+    if not math.isfinite(amount) or amount < 0:
+        raise ValueError(f"{field} must be a finite amount of at least 0")
+    return amount
+
+
+def parse_latest_age(value, default, current_age):
+    """Validate the retirement age solver's latestAge: a whole age from today to PLANNING_HORIZON_AGE."""
+    return _parse_whole_number('latestAge', value, default, current_age, PLANNING_HORIZON_AGE)
+
+
+def parse_plan_inputs(data):
+    """
+    Validate and coerce a mapping of plan fields (form data or JSON object).
+
+    Empty strings count as missing. Returns a dict keyed by python names;
+    raises ValueError naming the first missing or invalid field.
+    """
+    inputs = {}
+    for field, (name, field_type, required, default) in PLAN_FIELDS.items():
+        value = data.get(field)
+        if value is None or (isinstance(value, str) and value.strip() == ''):
+            if required:
+                raise ValueError(f"Missing required field: {field}")
+            inputs[name] = default
+        else:
+            inputs[name] = _coerce(field, field_type, value)
+    
+    # Plans run from today to PLANNING_HORIZON_AGE, so retirement has to fall inside them
+    current_age = datetime.now().year - inputs['birth_year']
+    if not current_age <= inputs['retirement_age'] <= PLANNING_HORIZON_AGE:
+        raise ValueError(f"retirementAge must be between the current age ({current_age}) and {PLANNING_HORIZON_AGE}")
+    if inputs['traditional_assets'] + inputs['roth_assets'] > inputs['liquid_assets']:
+        raise ValueError("traditionalAssets and rothAssets cannot exceed liquidAssets")
+    if inputs['roth_conversion_objective'] and inputs['tax_model'] == 'none':
+        raise ValueError("rothConversionObjective needs a taxModel")
+    
+    # A non-working spouse's benefit depends on their age
+    spouse_earns = inputs['both_working'] == 'both' and inputs['spouse_annual_income'] and inputs['spouse_years_worked']
+    if inputs['marital_status'] != 'single' and not spouse_earns and inputs['spouse_birth_year'] is None:
+        raise ValueError("Missing required field: spouseBirthYear")
+    return inputs
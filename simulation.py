@@ -0,0 +1,397 @@
+"""
+Monte Carlo simulation engine for the Retirement Planning Calculator.
+Simulates many portfolio paths at once as a (paths x years) return matrix.
+Each year of a path draws one portfolio shock and one CPI shock; the mix's
+mean, volatility and CPI covariance turn them into that year's return, so
+the draws do not grow with the number of asset classes.
+"""
+
+import numpy as np
+
+from historical import historical_returns
+from inflation import (ASSET_INFLATION_COVARIANCES, INFLATION_MEAN, INFLATION_MODELS, cola_levels, expected_inflation,
+                       inflation_paths, price_levels)
+from monthly import MONTHS_PER_YEAR, month_ages, social_security_by_month
+from portfolio import ALLOCATION_PRESETS, ASSET_CLASSES, portfolio_moments, preset_allocation
+
+# Annual return assumptions (mean, volatility) of each market profile's preset mix
+MARKET_PROFILES = {
+    name: dict(zip(('mean', 'std_dev'), map(float, portfolio_moments(weights))))
+    for name, weights in ALLOCATION_PRESETS.items()
+}
+
+# Historical data has only stocks and bonds: real estate is sampled as stocks, cash as bonds
+HISTORICAL_STOCK_ASSETS = np.array([asset in ('stocks', 'realEstate') for asset in ASSET_CLASSES])
+
+# 'normal' draws independent returns around the profile mean; 'historical'
+# block-bootstraps the bundled real return history
+RETURN_MODELS = ('normal', 'historical')
+
+# Consecutive historical years sampled together, so paths keep the runs of
+# good and bad years (and inflation spells) that drive sequence risk
+BLOCK_YEARS = 5
+
+# Percentile bands reported for every simulated year
+PERCENTILES = (5, 25, 50, 75, 95)
+
+DEFAULT_PATHS = 10000
+
+# Every lifecycle simulation runs through this age
+PLANNING_HORIZON_AGE = 100
+
+# Paths drawn per spawned RNG stream; fixed so a seed reproduces bit-identical
+# results however the chunks are scheduled
+CHUNK_PATHS = 2500
+
+# Worst single-year loss allowed in a draw, so a balance can never flip sign
+MIN_RETURN = -0.99
+
+
+def get_market_assumptions(market_profile):
+    """Return (mean, std_dev) for a market profile, defaulting to Aggressive like the form handler."""
+    assumptions = MARKET_PROFILES.get(market_profile, MARKET_PROFILES['Aggressive'])
+    return assumptions['mean'], assumptions['std_dev']
+
+
+def static_allocations(market_profile, years):
+    """(years, assets) weights holding a market profile's preset mix every year."""
+    return np.broadcast_to(preset_allocation(market_profile), (years, len(ASSET_CLASSES)))
+
+
+def resolve_seed(seed=None):
+    """Return the seed to use, drawing a fresh one from OS entropy when none is given."""
+    if seed is None:
+        return int(np.random.SeedSequence().generate_state(1, np.uint32)[0])
+    return int(seed)
+
+
+def _chunk_generators(n_paths, seed):
+    """
+    Yield (row slice, generator) for each block of CHUNK_PATHS paths.
+
+    Each block gets its own PCG64 stream spawned from the seed, so chunks are
+    independent and could be filled in parallel.
+    """
+    n_chunks = -(-n_paths // CHUNK_PATHS)
+    for chunk, stream in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        yield slice(chunk * CHUNK_PATHS, (chunk + 1) * CHUNK_PATHS), np.random.Generator(np.random.PCG64(stream))
+
+
+def draw_shocks(n_paths, years, seed):
+    """
+    Draw independent (n_paths, years) standard normal portfolio shocks and
+    standardized CPI shocks. They do not depend on the allocation, so every
+    mix priced from them (see portfolio_returns) shares the same market luck.
+    """
+    portfolio_shocks = np.empty((n_paths, years))
+    cpi_shocks = np.empty((n_paths, years))
+    for rows, rng in _chunk_generators(n_paths, seed):
+        rng.standard_normal(out=portfolio_shocks[rows])
+        rng.standard_normal(out=cpi_shocks[rows])
+    return portfolio_shocks, cpi_shocks
+
+
+def portfolio_returns(portfolio_shocks, cpi_shocks, allocations):
+    """
+    (n_paths, years) returns of a portfolio rebalanced every year to the
+    (years, assets) allocations, from draw_shocks' shocks.
+
+    Each year's return is normal with the mix's mean and volatility (see
+    portfolio.portfolio_moments); the part of its variance that covaries with
+    CPI loads on the CPI shock and the rest on the portfolio shock.
+    """
+    years = portfolio_shocks.shape[-1]
+    allocations = np.broadcast_to(np.asarray(allocations, dtype=float), (years, len(ASSET_CLASSES)))
+    means, volatilities = portfolio_moments(allocations)
+    cpi_loading = allocations @ ASSET_INFLATION_COVARIANCES
+    residual = np.sqrt(np.maximum(volatilities ** 2 - cpi_loading ** 2, 0.0))
+
+    returns = portfolio_shocks * residual
+    returns += cpi_shocks * cpi_loading
+    returns += means
+    return np.maximum(returns, MIN_RETURN, out=returns)
+
+
+def draw_returns(n_paths, years, allocations, seed):
+    """
+    Draw an (n_paths, years) matrix of portfolio returns and the matching CPI shocks.
+    allocations is a (years, assets) weight matrix, rebalanced every year.
+    """
+    portfolio_shocks, cpi_shocks = draw_shocks(n_paths, years, seed)
+    return portfolio_returns(portfolio_shocks, cpi_shocks, allocations), cpi_shocks
+
+
+def draw_historical_returns(n_paths, years, allocations, seed, block_years=BLOCK_YEARS, nominal=False):
+    """
+    Draw an (n_paths, years) matrix of returns by circular block bootstrap,
+    with the CPI inflation of the same historical years.
+
+    Each path strings together blocks of block_years consecutive historical
+    years from random start years, wrapping from the last year back to the
+    first. Start years are drawn per chunk from spawned streams like
+    draw_returns, and the years are gathered with one fancy index per chunk.
+    allocations is a (years, assets) weight matrix, rebalanced every year.
+    Returns are real unless nominal=True.
+    """
+    allocations = np.broadcast_to(np.asarray(allocations, dtype=float), (years, len(ASSET_CLASSES)))
+    stock_share = allocations[:, HISTORICAL_STOCK_ASSETS].sum(axis=1)
+    n_history = len(historical_returns)
+    n_blocks = -(-years // block_years)
+    offsets = np.arange(block_years)
+
+    sample = historical_returns.nominal_portfolio_returns if nominal else historical_returns.real_portfolio_returns
+    returns = np.empty((n_paths, years))
+    inflation = np.empty((n_paths, years))
+    for rows, rng in _chunk_generators(n_paths, seed):
+        starts = rng.integers(0, n_history, size=(len(returns[rows]), n_blocks))
+        index = ((starts[:, :, None] + offsets) % n_history).reshape(len(starts), -1)[:, :years]
+        returns[rows] = sample(stock_share, index)
+        inflation[rows] = historical_returns.inflation[index]
+
+    return returns, inflation
+
+
+def simulate_balances(initial_balance, cashflows, returns, levels=None, cola_cashflows=None):
+    """
+    Roll every path forward through the return matrix.
+
+    cashflows is a scalar or a length-years array added at the end of each year
+    (contributions positive, net spending negative). Depleted paths stay at zero.
+    With levels, a (years + 1, n_paths) price-level matrix (see
+    inflation.price_levels), cashflows are in today's dollars and paid at each
+    path's price level, and cola_cashflows (Social Security) at the previous
+    year's level; without levels both are added as given. Returns a (years + 1, n_paths) balance matrix whose first row
+    is the start; it is stored year-major so each year's slice is contiguous.
+    """
+    n_paths, years = returns.shape
+    cashflows = np.broadcast_to(np.asarray(cashflows, dtype=float), (years,))
+    cola_cashflows = np.broadcast_to(np.asarray(0.0 if cola_cashflows is None else cola_cashflows, dtype=float),
+                                     (years,))
+    cola_index = None if levels is None else cola_levels(levels.T).T
+    growth = np.ascontiguousarray(returns.T) + 1.0
+
+    balances = np.empty((years + 1, n_paths))
+    balances[0] = initial_balance
+
+    for year in range(years):
+        np.multiply(balances[year], growth[year], out=balances[year + 1])
+        if levels is None:
+            balances[year + 1] += cashflows[year] + cola_cashflows[year]
+        else:
+            balances[year + 1] += cashflows[year] * levels[year] + cola_cashflows[year] * cola_index[year]
+        np.maximum(balances[year + 1], 0.0, out=balances[year + 1])
+
+    return balances
+
+
+def simulate_monthly_balances(initial_balance, monthly_cashflows, returns, levels=None, cola_cashflows=None):
+    """
+    Roll every path forward month by month.
+
+    monthly_cashflows is a (years, 12) matrix added at the end of each month;
+    each year's drawn return is compounded in 12 equal monthly steps, and
+    levels and cola_cashflows index the flows as in simulate_balances, with
+    prices fixed within a year. Returns the year-end (years + 1, n_paths)
+    balance matrix and a (years, n_paths) flag of paths that ran dry at any
+    month of each year.
+    """
+    n_paths, years = returns.shape
+    cola_cashflows = np.zeros_like(monthly_cashflows) if cola_cashflows is None else cola_cashflows
+    cola_index = None if levels is None else cola_levels(levels.T).T
+    monthly_growth = np.ascontiguousarray(returns.T) + 1.0
+    np.power(monthly_growth, 1 / MONTHS_PER_YEAR, out=monthly_growth)
+
+    balances = np.empty((years + 1, n_paths))
+    balances[0] = initial_balance
+    ruined = np.empty((years, n_paths), dtype=bool)
+    current = balances[0].copy()
+    depleted = np.zeros(n_paths, dtype=bool)
+
+    for year in range(years):
+        if levels is None:
+            flows = monthly_cashflows[year] + cola_cashflows[year]
+        else:
+            flows = monthly_cashflows[year][:, None] * levels[year] + cola_cashflows[year][:, None] * cola_index[year]
+        for month in range(MONTHS_PER_YEAR):
+            current *= monthly_growth[year]
+            current += flows[month]
+            np.maximum(current, 0.0, out=current)
+            depleted |= current <= 0
+        balances[year + 1] = current
+        ruined[year] = depleted
+
+    return balances, ruined
+
+
+def percentile_bands(balances, percentiles=PERCENTILES):
+    """
+    Linear-interpolated percentiles of every year in a (years + 1, n_paths) matrix.
+
+    Sorting each contiguous year once is several times faster than np.percentile's
+    multi-kth partition for the handful of bands we report.
+    """
+    ordered = np.sort(balances, axis=1)
+    positions = np.asarray(percentiles, dtype=float) / 100 * (ordered.shape[1] - 1)
+    lower = np.floor(positions).astype(int)
+    upper = np.minimum(lower + 1, ordered.shape[1] - 1)
+    weight = positions - lower
+    return ordered[:, lower] * (1 - weight) + ordered[:, upper] * weight
+
+
+def summarize_paths(balances, ruined=None, levels=None):
+    """
+    Summarize a balance matrix into percentile bands, success probability and median ending balance.
+
+    ruined optionally gives the (years, n_paths) cumulative ruin flags when
+    paths were checked more often than the year ends in balances. With the
+    paths' price levels, the same figures are also reported in today's dollars.
+    """
+    bands = percentile_bands(balances)
+    # A path is ruined from the first year it runs out of money, even if income later refills it
+    if ruined is None:
+        ruined = np.logical_or.accumulate(balances[1:] <= 0, axis=0)
+    ruin_curve = ruined.mean(axis=1) if len(ruined) else np.zeros(0)
+    median_index = PERCENTILES.index(50)
+
+    summary = {
+        'percentiles': {f'p{p}': bands[:, i].round().tolist() for i, p in enumerate(PERCENTILES)},
+        'ruin_probability': [0.0] + ruin_curve.round(4).tolist(),
+        'success_probability': float(1.0 - ruin_curve[-1]) if len(ruin_curve) else 1.0,
+        'median_ending_balance': float(bands[-1, median_index]),
+        'median_balances': bands[:, median_index],
+        'paths': int(balances.shape[1]),
+        'years': int(balances.shape[0] - 1)
+    }
+    if levels is not None:
+        # Balance rows line up with the price levels: row t is deflated by levels[t]
+        real_bands = percentile_bands(balances / levels)
+        summary['real_percentiles'] = {f'p{p}': real_bands[:, i].round().tolist() for i, p in enumerate(PERCENTILES)}
+        summary['real_median_ending_balance'] = float(real_bands[-1, median_index])
+        summary['real_median_balances'] = real_bands[:, median_index]
+    return summary
+
+
+def budget_by_age(ages, annual_budget):
+    """
+    Spending at each age from a flat annual budget or a per-age budget array.
+
+    Per-age budgets are indexed by age (0 ... PLANNING_HORIZON_AGE) along the
+    last axis; a 2-D budget holds one row per scenario and is read row-wise.
+    """
+    annual_budget = np.asarray(annual_budget, dtype=float)
+    if annual_budget.ndim == 0:
+        return np.broadcast_to(annual_budget, np.shape(ages))
+    age_index = np.clip(np.asarray(ages), 0, annual_budget.shape[-1] - 1).astype(int)
+    if annual_budget.ndim == 1:
+        return annual_budget[age_index]
+    age_index = np.broadcast_to(age_index, annual_budget.shape[:-1] + age_index.shape[-1:])
+    return np.take_along_axis(annual_budget, age_index, axis=-1)
+
+
+def build_lifecycle_cashflows(current_age, retirement_age, annual_contribution, annual_budget,
+                              real_estate_cashflow, social_security_streams, end_age=PLANNING_HORIZON_AGE,
+                              monthly=False, split_social_security=False):
+    """
+    Net portfolio cashflow for every year from current_age up to end_age.
+
+    Working years add the annual contribution; retirement years add real estate
+    income and each Social Security stream from its start age, less the budget
+    (flat or per-age, see budget_by_age). social_security_streams is a list of
+    (start_age, annual_benefit) pairs. With monthly=True the result is a
+    (years, 12) matrix of monthly cashflows, so retirement and claim ages take
+    effect in their month. split_social_security returns (other cashflows,
+    Social Security) separately, for indexing benefits by COLA.
+    """
+    ages = np.arange(current_age, end_age)
+    if monthly:
+        months = month_ages(ages)
+        working = months < round(retirement_age * MONTHS_PER_YEAR)
+        other = np.where(working, annual_contribution, real_estate_cashflow
+                         - budget_by_age(months // MONTHS_PER_YEAR, annual_budget)) / MONTHS_PER_YEAR
+        social_security = np.where(working, 0.0, social_security_by_month(months, social_security_streams))
+    else:
+        working = ages < retirement_age
+        other = np.where(working, annual_contribution, real_estate_cashflow - budget_by_age(ages, annual_budget))
+        social_security = np.zeros(len(ages))
+        for start_age, annual_benefit in social_security_streams:
+            social_security += np.where(~working & (ages >= start_age), annual_benefit, 0.0)
+
+    if split_social_security:
+        return other, social_security
+    return other + social_security
+
+
+def market_price_levels(years, inflation_model, inflation_rate=INFLATION_MEAN, inflation=None):
+    """
+    (years + 1, n_paths) price levels from drawn (n_paths, years) CPI paths
+    for 'stochastic', or one expected-rate column for 'deterministic'; None
+    when inflation is off.
+    """
+    if inflation_model == 'none':
+        return None
+    if inflation_model == 'deterministic':
+        inflation = expected_inflation(years, inflation_model, inflation_rate)[None, :]
+    return np.ascontiguousarray(price_levels(inflation).T)
+
+
+def draw_market(n_paths, years, market_profile, seed, return_model='normal', allocations=None,
+                inflation_model='none', inflation_rate=INFLATION_MEAN):
+    """
+    Draw the (n_paths, years) portfolio returns and (years + 1, n_paths) price
+    levels one simulation runs on; levels is None when inflation is off.
+
+    Returns come from return_model (see RETURN_MODELS) on the (years, assets)
+    allocations, the profile's preset by default. CPI is drawn jointly with
+    the returns for 'stochastic' (the sampled years' CPI in historical mode)
+    or fixed at the expected rate for 'deterministic'. Historical returns are
+    sampled in real terms unless CPI is stochastic; under 'deterministic'
+    they are re-inflated at the expected rate, so nominal returns and prices
+    rise together rather than pairing history's CPI with a different rate.
+    """
+    if return_model not in RETURN_MODELS:
+        raise ValueError(f"Unknown return model: {return_model}")
+    if inflation_model not in INFLATION_MODELS:
+        raise ValueError(f"Unknown inflation model: {inflation_model}")
+    if allocations is None:
+        allocations = static_allocations(market_profile, years)
+    if return_model == 'historical':
+        returns, inflation = draw_historical_returns(n_paths, years, allocations, seed,
+                                                     nominal=inflation_model == 'stochastic')
+        if inflation_model == 'deterministic':
+            returns = (1 + returns) * (1 + expected_inflation(years, inflation_model, inflation_rate)) - 1
+    else:
+        returns, shocks = draw_returns(n_paths, years, allocations, seed)
+        inflation = inflation_paths(shocks, inflation_rate) if inflation_model == 'stochastic' else None
+    return returns, market_price_levels(years, inflation_model, inflation_rate, inflation)
+
+
+def run_simulation(initial_balance, cashflows, years, market_profile, n_paths=DEFAULT_PATHS, seed=None,
+                   return_model='normal', allocations=None, inflation_model='none', inflation_rate=INFLATION_MEAN,
+                   cola_cashflows=None, market=None):
+    """
+    Run a vectorized Monte Carlo simulation and return its summary, echoing the seed used.
+    A (years, 12) cashflow matrix runs the monthly engine on the same annual draws.
+    return_model picks the return draws (see RETURN_MODELS); allocations is
+    the (years, assets) mix held each year, the profile's preset by default.
+
+    With an inflation_model other than 'none', cashflows are in today's
+    dollars and cola_cashflows holds Social Security separately. Each path is
+    priced with its own CPI path (see draw_market) and the summary adds
+    figures in today's dollars. market is a (returns, levels) pair already
+    drawn by draw_market from seed, so other projections can share the paths.
+    """
+    seed = resolve_seed(seed)
+    if market is None:
+        market = draw_market(n_paths, years, market_profile, seed, return_model, allocations,
+                             inflation_model, inflation_rate)
+    returns, levels = market
+
+    if np.ndim(cashflows) == 2:
+        balances, ruined = simulate_monthly_balances(initial_balance, cashflows, returns, levels, cola_cashflows)
+    else:
+        balances, ruined = simulate_balances(initial_balance, cashflows, returns, levels, cola_cashflows), None
+    summary = summarize_paths(balances, ruined, levels)
+    summary['seed'] = seed
+    summary['return_model'] = return_model
+    summary['inflation_model'] = inflation_model
+    return summary
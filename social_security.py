@@ -0,0 +1,69 @@
+"""
+Vectorized Social Security benefit math.
+calculate_social_security_benefit in retirement_app.py uses the same claim
+adjustment; these versions accept arrays, so many scenarios or claim ages can
+be evaluated in one call.
+"""
+
+import numpy as np
+
+FULL_RETIREMENT_AGE = 67
+
+# Earliest and latest ages at which claiming changes the benefit
+MIN_CLAIM_AGE = 62
+MAX_CLAIM_AGE = 70
+
+# Delayed retirement credit per month after FRA (132% of the FRA benefit at 70)
+DELAYED_CREDIT_PER_MONTH = 0.32 / 36
+
+# 2024 Social Security Maximum Benefit at FRA (age 67): $45,864/year
+MAX_FRA_BENEFIT = 45864
+
+# Years of earnings that count as a full career
+FULL_CAREER_YEARS = 35
+
+
+def fra_benefit(annual_income, years_worked):
+    """Primary Insurance Amount: ~40% of income, prorated by career length and capped."""
+    benefit = np.asarray(annual_income, dtype=float) * 0.4
+    benefit = benefit * np.minimum(np.asarray(years_worked, dtype=float) / FULL_CAREER_YEARS, 1)
+    return np.minimum(benefit, MAX_FRA_BENEFIT)
+
+
+def claim_adjustment(claim_age):
+    """
+    Share of the FRA benefit paid when claiming at claim_age (fractional years allowed).
+
+    Early claims follow the SSA schedule (5/9% per month for the first 36
+    months before FRA, 5/12% per month beyond), giving 70% at 62. Delayed
+    credits accrue linearly to 132% at 70 and stop there.
+    """
+    claim_age = np.minimum(np.asarray(claim_age, dtype=float), MAX_CLAIM_AGE)
+    months_early = np.maximum((FULL_RETIREMENT_AGE - claim_age) * 12, 0)
+    months_late = np.maximum((claim_age - FULL_RETIREMENT_AGE) * 12, 0)
+    reduction = np.minimum(months_early, 36) * 5 / 900 + np.maximum(months_early - 36, 0) * 5 / 1200
+    # Rounded so whole-year claim ages land exactly on 70% / 100% / 132%
+    return np.round(1 - reduction + months_late * DELAYED_CREDIT_PER_MONTH, 10)
+
+
+def spousal_claim_adjustment(claim_age):
+    """Share of the full spousal benefit paid at claim_age: 25/36% per month for 36 months early, 5/12% beyond."""
+    months_early = np.maximum((FULL_RETIREMENT_AGE - np.asarray(claim_age, dtype=float)) * 12, 0)
+    reduction = np.minimum(months_early, 36) * 25 / 3600 + np.maximum(months_early - 36, 0) * 5 / 1200
+    return np.round(1 - reduction, 10)
+
+
+def social_security_benefit(annual_income, years_worked, claim_age):
+    """Annual benefit in whole dollars for each income / career / claim-age combination."""
+    return np.rint(fra_benefit(annual_income, years_worked) * claim_adjustment(claim_age))
+
+
+def spousal_benefit(working_spouse_benefit, non_working_spouse_birth_year, current_year):
+    """Spousal benefit in whole dollars: half the worker's benefit, reduced 3% per year before FRA."""
+    non_working_spouse_age = current_year - np.asarray(non_working_spouse_birth_year)
+    reduction = np.where(
+        non_working_spouse_age < FULL_RETIREMENT_AGE,
+        (FULL_RETIREMENT_AGE - non_working_spouse_age) * 0.03,
+        0.0
+    )
+    return np.rint(np.asarray(working_spouse_benefit, dtype=float) * 0.5 * (1 - reduction))
@@ -0,0 +1,279 @@
+"""
+Plan solvers for the Retirement Planning Calculator.
+Instead of resubmitting a plan with guessed inputs, a solver searches for the
+input value that meets a target. Every candidate is scored on one set of
+pre-drawn market paths (common random numbers), so the search is smooth and
+repeatable and no candidate pays for its own return draws.
+"""
+
+import numpy as np
+
+from inflation import budget_growth_by_age, budget_lines_by_age, cola_levels, inflation_paths, plan_budget_lines
+from portfolio import allocation_path
+from simulation import (DEFAULT_PATHS, PLANNING_HORIZON_AGE, budget_by_age, build_lifecycle_cashflows, draw_market,
+                        draw_shocks, market_price_levels, portfolio_returns, resolve_seed)
+
+# Success probabilities reported on the spending curve, in percent
+SPENDING_CURVE_TARGETS = (50, 75, 90, 95, 99)
+
+# The retirement age solver tries every age from today up to this one
+LATEST_RETIREMENT_AGE = 80
+
+# Spending bisection stops once every path's bracket is narrower than this (today's dollars)
+SPENDING_TOLERANCE = 1.0
+MAX_BISECTIONS = 60
+
+# Upper bound on simulated paths per solve, which keeps one request inside its time budget
+MAX_SOLVER_PATHS = 20000
+
+
+class PathSet:
+    """
+    Pre-drawn market paths a solver scores every candidate on.
+
+    growth is the (years, n_paths) gross return of each year, levels the
+    (years + 1, n_paths) price levels (one column when they are the same for
+    every path) and cola_index the Social Security index of each year.
+    """
+
+    def __init__(self, returns, levels=None):
+        self.n_paths, self.years = returns.shape
+        self.growth = np.ascontiguousarray(returns.T) + 1.0
+        self.levels = np.ones((self.years + 1, 1)) if levels is None else levels
+        self.cola_index = cola_levels(self.levels.T).T
+
+    def survives(self, initial_balance, cashflows, cola_cashflows, ending_balance=0.0, paths=slice(None)):
+        """
+        Flag the paths that never run dry and end with at least ending_balance in today's dollars.
+
+        cashflows and cola_cashflows are (years,) or (years, n) today's-dollar
+        flows added at the end of each year, priced like simulate_balances;
+        paths selects which drawn paths (columns) they run on.
+        """
+        growth = self.growth[:, paths]
+        balances = np.broadcast_to(np.asarray(initial_balance, dtype=float), growth.shape[1:]).copy()
+        alive = np.ones(balances.shape, dtype=bool)
+        levels = self.levels[:, paths] if self.levels.shape[1] > 1 else self.levels
+        cola_index = self.cola_index[:, paths] if self.cola_index.shape[1] > 1 else self.cola_index
+        for year in range(self.years):
+            balances *= growth[year]
+            balances += cashflows[year] * levels[year] + cola_cashflows[year] * cola_index[year]
+            alive &= balances > 0
+            np.maximum(balances, 0.0, out=balances)
+        return alive & (balances >= ending_balance * levels[-1])
+
+
+def _check_paths(n_paths):
+    if not 1 <= n_paths <= MAX_SOLVER_PATHS:
+        raise ValueError(f"paths must be between 1 and {MAX_SOLVER_PATHS}")
+
+
+def plan_paths(inputs, current_age, n_paths=DEFAULT_PATHS, seed=None, retirement_age=None):
+    """
+    Draw the plan's market paths from today to PLANNING_HORIZON_AGE.
+
+    Returns follow the plan's calculation method (historical bootstrap, else
+    normal draws), allocation and glide path for retirement_age (the plan's
+    own by default), priced with its inflation model.
+    """
+    retirement_age = inputs['retirement_age'] if retirement_age is None else retirement_age
+    ages = np.arange(current_age, PLANNING_HORIZON_AGE)
+    allocations = allocation_path(inputs['market_profile'], ages, retirement_age, inputs['glide_path'],
+                                  inputs['allocation'])
+    return_model = 'historical' if inputs['calculation_method'] == 'historical' else 'normal'
+    returns, levels = draw_market(n_paths, len(ages), inputs['market_profile'], seed, return_model, allocations,
+                                  inputs['inflation_model'], inputs['inflation_rate'])
+    return PathSet(returns, levels)
+
+
+def candidate_paths(inputs, current_age, retirement_ages, n_paths=DEFAULT_PATHS, seed=None):
+    """
+    Yield (retirement age, PathSet) for every candidate retirement age, all on common random numbers.
+
+    When the allocation path does not depend on the retirement age (anything
+    but a targetDate glide path) every candidate shares one PathSet. Otherwise
+    normal draws price each candidate's mix from one shared set of shocks,
+    and historical draws resample the same block start years.
+    """
+    ages = np.arange(current_age, PLANNING_HORIZON_AGE)
+    allocations = allocation_path(inputs['market_profile'], ages, np.asarray(retirement_ages, dtype=float)[:, None],
+                                  inputs['glide_path'], inputs['allocation'])
+    if (allocations == allocations[:1]).all():
+        path_set = plan_paths(inputs, current_age, n_paths, seed)
+        for retirement_age in retirement_ages:
+            yield retirement_age, path_set
+        return
+
+    if inputs['calculation_method'] == 'historical':
+        for retirement_age in retirement_ages:
+            yield retirement_age, plan_paths(inputs, current_age, n_paths, seed, retirement_age)
+        return
+
+    # The same shocks draw_returns would draw for each candidate
+    portfolio_shocks, cpi_shocks = draw_shocks(n_paths, len(ages), seed)
+    inflation = (inflation_paths(cpi_shocks, inputs['inflation_rate'])
+                 if inputs['inflation_model'] == 'stochastic' else None)
+    levels = market_price_levels(len(ages), inputs['inflation_model'], inputs['inflation_rate'], inflation)
+    for retirement_age, weights in zip(retirement_ages, allocations):
+        yield retirement_age, PathSet(portfolio_returns(portfolio_shocks, cpi_shocks, weights), levels)
+
+
+def retirement_age_candidates(current_age, latest_age=LATEST_RETIREMENT_AGE):
+    """Whole retirement ages the retirement age solver tries, from today up to latest_age (at most 100)."""
+    return np.arange(current_age, max(current_age, min(int(latest_age), PLANNING_HORIZON_AGE)) + 1)
+
+
+def _social_security_streams(inputs, primary_benefit, spouse_benefit):
+    """(start age, annual benefit) pairs like calculate_plan's."""
+    streams = [(inputs['social_security_claim_age'], primary_benefit)]
+    if inputs['marital_status'] != 'single' and inputs['spouse_social_security_claim_age']:
+        streams.append((inputs['spouse_social_security_claim_age'], spouse_benefit))
+    return streams
+
+
+def _bisect_paths(path_set, succeeds, upper):
+    """
+    Largest spending each path survives, bisected for every path at once.
+
+    succeeds(spending, paths) flags the selected paths that survive their own
+    spending levels. upper starts as a guess and doubles for the paths that
+    still survive it. Returns the per-path break-even spending (-1 for paths
+    that fail even with none) and the number of vectorized evaluations used.
+    """
+    low = np.zeros(path_set.n_paths)
+    high = np.full(path_set.n_paths, float(upper))
+    evaluations = 0
+    open_paths = np.flatnonzero(succeeds(high, slice(None)))
+    evaluations += 1
+    while len(open_paths) and evaluations < MAX_BISECTIONS:
+        low[open_paths] = high[open_paths]
+        high[open_paths] *= 2
+        open_paths = open_paths[succeeds(high[open_paths], open_paths)]
+        evaluations += 1
+
+    # Paths that fail with no spending at all cannot fund any budget
+    broke = ~succeeds(low, slice(None))
+    evaluations += 1
+    low[broke] = high[broke] = -1.0
+    active = np.flatnonzero(high - low > SPENDING_TOLERANCE)
+    while len(active) and evaluations < MAX_BISECTIONS:
+        middle = (low[active] + high[active]) / 2
+        passed = succeeds(middle, active)
+        low[active] = np.where(passed, middle, low[active])
+        high[active] = np.where(passed, high[active], middle)
+        active = active[high[active] - low[active] > SPENDING_TOLERANCE]
+        evaluations += 1
+    return low, evaluations
+
+
+def max_sustainable_spending(inputs, current_year, primary_benefit, spouse_benefit, healthcare_by_age,
+                             target_success=90.0, ending_balance=0.0, n_paths=DEFAULT_PATHS, seed=None):
+    """
+    Highest annual budget (excluding healthcare, in today's dollars) that
+    keeps the plan's success probability at target_success percent.
+
+    A path succeeds when it never runs dry and ends at PLANNING_HORIZON_AGE
+    with at least ending_balance in today's dollars. The budget is entered
+    like the plan's budget lines and keeps their mix (and their growth above
+    inflation); healthcare is spent on top of it. A path's success only falls
+    as spending rises, so bisecting every path's break-even spending at once
+    on shared draws gives the whole success-versus-spending curve in a few
+    dozen vectorized passes.
+    """
+    if not 0 < target_success <= 100:
+        raise ValueError("Target success probability must be between 0 and 100")
+    _check_paths(n_paths)
+    seed = resolve_seed(seed)
+    current_age = current_year - inputs['birth_year']
+    retirement_age = inputs['retirement_age']
+    path_set = plan_paths(inputs, current_age, n_paths, seed)
+
+    # Everything but the budget: contributions, real estate income less healthcare, Social Security
+    streams = _social_security_streams(inputs, primary_benefit, spouse_benefit)
+    fixed, social_security = build_lifecycle_cashflows(
+        current_age, retirement_age, inputs['annual_contribution'], healthcare_by_age,
+        inputs['real_estate_cashflow'], streams, split_social_security=True
+    )
+
+    # A dollar of budget, entered like the plan's lines, costs weights[t] dollars in year t
+    ages = np.arange(current_age, PLANNING_HORIZON_AGE)
+    lines = plan_budget_lines(inputs)
+    growth = budget_by_age(ages, budget_growth_by_age(lines, current_age, inputs['inflation_model']))
+    weights = np.where(ages >= retirement_age, growth, 0.0)
+
+    def succeeds(spending, paths):
+        cashflows = fixed[:, None] - weights[:, None] * spending
+        return path_set.survives(inputs['liquid_assets'], cashflows, social_security[:, None], ending_balance, paths)
+
+    break_even, evaluations = _bisect_paths(path_set, succeeds, max(sum(lines.values()), 1000.0))
+
+    def spending_at(success):
+        # The budget that a success% share of paths can still afford
+        return max(float(np.percentile(break_even, 100 - success, method='lower')), 0.0)
+
+    spending = spending_at(target_success)
+    return {
+        'annualBudget': round(spending),
+        'targetSuccess': target_success,
+        'successProbability': round(float((break_even >= spending).mean()) * 100, 1),
+        'endingBalance': ending_balance,
+        'healthcareAtRetirement': round(float(budget_by_age(max(retirement_age, current_age), healthcare_by_age))),
+        'curve': {
+            'successProbability': list(SPENDING_CURVE_TARGETS),
+            'annualBudget': [round(spending_at(success)) for success in SPENDING_CURVE_TARGETS]
+        },
+        'evaluations': evaluations,
+        'paths': path_set.n_paths,
+        'seed': seed
+    }
+
+
+def earliest_retirement_age(inputs, current_year, primary_benefit, spouse_benefit, healthcare_by_age,
+                            target_success=90.0, latest_age=LATEST_RETIREMENT_AGE, n_paths=DEFAULT_PATHS, seed=None):
+    """
+    Earliest whole retirement age whose success probability reaches target_success percent.
+
+    Every age from today to latest_age (see retirement_age_candidates) keeps
+    the plan's contributions, budget and claim ages, and is scored on the
+    same simulated paths (see candidate_paths), so the returned success curve
+    compares ages rather than luck. healthcare_by_age is a per-age cost array,
+    or one row per candidate when coverage before Medicare depends on the
+    age retired at. The answer is None when no candidate reaches the target.
+    """
+    if not 0 < target_success <= 100:
+        raise ValueError("Target success probability must be between 0 and 100")
+    _check_paths(n_paths)
+    seed = resolve_seed(seed)
+    current_age = current_year - inputs['birth_year']
+    candidates = retirement_age_candidates(current_age, latest_age)
+    streams = _social_security_streams(inputs, primary_benefit, spouse_benefit)
+    healthcare_by_age = np.asarray(healthcare_by_age, dtype=float)
+    if healthcare_by_age.ndim == 1:
+        healthcare_by_age = np.broadcast_to(healthcare_by_age, (len(candidates),) + healthcare_by_age.shape)
+    elif len(healthcare_by_age) != len(candidates):
+        raise ValueError("healthcare_by_age needs one row per candidate retirement age")
+    budget = budget_lines_by_age(plan_budget_lines(inputs), current_age, inputs['inflation_model'])
+
+    success = []
+    for (retirement_age, path_set), healthcare in zip(
+            candidate_paths(inputs, current_age, candidates, n_paths, seed), healthcare_by_age):
+        cashflows, social_security = build_lifecycle_cashflows(
+            current_age, retirement_age, inputs['annual_contribution'], budget + healthcare,
+            inputs['real_estate_cashflow'], streams, split_social_security=True
+        )
+        survived = path_set.survives(inputs['liquid_assets'], cashflows, social_security)
+        success.append(round(float(survived.mean()) * 100, 1))
+
+    reached = np.flatnonzero(np.asarray(success) >= target_success)
+    earliest = int(candidates[reached[0]]) if len(reached) else None
+    return {
+        'retirementAge': earliest,
+        'targetSuccess': target_success,
+        'successProbability': success[reached[0]] if len(reached) else None,
+        'curve': {
+            'retirementAge': candidates.tolist(),
+            'successProbability': success
+        },
+        'paths': n_paths,
+        'seed': seed
+    }
@@ -0,0 +1,400 @@
+    function toggleSpouseFields() {
+        const maritalStatus = document.getElementById('maritalStatus').value;
+        const spouseFields = document.getElementById('spouseFields');
+        const bothWorkingFields = document.getElementById('bothWorkingFields');
+        const spouseSSFields = document.getElementById('spouseSSFields');
+
+        if (maritalStatus !== 'single') {
+            spouseFields.style.display = 'block';
+            bothWorkingFields.style.display = 'block';
+            spouseSSFields.style.display = 'block';
+        } else {
+            spouseFields.style.display = 'none';
+            bothWorkingFields.style.display = 'none';
+            spouseSSFields.style.display = 'none';
+            toggleSpouseFinancialFields();
+        }
+    }
+
+    function toggleSpouseFinancialFields() {
+        const bothWorking = document.getElementById('bothWorking').value;
+        const spouseIncomeFields = document.getElementById('spouseIncomeFields');
+        const spouseYearsFields = document.getElementById('spouseYearsFields');
+        const spouseContributionFields = document.getElementById('spouseContributionFields');
+
+        if (bothWorking === 'both') {
+            spouseIncomeFields.style.display = 'block';
+            spouseYearsFields.style.display = 'block';
+            spouseContributionFields.style.display = 'block';
+        } else {
+            spouseIncomeFields.style.display = 'none';
+            spouseYearsFields.style.display = 'none';
+            spouseContributionFields.style.display = 'none';
+        }
+    }
+
+
+
+    function resetForm() {
+        document.querySelector('form').reset();
+        toggleSpouseFields();
+        updateTotalBudget();
+    }
+
+    function updateTotalBudget() {
+        const housing = parseFloat(document.getElementById('housing').value) || 0;
+        const healthcare = parseFloat(document.getElementById('healthcare').value) || 0;
+        const foodLiving = parseFloat(document.getElementById('foodLiving').value) || 0;
+        const travelLeisure = parseFloat(document.getElementById('travelLeisure').value) || 0;
+        const otherDiscretionary = parseFloat(document.getElementById('otherDiscretionary').value) || 0;
+
+        const total = housing + healthcare + foodLiving + travelLeisure + otherDiscretionary;
+        document.getElementById('totalBudget').textContent = '$' + total.toLocaleString();
+    }
+
+    // Add event listeners for budget fields
+    document.addEventListener('DOMContentLoaded', function() {
+        const budgetFields = ['housing', 'healthcare', 'foodLiving', 'travelLeisure', 'otherDiscretionary'];
+        budgetFields.forEach(field => {
+            document.getElementById(field).addEventListener('input', updateTotalBudget);
+        });
+
+                // Add event listeners for healthcare estimation
+    const healthcareFields = ['birthYear', 'annualIncome', 'state', 'zipCode', 'tobaccoUse'];
+    healthcareFields.forEach(field => {
+        document.getElementById(field).addEventListener('change', estimateHealthcare);
+    });
+
+    toggleSpouseFields();
+    loadProfileList(); // Load saved profiles on page load
+});
+
+// Profile Management Functions
+function saveProfile() {
+    const profileName = document.getElementById('profileName').value.trim();
+    if (!profileName) {
+        showProfileMessage('Please enter a profile name', 'error');
+        return;
+    }
+
+    const profileData = collectFormData();
+    const profiles = getProfiles();
+    profiles[profileName] = profileData;
+    localStorage.setItem('retirementProfiles', JSON.stringify(profiles));
+
+    showProfileMessage(`Profile "${profileName}" saved successfully!`, 'success');
+    loadProfileList();
+    document.getElementById('profileName').value = '';
+}
+
+function loadProfile() {
+    const profileSelect = document.getElementById('profileSelect');
+    const selectedProfile = profileSelect.value;
+
+    if (!selectedProfile) {
+        showProfileMessage('Please select a profile to load', 'error');
+        return;
+    }
+
+    const profiles = getProfiles();
+    const profileData = profiles[selectedProfile];
+
+    if (profileData) {
+        populateForm(profileData);
+        showProfileMessage(`Profile "${selectedProfile}" loaded successfully!`, 'success');
+    } else {
+        showProfileMessage('Profile not found', 'error');
+    }
+}
+
+function executeProfileAction() {
+    const action = document.getElementById('profileAction').value;
+    const profileSelect = document.getElementById('profileSelect');
+    const selectedProfile = profileSelect.value;
+
+    switch (action) {
+        case 'save':
+            saveProfile();
+            break;
+        case 'load':
+            if (selectedProfile) {
+                loadProfile();
+            } else {
+                showProfileMessage('Please select a profile to load', 'error');
+            }
+            break;
+        case 'delete':
+            if (selectedProfile) {
+                deleteProfile(selectedProfile);
+            } else {
+                showProfileMessage('Please select a profile to delete', 'error');
+            }
+            break;
+    }
+}
+
+function deleteProfile(profileName) {
+    if (confirm(`Are you sure you want to delete profile "${profileName}"?`)) {
+        const profiles = getProfiles();
+        delete profiles[profileName];
+        localStorage.setItem('retirementProfiles', JSON.stringify(profiles));
+
+        showProfileMessage(`Profile "${profileName}" deleted successfully!`, 'success');
+        loadProfileList();
+    }
+}
+
+function exportProfiles() {
+    const profiles = getProfiles();
+    const dataStr = JSON.stringify(profiles, null, 2);
+    const dataBlob = new Blob([dataStr], {type: 'application/json'});
+
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(dataBlob);
+    link.download = 'retirement_profiles.json';
+    link.click();
+
+    showProfileMessage('All profiles exported successfully!', 'success');
+}
+
+function importProfiles() {
+    const input = document.createElement('input');
+    input.type = 'file';
+    input.accept = '.json';
+    input.onchange = function(e) {
+        const file = e.target.files[0];
+        const reader = new FileReader();
+
+        reader.onload = function(e) {
+            try {
+                const importedProfiles = JSON.parse(e.target.result);
+                const existingProfiles = getProfiles();
+
+                // Merge profiles, with imported ones taking precedence
+                const mergedProfiles = { ...existingProfiles, ...importedProfiles };
+                localStorage.setItem('retirementProfiles', JSON.stringify(mergedProfiles));
+
+                showProfileMessage('Profiles imported successfully!', 'success');
+                loadProfileList();
+            } catch (error) {
+                showProfileMessage('Error importing profiles: Invalid file format', 'error');
+            }
+        };
+
+        reader.readAsText(file);
+    };
+
+    input.click();
+}
+
+function collectFormData() {
+    const form = document.querySelector('form');
+    const formData = new FormData(form);
+    const data = {};
+
+    // Collect all form fields
+    for (let [key, value] of formData.entries()) {
+        data[key] = value;
+    }
+
+    // Add timestamp
+    data.timestamp = new Date().toISOString();
+
+    return data;
+}
+
+function populateForm(profileData) {
+    const form = document.querySelector('form');
+
+    // Populate all form fields
+    for (let key in profileData) {
+        if (profileData.hasOwnProperty(key) && key !== 'timestamp') {
+            const field = form.querySelector(`[name="${key}"]`);
+            if (field) {
+                if (field.type === 'checkbox') {
+                    field.checked = profileData[key] === 'true';
+                } else {
+                    field.value = profileData[key];
+                }
+            }
+        }
+    }
+
+    // Trigger necessary UI updates
+    toggleSpouseFields();
+    updateTotalBudget();
+
+    // Trigger healthcare estimation if location fields are filled
+    if (profileData.state && profileData.zipCode) {
+        estimateHealthcare();
+    }
+}
+
+function getProfiles() {
+    const profiles = localStorage.getItem('retirementProfiles');
+    return profiles ? JSON.parse(profiles) : {};
+}
+
+function loadProfileList() {
+    const profileSelect = document.getElementById('profileSelect');
+    const profiles = getProfiles();
+
+    // Clear existing options
+    profileSelect.innerHTML = '';
+
+    if (Object.keys(profiles).length === 0) {
+        profileSelect.innerHTML = '<option value="">No profiles saved</option>';
+        return;
+    }
+
+    // Add profile options
+    Object.keys(profiles).forEach(profileName => {
+        const option = document.createElement('option');
+        option.value = profileName;
+        option.textContent = profileName;
+        profileSelect.appendChild(option);
+    });
+}
+
+function showProfileMessage(message, type) {
+    const messageDiv = document.getElementById('profileMessage');
+    messageDiv.textContent = message;
+    messageDiv.style.display = 'block';
+
+    // Set styling based on message type
+    if (type === 'success') {
+        messageDiv.style.backgroundColor = '#d1fae5';
+        messageDiv.style.color = '#065f46';
+        messageDiv.style.border = '1px solid #10b981';
+    } else if (type === 'error') {
+        messageDiv.style.backgroundColor = '#fee2e2';
+        messageDiv.style.color = '#991b1b';
+        messageDiv.style.border = '1px solid #ef4444';
+    }
+
+    // Auto-hide after 5 seconds
+    setTimeout(() => {
+        messageDiv.style.display = 'none';
+    }, 5000);
+}
+
+function estimateHealthcare() {
+        const birthYear = document.getElementById('birthYear').value;
+        const annualIncome = document.getElementById('annualIncome').value;
+        const state = document.getElementById('state').value;
+        const zipCode = document.getElementById('zipCode').value;
+        const tobaccoUse = document.getElementById('tobaccoUse').value;
+
+        if (birthYear && annualIncome && state && zipCode) {
+            const currentYear = new Date().getFullYear();
+            const age = currentYear - parseInt(birthYear);
+
+            // Make API call to estimate healthcare premiums
+            fetch('/estimate_healthcare', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    age: age,
+                    income: parseInt(annualIncome),
+                    state: state,
+                    zip_code: zipCode,
+                    tobacco_use: tobaccoUse === 'true'
+                })
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    document.getElementById('healthcare').value = data.estimated_annual_cost;
+                    updateTotalBudget();
+
+                    // Show premium breakdown
+                    showHealthcareBreakdown(data);
+                }
+            })
+            .catch(error => {
+                console.error('Error estimating healthcare:', error);
+            });
+        }
+    }
+
+    function showHealthcareBreakdown(data) {
+        // Create or update healthcare breakdown display
+        let breakdownDiv = document.getElementById('healthcareBreakdown');
+        if (!breakdownDiv) {
+            breakdownDiv = document.createElement('div');
+            breakdownDiv.id = 'healthcareBreakdown';
+            breakdownDiv.style.cssText = 'margin-top: 1rem; padding: 1rem; background: #f0f9ff; border-radius: 6px; border: 1px solid #0ea5e9;';
+            document.getElementById('healthcare').parentNode.appendChild(breakdownDiv);
+        }
+
+        breakdownDiv.innerHTML = `
+            <h4 style="color: #0c4a6e; margin-bottom: 0.5rem;">Healthcare Premium Estimates</h4>
+            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 0.5rem; margin-bottom: 1rem;">
+                <div><strong>Bronze:</strong> $${data.premiums.Bronze.monthly}/mo</div>
+                <div><strong>Silver:</strong> $${data.premiums.Silver.monthly}/mo</div>
+                <div><strong>Gold:</strong> $${data.premiums.Gold.monthly}/mo</div>
+                <div><strong>Platinum:</strong> $${data.premiums.Platinum.monthly}/mo</div>
+            </div>
+            <div style="font-size: 0.9rem; color: #0369a1; margin-bottom: 0.5rem;">
+                <strong>Recommended:</strong> ${data.recommended_tier} Plan
+                ${data.subsidy_eligible ? `(Eligible for ${data.subsidy_percentage}% subsidy)` : ''}
+            </div>
+            <div style="font-size: 0.8rem; color: #6b7280; padding-top: 0.5rem; border-top: 1px solid #e2e8f0;">
+                <strong>Data Source:</strong> ${data.source || 'CMS Marketplace API'}
+            </div>
+        `;
+    }
+
+// Submit the plan in the background and swap in just the results fragment,
+// keeping the form as entered; a failed request falls back to a normal submit
+let pendingCalculation = null;
+
+function submitPlan(event) {
+    event.preventDefault();
+    const form = event.target;
+    const button = form.querySelector('button[type="submit"]');
+    const results = document.getElementById('results');
+
+    if (pendingCalculation) {
+        pendingCalculation.abort();
+    }
+    const controller = new AbortController();
+    pendingCalculation = controller;
+    button.disabled = true;
+
+    fetch(form.action + '?partial=1', {
+        method: 'POST',
+        body: new FormData(form),
+        signal: controller.signal
+    })
+    .then(response => response.text().then(body => ({ok: response.ok, body: body})))
+    .then(({ok, body}) => {
+        if (ok) {
+            results.innerHTML = body;
+            results.scrollIntoView({behavior: 'smooth'});
+        } else {
+            results.innerHTML = '';
+            const message = document.createElement('div');
+            message.className = 'error';
+            message.textContent = body;
+            results.appendChild(message);
+        }
+    })
+    .catch(error => {
+        if (error.name !== 'AbortError') {
+            form.submit();
+        }
+    })
+    .finally(() => {
+        if (pendingCalculation === controller) {
+            pendingCalculation = null;
+            button.disabled = false;
+        }
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.getElementById('planForm').addEventListener('submit', submitPlan);
+});
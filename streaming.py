@@ -0,0 +1,53 @@
+"""
+Streaming row output for the Retirement Planning Calculator.
+Turns column arrays (a LazyRows table's columns, a flattened sweep grid) into
+NDJSON or CSV text a chunk of rows at a time, so long projections and large
+grids go out incrementally without building every row dict up front.
+"""
+
+import csv
+import io
+import json
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Rows serialized per yielded chunk
+STREAM_CHUNK_ROWS = 512
+
+
+def stream_rows(columns, fmt='ndjson', chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Yield the rows of equal-length columns as NDJSON lines or CSV (header first).
+
+    Each chunk converts only chunk_rows values per column to Python objects,
+    so memory use stays flat however many rows there are.
+    """
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Unknown stream format: {fmt}")
+    names = list(columns)
+    size = len(columns[names[0]]) if names else 0
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if fmt == 'csv':
+        writer.writerow(names)
+        yield buffer.getvalue()
+
+    for start in range(0, size, chunk_rows):
+        values = [_to_list(columns[name][start:start + chunk_rows]) for name in names]
+        buffer.seek(0)
+        buffer.truncate()
+        if fmt == 'csv':
+            writer.writerows(zip(*values))
+        else:
+            for row in zip(*values):
+                buffer.write(json.dumps(dict(zip(names, row)), separators=(',', ':')))
+                buffer.write('\n')
+        yield buffer.getvalue()
+
+
+def _to_list(values):
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
@@ -0,0 +1,171 @@
+"""
+Parameter sweeps for the Retirement Planning Calculator.
+Evaluates the full Cartesian grid of retirement age x claim age x spouse
+claim age x annual budget as one broadcast array computation. Work that does
+not depend on a grid axis (benefits per claim age, allocation path and market
+draws per retirement age) is done once and shared by every cell.
+"""
+
+import math
+
+import numpy as np
+
+from inflation import budget_growth_by_age, cola_levels, expected_inflation, plan_budget_lines, price_levels
+from portfolio import ASSET_MEANS, allocation_path
+from projection import project_balances
+from simulation import PLANNING_HORIZON_AGE, budget_by_age, draw_market, resolve_seed
+from social_security import FULL_RETIREMENT_AGE, social_security_benefit, spousal_benefit
+
+SWEEP_METRICS = ('successProbability', 'endingBalance')
+
+# Monte Carlo paths per grid cell; all cells share the same draws
+SWEEP_PATHS = 1000
+
+# Upper bounds that keep a sweep inside one request's budget
+MAX_SWEEP_CELLS = 2500
+MAX_SWEEP_PATH_CELLS = 2000000
+
+
+def expand_axis(spec, default):
+    """
+    Turn an axis spec into a list of values.
+
+    Accepts a list of values, a {"start", "stop", "step"} range (stop
+    inclusive) or None for the single default value. No axis may have more
+    values than MAX_SWEEP_CELLS, the whole grid's limit.
+    """
+    if spec is None:
+        return [default]
+    if isinstance(spec, dict):
+        try:
+            start, stop, step = float(spec['start']), float(spec['stop']), float(spec.get('step', 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Range axes need numeric start, stop and optional step")
+        if not np.isfinite([start, stop, step]).all() or step <= 0 or stop < start:
+            raise ValueError("Range axes need finite start <= stop and a positive step")
+        # Sized before anything is allocated; the tolerance keeps a stop that lands on a step after rounding
+        count = math.floor((stop - start) / step + 1e-9) + 1
+        if count > MAX_SWEEP_CELLS:
+            raise ValueError(f"Range axis has {count} values; the limit is {MAX_SWEEP_CELLS}")
+        return (start + step * np.arange(count)).tolist()
+    if isinstance(spec, list) and len(spec) > MAX_SWEEP_CELLS:
+        raise ValueError(f"Axis has {len(spec)} values; the limit is {MAX_SWEEP_CELLS}")
+    if isinstance(spec, list) and spec:
+        try:
+            return [float(value) for value in spec]
+        except (TypeError, ValueError):
+            raise ValueError("Axis values must be numbers")
+    raise ValueError("Axis must be a non-empty list or a start/stop/step range")
+
+
+def run_sweep(inputs, current_year, retirement_ages, claim_ages, spouse_claim_ages, budgets,
+              metric='successProbability', n_paths=SWEEP_PATHS, seed=None, healthcare_by_age=None):
+    """
+    Evaluate every combination of the four axes for one household.
+
+    successProbability runs the lifecycle Monte Carlo to age 100 for every
+    cell on common random numbers, with returns drawn like the plan's
+    calculation method (historical bootstrap, else normal); endingBalance is the deterministic
+    timeline's assets at age 100. healthcare_by_age, a
+    per-age cost array or one row per retirement age, is spent on top of
+    every budget. Budgets are in
+    today's dollars and follow the plan's own mix of budget lines as those
+    inflate; flows are priced with the plan's inflation model. Returns the
+    metric as an array shaped (retirement ages, claim ages, spouse claim ages, budgets).
+    """
+    if metric not in SWEEP_METRICS:
+        raise ValueError(f"Unknown sweep metric: {metric}")
+    shape = (len(retirement_ages), len(claim_ages), len(spouse_claim_ages), len(budgets))
+    cells = int(np.prod(shape))
+    if cells > MAX_SWEEP_CELLS:
+        raise ValueError(f"Sweep grid has {cells} cells; the limit is {MAX_SWEEP_CELLS}")
+
+    current_age = current_year - inputs['birth_year']
+    couple = inputs['marital_status'] != 'single'
+    spouse_earns = (inputs['both_working'] == 'both' and bool(inputs['spouse_annual_income'])
+                    and bool(inputs['spouse_years_worked']))
+
+    # Axes broadcast as (R, C, S, B, 1); the trailing axis is time
+    # A spouse claim age of None means the spouse stream never starts
+    retirement = np.asarray(retirement_ages, dtype=float).reshape(-1, 1, 1, 1, 1)
+    claim = np.asarray(claim_ages, dtype=float).reshape(1, -1, 1, 1, 1)
+    spouse_claim = np.array([np.inf if age is None else age for age in spouse_claim_ages],
+                            dtype=float).reshape(1, 1, -1, 1, 1)
+    budget = np.asarray(budgets, dtype=float).reshape(1, 1, 1, -1, 1)
+
+    # Benefits depend on one axis each (the dependent spousal benefit follows the primary claim)
+    primary_ss = social_security_benefit(inputs['annual_income'], inputs['years_worked'], claim)
+    if not couple:
+        spouse_ss = np.zeros_like(spouse_claim)
+    elif spouse_earns:
+        spouse_ss = social_security_benefit(
+            inputs['spouse_annual_income'], inputs['spouse_years_worked'],
+            np.where(np.isfinite(spouse_claim), spouse_claim, FULL_RETIREMENT_AGE)
+        )
+    else:
+        spouse_ss = spousal_benefit(primary_ss, inputs['spouse_birth_year'], current_year)
+
+    end_age = PLANNING_HORIZON_AGE + 1 if metric == 'endingBalance' else PLANNING_HORIZON_AGE
+    ages = np.arange(current_age, end_age, dtype=float)
+    healthcare = 0.0
+    if healthcare_by_age is not None:
+        healthcare = budget_by_age(ages, healthcare_by_age)
+        if np.ndim(healthcare_by_age) == 2:
+            healthcare = healthcare.reshape(-1, 1, 1, 1, len(ages))
+
+    # A budget's real growth per age follows the plan's budget lines
+    inflation_model = inputs['inflation_model']
+    budget_growth = budget_by_age(ages, budget_growth_by_age(plan_budget_lines(inputs), current_age, inflation_model))
+
+    # Flows paid at the price level, and Social Security at its COLA index
+    price_linked = np.where(ages >= retirement, inputs['real_estate_cashflow'] - budget * budget_growth - healthcare,
+                            inputs['annual_contribution'])
+    cola_linked = np.where(ages >= retirement, np.where(ages >= claim, primary_ss, 0.0)
+                           + np.where(ages >= spouse_claim, spouse_ss, 0.0), 0.0)
+    full_shape = shape + (len(ages),)
+
+    # Glide paths depend on the retirement age, so the asset mix is (R, years, assets)
+    allocations = allocation_path(inputs['market_profile'], ages, retirement.reshape(-1, 1),
+                                  inputs['glide_path'], inputs['allocation'])
+
+    if metric == 'endingBalance':
+        # The canonical timeline's balance at 100, for every cell at once
+        levels = price_levels(expected_inflation(len(ages), inflation_model, inputs['inflation_rate']))
+        rates = np.broadcast_to((allocations @ ASSET_MEANS)[:, None, None, None, :], full_shape)
+        cashflows = np.broadcast_to(price_linked * levels[:-1] + cola_linked * cola_levels(levels), full_shape)
+        balances = project_balances(np.full(shape, float(inputs['liquid_assets'])), rates, cashflows)
+        return balances[..., -1]
+
+    # Lifecycle Monte Carlo: each retirement age's allocation path is drawn
+    # from the same seed, so every row sees the same market luck and CPI paths
+    if cells * n_paths > MAX_SWEEP_PATH_CELLS:
+        raise ValueError(f"Sweep needs {cells * n_paths} path-cells; the limit is {MAX_SWEEP_PATH_CELLS}")
+    seed = resolve_seed(seed)
+    return_model = 'historical' if inputs['calculation_method'] == 'historical' else 'normal'
+    if (allocations == allocations[:1]).all():
+        allocations = allocations[:1]
+    growth = np.empty((len(ages), len(allocations), n_paths))
+    for row, weights in enumerate(allocations):
+        returns, levels = draw_market(n_paths, len(ages), inputs['market_profile'], seed, return_model, weights,
+                                      inflation_model, inputs['inflation_rate'])
+        growth[:, row] = returns.T + 1.0
+    if levels is None:
+        levels = np.ones((len(ages) + 1, 1))
+    year_levels = levels[:-1]
+    cola_index = np.ascontiguousarray(cola_levels(levels.T).T)
+
+    def year_major(cashflows):
+        cashflows = np.broadcast_to(cashflows, full_shape).reshape(shape[0], -1, len(ages))
+        return np.ascontiguousarray(np.moveaxis(cashflows, -1, 0))
+    price_linked, cola_linked = year_major(price_linked), year_major(cola_linked)
+
+    balances = np.full((shape[0], cells // shape[0], n_paths), float(inputs['liquid_assets']))
+    ruined = np.zeros(balances.shape, dtype=bool)
+    for year in range(len(ages)):
+        balances *= growth[year][:, None, :]
+        balances += price_linked[year][:, :, None] * year_levels[year]
+        balances += cola_linked[year][:, :, None] * cola_index[year]
+        np.maximum(balances, 0.0, out=balances)
+        ruined |= balances <= 0
+
+    return (1.0 - ruined.mean(axis=-1)).reshape(shape)
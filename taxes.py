@@ -0,0 +1,349 @@
+"""
+Income tax model for the Retirement Planning Calculator.
+Portfolios are split into taxable, traditional (pre-tax) and Roth accounts.
+Each year's withdrawals, required minimum distributions, real estate income
+and Social Security are taxed with the 2024 federal brackets, standard
+deduction, provisional-income rules for benefits, capital gains brackets and
+a state rate table.
+
+Bracket schedules are stored as threshold arrays with the rate increase at
+each threshold, so a tax is a handful of elementwise operations for any array
+of incomes: every year of every Monte Carlo path at once.
+Brackets and deductions are indexed to inflation, so taxes are worked out in
+today's dollars; the Social Security thresholds are fixed in nominal dollars
+and shrink in real terms as prices rise.
+"""
+
+import numpy as np
+
+from withdrawals import rmd_divisor
+
+# 'federal' taxes federal income only; 'federalState' adds the state's rate
+TAX_MODELS = ('none', 'federal', 'federalState')
+
+ACCOUNT_TYPES = ('taxable', 'traditional', 'roth')
+
+# Order accounts are drawn down in; proRata draws from each in proportion to its balance
+WITHDRAWAL_ORDERS = {
+    'conventional': ('taxable', 'traditional', 'roth'),
+    'traditionalFirst': ('traditional', 'taxable', 'roth'),
+    'proRata': None
+}
+
+# Passes for grossing withdrawals up by the tax they trigger (see
+# simulate_tax_accounts); a path drops out once the tax on its grossed-up
+# withdrawal is within TAX_TOLERANCE of the tax it was grossed up by
+TAX_ITERATIONS = 8
+TAX_TOLERANCE = 0.01
+
+# Rate heirs are assumed to pay on inherited traditional balances; taxable
+# accounts get a stepped-up basis and Roth accounts pass tax-free
+HEIR_TAX_RATE = 0.24
+
+
+class BracketSchedule:
+    """
+    A progressive rate schedule: rates[i] applies to income above thresholds[i].
+    base[i] is the tax owed on income up to thresholds[i], and increments[i]
+    the rate added at thresholds[i].
+    """
+
+    def __init__(self, thresholds, rates):
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.rates = np.asarray(rates, dtype=float)
+        self.base = np.concatenate([[0.0], np.cumsum(np.diff(self.thresholds) * self.rates[:-1])])
+        self.increments = np.diff(self.rates, prepend=0.0)
+
+    def bracket(self, income):
+        """Index of the bracket each income falls in."""
+        return np.searchsorted(self.thresholds, np.maximum(income, 0.0), side='right') - 1
+
+    def tax(self, income):
+        """
+        Tax on each taxable income, summed as each threshold's rate increase
+        on the income above it (cheaper than a bracket lookup for large arrays).
+        """
+        income = np.asarray(income, dtype=float)
+        tax = np.zeros(income.shape)
+        above = np.empty(income.shape)
+        for threshold, increment in zip(self.thresholds, self.increments):
+            np.subtract(income, threshold, out=above)
+            np.maximum(above, 0.0, out=above)
+            above *= increment
+            tax += above
+        return tax[()]
+
+    def marginal_rate(self, income):
+        """Rate on the next dollar of each taxable income."""
+        return self.rates[self.bracket(income)]
+
+
+# 2024 federal schedules; unmarried couples file as two single filers
+FILING_STATUSES = ('single', 'married')
+
+ORDINARY_BRACKETS = {
+    'single': BracketSchedule([0, 11600, 47150, 100525, 191950, 243725, 609350],
+                              [0.10, 0.12, 0.22, 0.24, 0.32, 0.35, 0.37]),
+    'married': BracketSchedule([0, 23200, 94300, 201050, 383900, 487450, 731200],
+                               [0.10, 0.12, 0.22, 0.24, 0.32, 0.35, 0.37])
+}
+
+# Long-term capital gains stack on top of ordinary taxable income
+CAPITAL_GAINS_BRACKETS = {
+    'single': BracketSchedule([0, 47025, 518900], [0.0, 0.15, 0.20]),
+    'married': BracketSchedule([0, 94050, 583750], [0.0, 0.15, 0.20])
+}
+
+STANDARD_DEDUCTION = {'single': 14600, 'married': 29200}
+
+# Additional standard deduction from 65 (per filer; both spouses for married couples)
+SENIOR_DEDUCTION = {'single': 1950, 'married': 2 * 1550}
+SENIOR_AGE = 65
+
+# Provisional income above which 50% and then 85% of benefits become taxable (not inflation-indexed)
+SOCIAL_SECURITY_THRESHOLDS = {'single': (25000, 34000), 'married': (32000, 44000)}
+
+# State -> (approximate 2024 rate on retirement income, whether Social Security is taxed).
+# One flat rate per state on income above the federal standard deduction: state
+# brackets, deductions and retirement-income exclusions are not modelled
+STATE_INCOME_TAX = {
+    'AL': (0.050, False), 'AK': (0.0, False), 'AZ': (0.025, False), 'AR': (0.044, False),
+    'CA': (0.060, False), 'CO': (0.0425, False), 'CT': (0.050, False), 'DE': (0.055, False),
+    'DC': (0.065, False), 'FL': (0.0, False), 'GA': (0.0539, False), 'HI': (0.0725, False),
+    'ID': (0.058, False), 'IL': (0.0495, False), 'IN': (0.0305, False), 'IA': (0.050, False),
+    'KS': (0.0558, False), 'KY': (0.040, False), 'LA': (0.035, False), 'ME': (0.0675, False),
+    'MD': (0.0475, False), 'MA': (0.050, False), 'MI': (0.0425, False), 'MN': (0.068, True),
+    'MS': (0.047, False), 'MO': (0.048, False), 'MT': (0.059, True), 'NE': (0.0584, False),
+    'NV': (0.0, False), 'NH': (0.0, False), 'NJ': (0.0553, False), 'NM': (0.049, False),
+    'NY': (0.0585, False), 'NC': (0.045, False), 'ND': (0.0195, False), 'OH': (0.035, False),
+    'OK': (0.0475, False), 'OR': (0.0875, False), 'PA': (0.0307, False), 'RI': (0.0475, True),
+    'SC': (0.064, False), 'SD': (0.0, False), 'TN': (0.0, False), 'TX': (0.0, False),
+    'UT': (0.0455, True), 'VT': (0.066, True), 'VA': (0.0575, False), 'WA': (0.0, False),
+    'WV': (0.0512, True), 'WI': (0.053, False), 'WY': (0.0, False)
+}
+
+
+def filing_status(marital_status):
+    """Federal filing status for a plan: married couples file jointly, everyone else single."""
+    return 'married' if marital_status == 'married' else 'single'
+
+
+def rmd_start_age(birth_year):
+    """Age required minimum distributions start under SECURE 2.0."""
+    if birth_year >= 1960:
+        return 75
+    return 73 if birth_year >= 1951 else 72
+
+
+def taxable_social_security(benefits, other_income, status='single', threshold_scale=1.0):
+    """
+    Taxable part of Social Security benefits from provisional income
+    (other income plus half the benefits). threshold_scale converts the
+    nominal thresholds into the dollars the incomes are in.
+    """
+    benefits = np.asarray(benefits, dtype=float)
+    lower, upper = (np.asarray(threshold_scale) * threshold for threshold in SOCIAL_SECURITY_THRESHOLDS[status])
+    provisional = other_income + 0.5 * benefits
+    first_tier = np.minimum(0.5 * benefits, 0.5 * np.clip(provisional - lower, 0.0, upper - lower))
+    return np.minimum(0.85 * benefits, first_tier + 0.85 * np.maximum(provisional - upper, 0.0))
+
+
+def income_tax(ordinary, gains, social_security, status='single', state=None, tax_model='federalState',
+               senior=False, threshold_scale=1.0, couple=False):
+    """
+    Federal and state tax on a year's income, for arrays of any matching shape.
+
+    ordinary is ordinary income other than Social Security (traditional
+    withdrawals, conversions, real estate income), gains realized long-term
+    capital gains. Returns (federal tax, state tax, taxable Social Security).
+    An unmarried couple (couple=True) is taxed as two single filers splitting
+    the income evenly.
+    """
+    if couple:
+        federal, state_tax, taxable = income_tax(ordinary / 2, gains / 2, np.asarray(social_security) / 2, 'single',
+                                                 state, tax_model, senior, threshold_scale)
+        return 2 * federal, 2 * state_tax, 2 * taxable
+
+    taxable_ss = taxable_social_security(social_security, ordinary + gains, status, threshold_scale)
+    deduction = STANDARD_DEDUCTION[status] + np.where(senior, SENIOR_DEDUCTION[status], 0.0)
+    ordinary_income = ordinary + taxable_ss
+    taxable_ordinary = np.maximum(ordinary_income - deduction, 0.0)
+    taxable_gains = np.maximum(gains - np.maximum(deduction - ordinary_income, 0.0), 0.0)
+
+    gains_brackets = CAPITAL_GAINS_BRACKETS[status]
+    federal = (ORDINARY_BRACKETS[status].tax(taxable_ordinary)
+               + gains_brackets.tax(taxable_ordinary + taxable_gains) - gains_brackets.tax(taxable_ordinary))
+
+    rate, taxes_benefits = STATE_INCOME_TAX.get(state, (0.0, False)) if tax_model == 'federalState' else (0.0, False)
+    state_income = ordinary + gains + (taxable_ss if taxes_benefits else 0.0) - deduction
+    return federal, rate * np.maximum(state_income, 0.0), taxable_ss
+
+
+def _draw_down(gross, rmd, balances, order):
+    """
+    Split gross withdrawals across {account: balance} after taking the RMD
+    from the traditional account first. Returns {account: withdrawal}.
+    """
+    taken = {account: np.zeros_like(gross) for account in ACCOUNT_TYPES}
+    taken['traditional'] = np.minimum(rmd, balances['traditional'])
+    remaining = np.maximum(gross - taken['traditional'], 0.0)
+    available = {account: balances[account] - taken[account] for account in ACCOUNT_TYPES}
+    if order is None:
+        total = sum(available.values())
+        share = np.divide(remaining, total, out=np.ones_like(total), where=total > 0)
+        for account in ACCOUNT_TYPES:
+            taken[account] += available[account] * np.minimum(share, 1.0)
+        return taken
+    for account in order:
+        amount = np.minimum(remaining, available[account])
+        taken[account] += amount
+        remaining -= amount
+    return taken
+
+
+def _gross_up(need, rmd, balances, order, gain_share, other_ordinary, benefits, tax_options):
+    """
+    Solve tax = income_tax(withdrawals covering need + tax) for every path.
+
+    The tax is piecewise linear in the amount withdrawn, so after one plain
+    fixed-point pass each path takes secant steps through its last two
+    passes; once both lie on one bracket segment the step lands on the
+    answer. Paths leave the loop as they settle. Returns (tax, federal tax,
+    state tax, taxable Social Security) per path.
+    """
+    n_paths = len(gain_share)
+    status, state, tax_model, senior, threshold_scale, couple = tax_options
+    # Per-path inputs, compacted to the unsettled paths as they drop out
+    columns = [np.broadcast_to(value, (n_paths,)) for value in
+               (need, rmd, other_ordinary, benefits, threshold_scale, gain_share, *balances.values())]
+    tax, federal, state_tax, taxable_ss = (np.zeros(n_paths) for _ in range(4))
+    rows = slice(None)
+    guess = np.zeros(n_paths)
+    previous_guess = previous_tax = None
+    for _ in range(TAX_ITERATIONS):
+        path_need, path_rmd, path_other, path_benefits, path_scale, path_gain_share, *path_balances = columns
+        taken = _draw_down(np.maximum(path_need + guess, 0.0), path_rmd, dict(zip(balances, path_balances)), order)
+        path_federal, path_state, path_taxable_ss = income_tax(
+            taken['traditional'] + path_other, taken['taxable'] * path_gain_share, path_benefits,
+            status, state, tax_model, senior, path_scale, couple
+        )
+        path_tax = path_federal + path_state
+        federal[rows], state_tax[rows], taxable_ss[rows], tax[rows] = path_federal, path_state, path_taxable_ss, path_tax
+
+        step = path_tax
+        if previous_guess is not None:
+            moved = guess - previous_guess
+            slope = np.divide(path_tax - previous_tax, moved, out=np.zeros(len(moved)), where=moved != 0)
+            step = guess + (path_tax - guess) / (1 - np.clip(slope, 0.0, 0.9))
+        unsettled = np.abs(path_tax - guess) > TAX_TOLERANCE
+        remaining = np.count_nonzero(unsettled)
+        if not remaining:
+            break
+        # Settled paths stay put under further passes, so only compact once most have settled
+        if remaining < len(unsettled) // 2:
+            rows = np.arange(n_paths)[rows][unsettled]
+            columns = [column[unsettled] for column in columns]
+            guess, path_tax, step = guess[unsettled], path_tax[unsettled], step[unsettled]
+        previous_guess, previous_tax, guess = guess, path_tax, step
+    return tax, federal, state_tax, taxable_ss
+
+
+def simulate_tax_accounts(accounts, contributions, contribution_account, spending, income, social_security,
+                          ages, returns, levels=None, marital_status='single', state=None, tax_model='federalState',
+                          order='conventional', rmd_age=73, conversions=None):
+    """
+    Roll taxable, traditional and Roth balances forward through a return
+    matrix, taxing every year's income.
+
+    accounts holds the starting 'taxable', 'traditional' and 'roth' balances
+    and the taxable account's cost 'basis'. contributions (to
+    contribution_account), the retirement budget spending, taxable real
+    estate income and Social Security are length-years arrays in today's
+    dollars, paid at the end of each year at the price levels (and Social
+    Security at the COLA index) exactly like simulate_balances' cashflows.
+    Each year's spending and taxes are withdrawn in the WITHDRAWAL_ORDERS
+    order after any RMD, and RMD money that is not spent is reinvested in the
+    taxable account. conversions, (years,) or (years, n_paths) in today's
+    dollars, move traditional money to the Roth account at the start of each
+    year as ordinary income. Taxes are worked out in today's dollars, so
+    brackets keep pace with prices.
+
+    Returns a dict of nominal (years + 1, n_paths) balances per account,
+    (years, n_paths) withdrawals per account, Roth conversions, federal and
+    state tax and taxable Social Security, plus the cumulative 'ruined' flags
+    of paths that could not cover spending and taxes.
+    """
+    if order not in WITHDRAWAL_ORDERS:
+        raise ValueError(f"Unknown withdrawal order: {order}")
+    n_paths, years = returns.shape
+    couple = marital_status == 'couple'
+    status = filing_status(marital_status)
+    growth = np.ascontiguousarray(returns.T) + 1.0
+    if levels is None:
+        levels = np.ones((years + 1, 1))
+    cola_index = np.concatenate([levels[:1], levels[:-2]])
+    ages = np.asarray(ages, dtype=float)
+    divisors = rmd_divisor(ages)
+
+    balances = {account: np.empty((years + 1, n_paths)) for account in ACCOUNT_TYPES}
+    for account in ACCOUNT_TYPES:
+        balances[account][0] = accounts.get(account, 0.0)
+    basis = np.full(n_paths, float(accounts.get('basis', accounts.get('taxable', 0.0))))
+    result = {f'{account}_withdrawal': np.zeros((years, n_paths)) for account in ACCOUNT_TYPES}
+    for name in ('roth_conversion', 'federal_tax', 'state_tax', 'taxable_social_security'):
+        result[name] = np.zeros((years, n_paths))
+    ruined = np.zeros((years, n_paths), dtype=bool)
+    failed = np.zeros(n_paths, dtype=bool)
+
+    for year in range(years):
+        price = levels[year]
+        current = {account: balances[account][year] * growth[year] for account in ACCOUNT_TYPES}
+        if contributions[year]:
+            current[contribution_account] = current[contribution_account] + contributions[year] * price
+            if contribution_account == 'taxable':
+                basis = basis + contributions[year] * price
+
+        # Flows in today's dollars; the nominal Social Security thresholds shrink as prices rise
+        benefits = social_security[year] * cola_index[year] / price
+        need = spending[year] - income[year] - benefits
+        available = sum(current.values()) / price
+        rmd = current['traditional'] / price / divisors[year] if ages[year] >= rmd_age else 0.0
+        converted = 0.0
+        if conversions is not None:
+            # The year's RMD has to come out first and cannot be converted
+            converted = np.clip(conversions[year], 0.0, current['traditional'] / price - rmd)
+            current['traditional'] = current['traditional'] - converted * price
+            current['roth'] = current['roth'] + converted * price
+        real = {account: current[account] / price for account in ACCOUNT_TYPES}
+        gain_share = np.divide(np.maximum(current['taxable'] - basis, 0.0), current['taxable'],
+                               out=np.zeros(n_paths), where=current['taxable'] > 0)
+        tax, federal, state_tax, taxable_ss = _gross_up(
+            need, rmd, real, WITHDRAWAL_ORDERS[order], gain_share, converted + max(income[year], 0.0), benefits,
+            (status, state, tax_model, ages[year] >= SENIOR_AGE, 1.0 / price, couple)
+        )
+        taken = _draw_down(np.maximum(need + tax, 0.0), rmd, real, WITHDRAWAL_ORDERS[order])
+
+        # RMDs (or income) beyond spending and taxes are reinvested; a shortfall ruins the path
+        failed |= need + tax > available + 0.5
+        reinvested = np.maximum(sum(taken.values()) - need - tax, 0.0) * price
+        basis = basis * (1 - np.divide(taken['taxable'], real['taxable'], out=np.zeros(n_paths),
+                                       where=real['taxable'] > 0)) + reinvested
+        for account in ACCOUNT_TYPES:
+            balances[account][year + 1] = current[account] - taken[account] * price
+            result[f'{account}_withdrawal'][year] = taken[account] * price
+        balances['taxable'][year + 1] += reinvested
+        result['roth_conversion'][year] = converted * price
+        result['federal_tax'][year] = federal * price
+        result['state_tax'][year] = state_tax * price
+        result['taxable_social_security'][year] = taxable_ss * price
+        ruined[year] = failed
+
+    for account in ACCOUNT_TYPES:
+        result[f'{account}_balance'] = balances[account]
+    result['ruined'] = ruined
+    return result
+
+
+def after_tax_value(taxable, traditional, roth):
+    """What the accounts are worth to heirs: traditional balances lose HEIR_TAX_RATE."""
+    return taxable + roth + traditional * (1 - HEIR_TAX_RATE)
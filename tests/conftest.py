@@ -0,0 +1,28 @@
+import pytest
+
+import healthcare_client
+import retirement_app
+
+PLAN = {
+    'maritalStatus': 'married', 'birthYear': 1975, 'retirementAge': 65, 'liquidAssets': 500000,
+    'realEstateCashflow': 24000, 'annualIncome': 120000, 'yearsWorked': 25, 'annualContribution': 20000,
+    'marketProfile': 'Moderate', 'calculationMethod': 'monteCarlo', 'socialSecurityClaimAge': 67,
+    'spouseBirthYear': 1977, 'bothWorking': 'both', 'spouseAnnualIncome': 80000, 'spouseYearsWorked': 20,
+    'spouseAnnualContribution': 10000, 'spouseSocialSecurityClaimAge': 67, 'housing': 24000,
+    'state': 'CA', 'zipCode': '94016', 'tobaccoUse': False, 'foodLiving': 18000,
+    'travelLeisure': 15000, 'otherDiscretionary': 10000, 'seed': 7
+}
+
+
+@pytest.fixture
+def plan():
+    """A married couple's plan fields, as the JSON API takes them."""
+    return dict(PLAN)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Flask test client whose Marketplace lookups fail fast, so healthcare falls back to the rating tables."""
+    monkeypatch.setattr(healthcare_client.marketplace_client, 'api_url', 'http://127.0.0.1:9/none')
+    retirement_app.premium_cache.local.clear()
+    return retirement_app.app.test_client()
@@ -0,0 +1,51 @@
+import numpy as np
+
+from claiming import optimize_claiming
+from social_security import claim_adjustment, fra_benefit
+
+YEARS = 45  # age 55 to 100
+
+
+def flat_projection(initial_balance=0.0, spending=0.0, retirement_age=55):
+    ages = np.arange(55, 55 + YEARS)
+    return {
+        'initial_balance': initial_balance,
+        'rates': np.zeros(YEARS),
+        'cashflows': np.where(ages >= retirement_age, -spending, 0.0),
+        'cola_index': np.ones(YEARS),
+        'paid': ages >= retirement_age,
+        'level': 1.0
+    }
+
+
+def test_chosen_value_needs_an_eligible_claim_age():
+    for claim_age in (60, 72):
+        result = optimize_claiming(55, 80000, 35, claim_age)
+        assert result['chosenValue'] is None and result['improvement'] is None
+
+    # Already 64: a claim at 63 is in the past
+    result = optimize_claiming(64, 80000, 35, 63)
+    assert result['chosenValue'] is None
+    assert result['primaryClaimAge']['age'] >= 64
+
+
+def test_portfolio_objective_adds_benefits_to_the_projection():
+    result = optimize_claiming(55, 80000, 35, 67, objective='portfolio', projection=flat_projection(100000.0))
+
+    # With no growth the balance at 100 is the start plus every benefit received
+    pia = float(fra_benefit(80000, 35))
+    received = pia * float(claim_adjustment(67)) * (100 - 67)
+    assert abs(result['chosenValue'] - (100000 + received)) < 1
+    assert result['primaryClaimAge']['age'] == 70
+    assert result['depletionAge'] is None
+
+
+def test_portfolio_objective_prefers_surviving_longer():
+    # 300,000 at 30,000 a year runs dry at 65 when claiming at 70
+    projection = flat_projection(300000.0, spending=30000.0)
+    result = optimize_claiming(55, 80000, 35, 70, objective='portfolio', projection=projection)
+
+    # Claiming early keeps the portfolio alive longer, so it beats a larger benefit that starts too late
+    assert result['primaryClaimAge']['age'] < 70
+    assert result['depletionAge'] is None or result['depletionAge'] > 65
+    assert result['improvement'] is not None
@@ -0,0 +1,33 @@
+import threading
+
+from healthcare_cache import MemoryBackend, PremiumCache
+
+
+def test_counters_are_exact_under_concurrent_lookups():
+    cache = PremiumCache(local=MemoryBackend(maxsize=8, ttl=3600))
+    threads, lookups = 8, 2000
+    start = threading.Barrier(threads)
+
+    def worker(offset):
+        start.wait()
+        for i in range(lookups):
+            cache.get_or_fetch((offset + i) % 16, lambda: {'premium': 1})
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats['hits'] + stats['sharedHits'] + stats['misses'] + stats['coalesced'] == threads * lookups
+    assert stats['entries'] <= 8
+
+
+def test_stats_count_hits_and_misses():
+    cache = PremiumCache(local=MemoryBackend(maxsize=2, ttl=3600))
+    for key in ('a', 'a', 'b', 'c', 'a'):
+        cache.get_or_fetch(key, lambda: 1)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 4, 2)
+    assert stats['hitRate'] == 0.2
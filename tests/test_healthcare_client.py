@@ -0,0 +1,103 @@
+import pytest
+import requests
+
+import healthcare_client
+from healthcare_client import CircuitBreaker, MarketplaceClient
+
+
+class StubResponse:
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self.body = body if body is not None else {'plans': []}
+
+    def json(self):
+        return self.body
+
+
+class StubSession:
+    """Plays back scripted responses (or raises scripted exceptions) and counts calls."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def post(self, url, json=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(healthcare_client.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def make_client(*outcomes):
+    client = MarketplaceClient(api_url='http://stub.invalid', breaker=CircuitBreaker(failure_threshold=2,
+                                                                                  reset_timeout=30))
+    client.session = StubSession(*outcomes)
+    return client
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    client = make_client(requests.exceptions.ConnectTimeout(), StubResponse(503))
+    assert client.search_plans({}) is None
+    assert client.breaker.state == 'closed'
+    assert client.search_plans({}) is None
+    assert client.breaker.state == 'open'
+
+    # While open, requests fall straight through without touching the API
+    assert client.search_plans({}) is None
+    assert client.session.calls == 2
+
+
+def test_half_open_trial_success_closes_the_breaker(clock):
+    client = make_client(StubResponse(500), StubResponse(500), StubResponse(200, {'plans': [1]}))
+    client.search_plans({})
+    client.search_plans({})
+    clock[0] += 30
+    assert client.breaker.state == 'half-open'
+    assert client.search_plans({}) == {'plans': [1]}
+    assert client.breaker.state == 'closed'
+    assert client.breaker.failures == 0
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    client = make_client(StubResponse(500), StubResponse(500), requests.exceptions.ReadTimeout())
+    client.search_plans({})
+    client.search_plans({})
+    clock[0] += 30
+    assert client.search_plans({}) is None
+    assert client.breaker.state == 'open'
+
+    # The reset timeout starts again from the failed trial
+    clock[0] += 29
+    assert client.breaker.state == 'open'
+    clock[0] += 1
+    assert client.breaker.state == 'half-open'
+
+
+def test_half_open_lets_one_trial_through_at_a_time(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_unexpected_trial_error_frees_the_trial_slot(clock):
+    client = make_client(StubResponse(500), StubResponse(500), RuntimeError('boom'), StubResponse(200))
+    client.search_plans({})
+    client.search_plans({})
+    clock[0] += 30
+    with pytest.raises(RuntimeError):
+        client.search_plans({})
+
+    # Still half-open, and the next request is allowed to try again
+    assert client.breaker.state == 'half-open'
+    assert client.search_plans({}) == {'plans': []}
+    assert client.breaker.state == 'closed'
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from inflation import BUDGET_INFLATION_SPREADS, INFLATION_MEAN, MEDICAL_INFLATION
+from retirement_app import resolve_healthcare_costs
+from schema import parse_plan_inputs
+
+CURRENT_YEAR = 2025
+CURRENT_AGE = CURRENT_YEAR - 1975
+
+
+def healthcare(client, plan, inflation_model, **fields):
+    inputs = parse_plan_inputs(dict(plan, inflationModel=inflation_model, **fields))
+    return resolve_healthcare_costs(inputs, CURRENT_YEAR)
+
+
+def test_medical_spread_is_medical_over_general_inflation():
+    assert (1 + BUDGET_INFLATION_SPREADS['healthcare']) * (1 + INFLATION_MEAN) == pytest.approx(1 + MEDICAL_INFLATION)
+
+
+@pytest.mark.parametrize('fields', [{'healthcare': 12000}, {}], ids=['entered', 'estimated'])
+def test_healthcare_grows_by_the_medical_spread_unless_inflation_is_off(client, plan, fields):
+    flat = healthcare(client, plan, 'none', **fields)
+    grown = healthcare(client, plan, 'deterministic', **fields)
+    years = np.maximum(np.arange(len(flat)) - CURRENT_AGE, 0)
+    np.testing.assert_allclose(grown, flat * (1 + BUDGET_INFLATION_SPREADS['healthcare']) ** years)
+    if fields:
+        assert np.array_equal(flat, np.full(len(flat), 12000.0))
+    # Stochastic CPI still adds the same spread on top of each path's prices
+    np.testing.assert_allclose(healthcare(client, plan, 'stochastic', **fields), grown)
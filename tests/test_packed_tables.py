@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from packed_tables import PackedTable, is_stale, write_packed
+
+
+def touch(path, mtime):
+    path.write_bytes(path.read_bytes() if path.exists() else b'')
+    os.utime(path, (mtime, mtime))
+
+
+def test_write_packed_swaps_in_a_complete_file(tmp_path):
+    path = tmp_path / 'table.bin'
+    write_packed(str(path), lambda f: f.write(b'abc'))
+    assert path.read_bytes() == b'abc'
+    assert os.listdir(tmp_path) == ['table.bin']
+
+
+def test_failed_write_keeps_the_old_file_and_no_temp(tmp_path):
+    path = tmp_path / 'table.bin'
+    path.write_bytes(b'old')
+
+    def write(f):
+        f.write(b'partial')
+        raise ValueError('bad source')
+
+    with pytest.raises(ValueError):
+        write_packed(str(path), write)
+    assert path.read_bytes() == b'old'
+    assert os.listdir(tmp_path) == ['table.bin']
+
+
+def test_stale_when_missing_or_older_than_a_source(tmp_path):
+    source, other, built = tmp_path / 'a.csv', tmp_path / 'b.csv', tmp_path / 'table.bin'
+    touch(source, 1000)
+    touch(other, 1000)
+    assert is_stale(str(built), [str(source), str(other)])
+    touch(built, 2000)
+    assert not is_stale(str(built), [str(source), str(other)])
+    touch(other, 3000)
+    assert is_stale(str(built), [str(source), str(other)])
+
+
+def test_load_falls_back_to_the_committed_binary(tmp_path):
+    source, built = tmp_path / 'a.csv', tmp_path / 'table.bin'
+    touch(built, 1000)
+    touch(source, 2000)
+
+    def read_only(path):
+        raise PermissionError(path)
+
+    class Table(PackedTable):
+        PATH = str(built)
+        SOURCES = (str(source),)
+        compile = staticmethod(read_only)
+
+        def __init__(self, path):
+            self.path = path
+
+    assert Table.load().path == str(built)
+    os.remove(built)
+    with pytest.raises(PermissionError):
+        Table.load()
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from roth_conversions import conversion_window, optimize_conversions
+
+AGES = np.arange(60, 100)
+RATES = np.full(len(AGES), 0.05)
+LEVELS = np.cumprod(np.concatenate([[1.0], np.full(len(AGES), 1.025)]))[:, None]
+OPTIONS = {'marital_status': 'married', 'state': 'CA', 'tax_model': 'federalState', 'rmd_age': 75}
+
+
+def tax_plan(traditional=1.2e6, roth=0.0, taxable=300000.0):
+    """A married couple retiring at 62 with most of their savings pre-tax and Social Security from 70."""
+    return {
+        'accounts': {'taxable': taxable, 'basis': taxable, 'traditional': traditional, 'roth': roth},
+        'contributions': np.zeros(len(AGES)),
+        'contribution_account': 'traditional',
+        'spending': np.where(AGES >= 62, 70000.0, 0.0),
+        'income': np.zeros(len(AGES)),
+        'social_security': np.where(AGES >= 70, 50000.0, 0.0),
+        'ages': AGES
+    }
+
+
+def optimize(objective='lifetimeTaxes', plan=None, retirement_age=62, **options):
+    options = dict(OPTIONS, **options)
+    return optimize_conversions(plan or tax_plan(), RATES, LEVELS, retirement_age, objective, **options)
+
+
+def test_window_runs_from_retirement_until_rmds():
+    window = conversion_window(AGES, 62, 75)
+    assert AGES[window].tolist() == list(range(62, 75))
+    assert not conversion_window(AGES, 75, 75).any()
+
+
+def test_no_window_means_no_schedule():
+    assert optimize(retirement_age=75) is None
+
+
+def test_unknown_objective_is_rejected():
+    with pytest.raises(ValueError):
+        optimize('fewestForms')
+
+
+@pytest.mark.parametrize('objective', ['lifetimeTaxes', 'afterTaxWealth'])
+def test_schedule_stays_inside_the_window(objective):
+    result = optimize(objective)
+    schedule = result['schedule']
+    assert (result['startAge'], result['endAge']) == (62, 74)
+    assert schedule['ages'] == list(range(62, 75))
+    assert min(schedule['conversion']) >= 0
+    assert result['totalConverted'] == pytest.approx(sum(schedule['conversion']), abs=len(schedule['ages']))
+
+
+def test_converting_beats_deferring_to_rmds_and_heirs():
+    result = optimize('lifetimeTaxes')
+    assert result['totalConverted'] > 0
+    assert result['taxSavings'] > 0
+    # Each figure is rounded on its own
+    assert result['lifetimeTax'] == pytest.approx(result['baseline']['lifetimeTax'] - result['taxSavings'], abs=1)
+
+
+def test_wealth_objective_never_loses_to_not_converting():
+    result = optimize('afterTaxWealth')
+    assert result['wealthGain'] >= 0
+    assert result['afterTaxEndingBalance'] == pytest.approx(
+        result['baseline']['afterTaxEndingBalance'] + result['wealthGain'], abs=1)
+
+
+def test_nothing_to_convert_leaves_the_baseline():
+    result = optimize(plan=tax_plan(traditional=0.0, roth=1.2e6))
+    assert result['totalConverted'] == 0
+    assert result['taxSavings'] == 0
+
+
+def test_calculate_returns_the_ladder(client, plan):
+    body = dict(plan, taxModel='federalState', traditionalAssets=400000, rothConversionObjective='lifetimeTaxes')
+    response = client.post('/api/v1/calculate', json=body)
+    assert response.status_code == 200, response.get_json()
+    ladder = response.get_json()['taxes']['rothConversions']
+    assert ladder['objective'] == 'lifetimeTaxes' and ladder['startAge'] == 65
+    assert ladder['taxSavings'] >= 0
+    response = client.post('/api/v1/calculate', json=dict(plan, rothConversionObjective='lifetimeTaxes'))
+    assert response.status_code == 400
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+from schema import parse_plan_inputs
+from simulation import PLANNING_HORIZON_AGE
+
+
+@pytest.mark.parametrize('time_step', ['annual', 'monthly'])
+def test_time_step_accepts_known_steps(plan, time_step):
+    assert parse_plan_inputs(dict(plan, timeStep=time_step))['time_step'] == time_step
+
+
+def test_time_step_defaults_to_annual(plan):
+    assert parse_plan_inputs(plan)['time_step'] == 'annual'
+
+
+def test_unknown_time_step_is_rejected(client, plan):
+    with pytest.raises(ValueError, match='timeStep'):
+        parse_plan_inputs(dict(plan, timeStep='weekly'))
+
+    response = client.post('/api/v1/calculate', json=dict(plan, timeStep='weekly'))
+    assert response.status_code == 400
+    assert 'timeStep' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('retirement_age', [101, 250, 30])
+def test_retirement_age_must_fall_between_today_and_the_horizon(client, plan, retirement_age):
+    with pytest.raises(ValueError, match='retirementAge must be between'):
+        parse_plan_inputs(dict(plan, retirementAge=retirement_age))
+
+    response = client.post('/api/v1/calculate', json=dict(plan, retirementAge=retirement_age))
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('retirementAge must be between')
+
+
+def test_retirement_age_may_be_today_or_the_horizon(plan):
+    current_age = datetime.now().year - plan['birthYear']
+    for retirement_age in (current_age, PLANNING_HORIZON_AGE):
+        assert parse_plan_inputs(dict(plan, retirementAge=retirement_age))['retirement_age'] == retirement_age
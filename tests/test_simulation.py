@@ -0,0 +1,56 @@
+import numpy as np
+
+from inflation import ASSET_INFLATION_COVARIANCES
+from portfolio import ALLOCATION_PRESETS, portfolio_moments
+from simulation import (draw_market, draw_returns, draw_shocks, portfolio_returns, simulate_balances,
+                        simulate_monthly_balances)
+
+
+def test_portfolio_returns_have_the_mix_moments_and_cpi_covariance():
+    weights = ALLOCATION_PRESETS['Aggressive']
+    returns, cpi_shocks = draw_returns(200000, 2, weights, seed=11)
+    mean, volatility = portfolio_moments(weights)
+    assert abs(returns.mean() - mean) < 1e-3
+    assert abs(returns.std() - volatility) < 1e-3
+    covariance = np.mean((returns - returns.mean()) * cpi_shocks)
+    assert abs(covariance - weights @ ASSET_INFLATION_COVARIANCES) < 1e-3
+
+
+def test_every_mix_shares_the_same_shocks():
+    portfolio_shocks, cpi_shocks = draw_shocks(3000, 10, seed=5)
+    _, again = draw_returns(3000, 10, ALLOCATION_PRESETS['Conservative'], seed=5)
+    assert np.array_equal(again, cpi_shocks)
+
+    # Returns of every mix rank the paths the same way in a year
+    ranks = [np.argsort(portfolio_returns(portfolio_shocks, 0 * cpi_shocks, weights)[:, 0])
+             for weights in ALLOCATION_PRESETS.values()]
+    assert all(np.array_equal(ranks[0], rank) for rank in ranks[1:])
+
+
+def test_yearly_allocations_follow_a_glide_path():
+    portfolio_shocks, cpi_shocks = draw_shocks(50000, 2, seed=3)
+    allocations = np.stack([ALLOCATION_PRESETS['Aggressive'], ALLOCATION_PRESETS['Conservative']])
+    returns = portfolio_returns(portfolio_shocks, cpi_shocks, allocations)
+    volatilities = portfolio_moments(allocations)[1]
+    assert np.allclose(returns.std(axis=0), volatilities, rtol=0.02)
+
+
+def test_historical_returns_follow_the_deterministic_rate():
+    real, _ = draw_market(500, 30, 'Moderate', 9, 'historical', inflation_model='none')
+    nominal, levels = draw_market(500, 30, 'Moderate', 9, 'historical', inflation_model='deterministic',
+                                  inflation_rate=0.03)
+    assert np.allclose(1 + nominal, (1 + real) * 1.03)
+    assert np.allclose(levels[:, 0], 1.03 ** np.arange(31))
+
+
+def test_social_security_is_paid_without_price_levels():
+    # Regression: with inflation off (levels None) the COLA-linked flows were dropped
+    returns = np.zeros((4, 10))
+    cola = np.full(10, 1000.0)
+    balances = simulate_balances(500.0, -100.0, returns, None, cola)
+    assert np.allclose(balances[-1], 500 + 10 * 900)
+
+    monthly_balances, ruined = simulate_monthly_balances(500.0, np.full((10, 12), -10.0), returns, None,
+                                                         np.full((10, 12), 100.0))
+    assert np.allclose(monthly_balances[-1], 500 + 10 * 12 * 90)
+    assert not ruined.any()
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from inflation import budget_growth_by_age, plan_budget_lines
+from schema import parse_plan_inputs
+from simulation import PLANNING_HORIZON_AGE
+from solver import MAX_SOLVER_PATHS, earliest_retirement_age, max_sustainable_spending, retirement_age_candidates
+
+PATHS = 2000
+
+
+def solve(client, plan, **fields):
+    response = client.post('/api/v1/solve', json=dict(plan, paths=PATHS, **fields))
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_spending_falls_as_the_success_target_rises(client, plan):
+    budgets = [solve(client, plan, targetSuccess=target)['annualBudget'] for target in (50, 75, 90, 99)]
+    assert budgets == sorted(budgets, reverse=True)
+    curve = solve(client, plan)['curve']['annualBudget']
+    assert curve == sorted(curve, reverse=True)
+
+
+def test_spending_rises_with_assets_and_falls_with_an_ending_target(client, plan):
+    base = solve(client, plan)['annualBudget']
+    assert solve(client, dict(plan, liquidAssets=plan['liquidAssets'] * 2))['annualBudget'] > base
+    assert solve(client, plan, targetEndingBalance=500000)['annualBudget'] < base
+
+
+def test_solved_budget_reaches_its_target(client, plan):
+    solution = solve(client, plan, targetSuccess=80)
+    assert solution['successProbability'] >= 80
+    assert solution['paths'] == PATHS
+
+
+def test_later_targets_need_later_retirement(client, plan):
+    plan = dict(plan, liquidAssets=150000, annualContribution=15000, healthcare=12000)
+    ages = [solve(client, plan, solveFor='retirementAge', targetSuccess=target)['retirementAge']
+            for target in (50, 80, 95)]
+    assert None not in ages
+    assert ages == sorted(ages)
+
+
+@pytest.mark.parametrize('paths', [0, -5, MAX_SOLVER_PATHS + 1, 10 ** 7, 'many', 2.5, True])
+def test_path_count_is_validated(client, plan, paths):
+    response = client.post('/api/v1/solve', json=dict(plan, paths=paths))
+    assert response.status_code == 400
+    assert 'paths' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('ending_balance', ['nan', 'inf', '-inf', -1000, 'lots', True])
+def test_target_ending_balance_must_be_a_finite_amount(client, plan, ending_balance):
+    response = client.post('/api/v1/solve', json=dict(plan, paths=PATHS, targetEndingBalance=ending_balance))
+    assert response.status_code == 400
+    assert 'targetEndingBalance' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('latest_age', [5000, 101, 30, 'soon', 70.5])
+def test_latest_age_is_validated(client, plan, latest_age):
+    response = client.post('/api/v1/solve', json=dict(plan, solveFor='retirementAge', latestAge=latest_age))
+    assert response.status_code == 400
+    assert 'latestAge' in response.get_json()['error']
+
+
+def test_candidates_stop_at_the_planning_horizon():
+    assert retirement_age_candidates(60, 5000)[-1] == PLANNING_HORIZON_AGE
+    assert retirement_age_candidates(60, 55).tolist() == [60]
+
+
+def test_solver_rejects_path_counts_out_of_range(plan):
+    with pytest.raises(ValueError, match='paths'):
+        max_sustainable_spending(parse_plan_inputs(plan), 2025, 20000, 15000, np.zeros(101), n_paths=0)
+
+
+def test_budget_growth_keeps_the_plan_mix(plan):
+    lines = plan_budget_lines(parse_plan_inputs(plan))
+    growth = budget_growth_by_age(lines, 50)
+    assert np.allclose(growth[:51], 1.0)
+    assert (np.diff(growth[50:]) > 0).all()
+    assert np.array_equal(budget_growth_by_age(dict.fromkeys(lines, 0.0), 50), np.ones(101))
+
+
+def test_earliest_retirement_age_does_not_depend_on_the_entered_age(client, plan):
+    # Healthcare is estimated (no amount entered), so pre-Medicare coverage depends on the age retired at
+    plan = dict(plan, liquidAssets=300000, annualContribution=25000)
+    solutions = [solve(client, dict(plan, retirementAge=age), solveFor='retirementAge', targetSuccess=85)
+                 for age in (55, 62, 70)]
+    assert solutions[0]['retirementAge'] is not None
+    for solution in solutions[1:]:
+        assert solution['retirementAge'] == solutions[0]['retirementAge']
+        assert solution['curve'] == solutions[0]['curve']
+
+
+def test_candidate_rows_must_match_the_candidates(plan):
+    with pytest.raises(ValueError, match='one row per candidate'):
+        earliest_retirement_age(parse_plan_inputs(plan), 2025, 20000, 15000, np.zeros((3, 101)), n_paths=100)
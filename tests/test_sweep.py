@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from schema import parse_plan_inputs
+from simulation import DEFAULT_PATHS
+from sweep import MAX_SWEEP_CELLS, expand_axis, run_sweep
+
+
+def sweep_values(client, plan, **sweep):
+    response = client.post('/api/v1/sweep', json=dict(plan, sweep=sweep, metric='endingBalance'))
+    assert response.status_code == 200, response.get_json()
+    return np.asarray(response.get_json()['values'])
+
+
+def test_each_retirement_age_prices_its_own_healthcare(client, plan):
+    swept = sweep_values(client, plan, retirementAge=[58, 62, 66])
+    for index, age in enumerate((58, 62, 66)):
+        alone = sweep_values(client, dict(plan, retirementAge=age))
+        assert swept[index].ravel()[0] == alone.ravel()[0]
+
+
+def test_healthcare_rows_match_separate_sweeps(plan):
+    inputs = parse_plan_inputs(plan)
+    rows = np.stack([np.full(101, 9000.0), np.full(101, 15000.0)])
+    both = run_sweep(inputs, 2025, [60, 64], [67], [67], [60000], n_paths=200, seed=3, healthcare_by_age=rows)
+    for index, age in enumerate((60, 64)):
+        alone = run_sweep(inputs, 2025, [age], [67], [67], [60000], n_paths=200, seed=3,
+                          healthcare_by_age=rows[index])
+        assert both[index, 0, 0, 0] == alone[0, 0, 0, 0]
+
+
+@pytest.mark.parametrize('method', ['monteCarlo', 'historical'])
+def test_single_cell_matches_the_plan_simulation(client, plan, method):
+    plan = dict(plan, calculationMethod=method, inflationModel='deterministic', healthcare=12000,
+                liquidAssets=250000, annualContribution=15000, retirementAge=60)
+    swept = client.post('/api/v1/sweep', json=dict(plan, paths=DEFAULT_PATHS)).get_json()
+    calculated = client.post('/api/v1/calculate', json=plan).get_json()
+    assert swept['values'][0][0][0][0] == calculated['monteCarlo']['successProbability']
+
+
+@pytest.mark.parametrize('paths', [0, 'lots'])
+def test_sweep_path_count_is_validated(client, plan, paths):
+    response = client.post('/api/v1/sweep', json=dict(plan, paths=paths))
+    assert response.status_code == 400
+    assert 'paths' in response.get_json()['error']
+
+
+def test_range_axes_are_sized_before_they_are_built(client, plan):
+    response = client.post('/api/v1/sweep', json=dict(plan, sweep={'annualBudget': {'start': 0, 'stop': 1e9}}))
+    assert response.status_code == 400
+    assert 'limit' in response.get_json()['error']
+    with pytest.raises(ValueError, match='limit'):
+        expand_axis(list(range(MAX_SWEEP_CELLS + 1)), 0)
+
+
+@pytest.mark.parametrize('spec', [{'start': 0, 'stop': 10, 'step': 0}, {'start': 0, 'stop': 10, 'step': -1},
+                                  {'start': 0, 'stop': 'inf'}, {'start': 0, 'stop': 10, 'step': 'nan'},
+                                  {'start': 10, 'stop': 0}])
+def test_bad_ranges_are_rejected(spec):
+    with pytest.raises(ValueError, match='Range axes'):
+        expand_axis(spec, 0)
+
+
+def test_range_stop_is_inclusive():
+    assert expand_axis({'start': 60, 'stop': 66, 'step': 2}, 0) == [60, 62, 64, 66]
+    assert expand_axis({'start': 60, 'stop': 65, 'step': 2}, 0) == [60, 62, 64]
+    assert expand_axis({'start': 0, 'stop': 0.3, 'step': 0.1}, 0) == pytest.approx([0, 0.1, 0.2, 0.3])
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from simulation import simulate_balances
+from taxes import (CAPITAL_GAINS_BRACKETS, ORDINARY_BRACKETS, STANDARD_DEDUCTION, income_tax, rmd_start_age,
+                   simulate_tax_accounts)
+
+YEARS = 40
+AGES = np.arange(60, 60 + YEARS)
+
+
+def market(n_paths=200, seed=3):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.05, 0.12, (n_paths, YEARS))
+    levels = np.vstack([np.ones(n_paths), np.cumprod(1 + rng.normal(0.025, 0.01, (YEARS, n_paths)), axis=0)])
+    return returns, levels
+
+
+def flows(spending=60000.0, social_security=30000.0):
+    """A plan that saves for five years and then spends with Social Security from 67."""
+    working = AGES < 65
+    return {
+        'contributions': np.where(working, 20000.0, 0.0),
+        'spending': np.where(working, 0.0, spending),
+        'income': np.zeros(YEARS),
+        'social_security': np.where(AGES >= 67, social_security, 0.0),
+        'ages': AGES
+    }
+
+
+@pytest.mark.parametrize('income, expected', [
+    (11600, 1160), (47150, 1160 + 0.12 * 35550), (100525, 5426 + 0.22 * 53375), (609350, 183647.25)
+])
+def test_single_ordinary_tax_at_bracket_edges(income, expected):
+    assert ORDINARY_BRACKETS['single'].tax(income) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('status', ['single', 'married'])
+def test_bracket_tax_is_continuous_and_steps_its_rate_at_each_threshold(status):
+    for schedule in (ORDINARY_BRACKETS[status], CAPITAL_GAINS_BRACKETS[status]):
+        for threshold, below, above in zip(schedule.thresholds[1:], schedule.rates[:-1], schedule.rates[1:]):
+            taxes = schedule.tax(np.array([threshold - 1, threshold, threshold + 1]))
+            assert np.diff(taxes) == pytest.approx([below, above])
+            assert schedule.marginal_rate(threshold) == above
+            assert schedule.marginal_rate(threshold - 1) == below
+        # Matches the cumulative base of each bracket
+        assert schedule.tax(schedule.thresholds) == pytest.approx(schedule.base)
+
+
+def test_gains_fill_the_zero_bracket_above_the_deduction():
+    federal, state, _ = income_tax(0.0, STANDARD_DEDUCTION['married'] + 94050, 0.0, 'married', 'CA', 'federal')
+    assert federal == pytest.approx(0.0) and state == 0.0
+    federal, _, _ = income_tax(0.0, STANDARD_DEDUCTION['married'] + 94150, 0.0, 'married', 'CA', 'federal')
+    assert federal == pytest.approx(15.0)
+
+
+def test_state_tax_is_a_flat_rate_above_the_deduction():
+    _, state, _ = income_tax(STANDARD_DEDUCTION['single'] + 10000, 0.0, 0.0, 'single', 'CA')
+    assert state == pytest.approx(600.0)
+    _, state, _ = income_tax(STANDARD_DEDUCTION['single'] + 10000, 0.0, 0.0, 'single', 'TX')
+    assert state == 0.0
+
+
+@pytest.mark.parametrize('birth_year, age', [(1945, 72), (1950, 72), (1951, 73), (1959, 73), (1960, 75), (1980, 75)])
+def test_rmd_start_age_follows_secure_2(birth_year, age):
+    assert rmd_start_age(birth_year) == age
+
+
+def test_rmds_start_at_rmd_age():
+    returns, levels = market(n_paths=1)
+    plan = dict(flows(spending=0.0, social_security=0.0), contributions=np.zeros(YEARS))
+    projection = simulate_tax_accounts({'traditional': 1e6}, contribution_account='traditional', returns=returns,
+                                       levels=levels, rmd_age=73, **plan)
+    withdrawals = projection['traditional_withdrawal'][:, 0]
+    assert not withdrawals[AGES < 73].any()
+    assert (withdrawals[AGES >= 73] > 0).all()
+
+
+def test_roth_only_plan_matches_the_untaxed_timeline():
+    returns, levels = market()
+    plan = flows()
+    projection = simulate_tax_accounts({'roth': 800000.0}, contribution_account='roth', returns=returns,
+                                       levels=levels, marital_status='married', state='CA', **plan)
+    cashflows = plan['contributions'] - plan['spending']
+    balances = simulate_balances(800000.0, cashflows, returns, levels, cola_cashflows=plan['social_security'])
+    alive = ~projection['ruined'][-1]
+    assert alive.mean() > 0.5
+    assert not projection['federal_tax'].any() and not projection['state_tax'].any()
+    np.testing.assert_allclose(projection['roth_balance'][:, alive], balances[:, alive], rtol=1e-9)
+
+
+@pytest.mark.parametrize('marital_status', ['single', 'married', 'couple'])
+def test_grossed_up_withdrawals_pay_the_tax_they_trigger(marital_status):
+    returns, levels = market()
+    plan = flows(spending=90000.0)
+    projection = simulate_tax_accounts({'traditional': 1.5e6}, contribution_account='traditional', returns=returns,
+                                       levels=levels, marital_status=marital_status, state='CA',
+                                       order='traditionalFirst', **plan)
+    prices = levels[:-1]
+    withdrawn = projection['traditional_withdrawal'] / prices
+    benefits = plan['social_security'][:, None] * np.vstack([levels[:1], levels[:-2]]) / prices
+    senior = (AGES >= 65)[:, None]
+    federal, state, _ = income_tax(withdrawn, np.zeros_like(withdrawn), benefits,
+                                   'married' if marital_status == 'married' else 'single', 'CA', 'federalState',
+                                   senior, 1.0 / prices, marital_status == 'couple')
+    tax = (projection['federal_tax'] + projection['state_tax']) / prices
+    # Reinvested RMDs land in the taxable account, which this order only taps once the traditional one runs dry
+    live = ~projection['ruined'] & (AGES >= 65)[:, None] & (projection['taxable_withdrawal'] == 0)
+    assert live.mean() > 0.5 and tax[live].min() > 1000
+    np.testing.assert_allclose(tax[live], (federal + state)[live], atol=0.05)
+    # The withdrawal covers spending net of Social Security plus that tax (an RMD can take more)
+    assert (withdrawn - (90000.0 - benefits + tax))[live].min() > -1e-6
@@ -0,0 +1,27 @@
+import numpy as np
+
+import retirement_app
+from portfolio import allocation_path
+from simulation import PLANNING_HORIZON_AGE, draw_market
+from withdrawals import parse_strategies
+
+
+def test_calculate_compares_strategies_on_the_simulations_own_draws(client, plan, monkeypatch):
+    draws = []
+    monkeypatch.setattr(retirement_app, 'draw_market', lambda *args: draws.append(args) or draw_market(*args))
+    response = client.post('/api/v1/calculate', json=dict(plan, withdrawalStrategies='all'))
+    assert response.status_code == 200, response.get_json()
+    assert len(draws) == 1
+    assert response.get_json()['withdrawalStrategies']['seed'] == plan['seed']
+
+
+def test_a_shared_market_matches_drawing_from_the_same_seed():
+    ages = np.arange(55, PLANNING_HORIZON_AGE)
+    allocations = allocation_path('Moderate', ages, 65, 'static', None)
+    args = (parse_strategies(['constantDollar', 'guytonKlinger']), 55, 65, 800000.0, 20000.0,
+            np.full(101, 60000.0), 0.0, [(67, 30000.0)], 'Moderate')
+    options = {'n_paths': 500, 'seed': 11, 'inflation_model': 'deterministic'}
+    market = draw_market(500, len(ages), 'Moderate', 11, 'normal', allocations, 'deterministic')
+    drawn = retirement_app.withdrawal_strategy_comparison(*args, **options)
+    shared = retirement_app.withdrawal_strategy_comparison(*args, **options, market=market)
+    assert shared == drawn
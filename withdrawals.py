@@ -0,0 +1,203 @@
+"""
+Retirement withdrawal strategies for the Retirement Planning Calculator.
+Each strategy is a policy that sets the next year's portfolio withdrawal for
+every simulated path at once from the path's balance, its first and previous
+withdrawals and the household's age. All strategies being compared run on
+the same return paths, so differences between them come from the policy
+rather than from luck. Amounts are in today's dollars.
+"""
+
+import numpy as np
+
+from simulation import percentile_bands, simulate_balances
+
+DEFAULT_WITHDRAWAL_RATE = 0.04
+
+# Guyton-Klinger guardrails: cut (raise) spending by GK_ADJUSTMENT when the
+# current withdrawal rate drifts GK_GUARDRAIL above (below) the initial rate;
+# cuts stop in the last GK_FINAL_YEARS before the planning horizon
+GK_GUARDRAIL = 0.2
+GK_ADJUSTMENT = 0.1
+GK_FINAL_YEARS = 15
+
+# Floor-and-ceiling: a percent of the portfolio, kept between these multiples of the first withdrawal
+FLOOR = 0.9
+CEILING = 1.2
+
+# IRS Uniform Lifetime Table divisors from age 72; younger ages add a year per year
+RMD_START_AGE = 72
+RMD_DIVISORS = np.array([
+    27.4, 26.5, 25.5, 24.6, 23.7, 22.9, 22.0, 21.1, 20.2, 19.4, 18.5, 17.7, 16.8, 16.0, 15.2,
+    14.4, 13.7, 12.9, 12.2, 11.5, 10.8, 10.1, 9.5, 8.9, 8.4, 7.8, 7.3, 6.8, 6.4
+])
+
+# Spending percentiles reported for every retirement year
+SPENDING_PERCENTILES = (10, 50, 90)
+
+
+def rmd_divisor(ages):
+    """Uniform Lifetime Table divisor at each age, extended linearly below 72 and held flat past its end."""
+    ages = np.asarray(ages, dtype=float)
+    index = np.clip(ages - RMD_START_AGE, 0, len(RMD_DIVISORS) - 1).astype(int)
+    return RMD_DIVISORS[index] + np.maximum(RMD_START_AGE - ages, 0)
+
+
+def vpw_rate(years_left, real_return):
+    """Share of the balance an annuity paid at the start of each of years_left years withdraws now."""
+    years_left = np.maximum(years_left, 1)
+    if real_return == 0:
+        return 1.0 / years_left
+    return real_return / ((1 + real_return) * (1 - (1 + real_return) ** -years_left))
+
+
+def constant_dollar(balance, first, previous, age, context):
+    """The first year's withdrawal, held level in real terms (the classic 4% rule)."""
+    return first
+
+
+def constant_percent(balance, first, previous, age, context):
+    """A fixed share of the current balance."""
+    return context['rate'] * balance
+
+
+def guyton_klinger(balance, first, previous, age, context):
+    """Last year's withdrawal, cut or raised when the withdrawal rate crosses a guardrail."""
+    initial_rate = context['rate']
+    current_rate = np.divide(previous, balance, out=np.full_like(balance, np.inf), where=balance > 0)
+    cut = (current_rate > initial_rate * (1 + GK_GUARDRAIL)) & (context['horizon_age'] - age > GK_FINAL_YEARS)
+    raise_ = current_rate < initial_rate * (1 - GK_GUARDRAIL)
+    return previous * np.where(cut, 1 - GK_ADJUSTMENT, np.where(raise_, 1 + GK_ADJUSTMENT, 1.0))
+
+
+def variable_percentage(balance, first, previous, age, context):
+    """VPW: the balance amortized over the years left to the horizon at the expected real return."""
+    return balance * vpw_rate(context['horizon_age'] - age + 1, context['real_return'])
+
+
+def required_minimum(balance, first, previous, age, context):
+    """The balance divided by the RMD life-expectancy divisor for the age."""
+    return balance / rmd_divisor(age)
+
+
+def floor_and_ceiling(balance, first, previous, age, context):
+    """A percent of the balance, kept between FLOOR and CEILING times the first withdrawal."""
+    return np.clip(context['rate'] * balance, FLOOR * first, CEILING * first)
+
+
+# Strategy name -> policy(balance, first, previous, age, context) -> withdrawal per path
+WITHDRAWAL_STRATEGIES = {
+    'constantDollar': constant_dollar,
+    'constantPercent': constant_percent,
+    'guytonKlinger': guyton_klinger,
+    'vpw': variable_percentage,
+    'rmd': required_minimum,
+    'floorCeiling': floor_and_ceiling
+}
+
+
+def parse_strategies(value):
+    """
+    Schema coercer for the strategies to compare: 'all', a comma-separated
+    string of names, or a list of names or {"name", "rate"} objects. Returns
+    a list of (name, withdrawal rate) pairs.
+    """
+    if isinstance(value, str):
+        value = list(WITHDRAWAL_STRATEGIES) if value == 'all' else [name.strip() for name in value.split(',')]
+    if not isinstance(value, list) or not value:
+        raise ValueError("Withdrawal strategies must be 'all' or a non-empty list")
+    strategies = []
+    for entry in value:
+        name, rate = (entry.get('name'), entry.get('rate', DEFAULT_WITHDRAWAL_RATE)) if isinstance(entry, dict) \
+            else (entry, DEFAULT_WITHDRAWAL_RATE)
+        if name not in WITHDRAWAL_STRATEGIES:
+            raise ValueError(f"Unknown withdrawal strategy: {name}")
+        strategies.append((name, float(rate)))
+    return strategies
+
+
+def simulate_strategy(policy, start_balance, growth, ages, rate, horizon_age, real_return):
+    """
+    Run one policy through the retirement years.
+
+    start_balance holds each path's balance at retirement and growth the
+    (years, n_paths) real growth factors of the retirement years. Withdrawals
+    come out at the start of each year and are capped at the balance.
+    The first and previous withdrawals a policy sees start at rate times the
+    retirement balance. Returns the (years, n_paths) withdrawals, the
+    (years + 1, n_paths) balances and a (n_paths,) flag of paths that could
+    not pay a withdrawal in full.
+    """
+    years, n_paths = growth.shape
+    context = {'rate': rate, 'horizon_age': horizon_age, 'real_return': real_return}
+    balances = np.empty((years + 1, n_paths))
+    balances[0] = start_balance
+    withdrawals = np.empty((years, n_paths))
+    first = rate * balances[0]
+    previous = first
+    failed = np.zeros(n_paths, dtype=bool)
+
+    for year in range(years):
+        wanted = policy(balances[year], first, previous, ages[year], context)
+        # Policies that spend the balance down (VPW's last year) may round a cent past it
+        failed |= wanted > balances[year] + 0.5
+        np.minimum(wanted, balances[year], out=withdrawals[year])
+        np.subtract(balances[year], withdrawals[year], out=balances[year + 1])
+        balances[year + 1] *= growth[year]
+        previous = wanted
+
+    return withdrawals, balances, failed
+
+
+def retirement_paths(initial_balance, contributions, returns, levels=None):
+    """
+    Each path's balance at retirement and real growth through retirement, in today's dollars.
+
+    returns is the (n_paths, years) nominal return matrix from today and
+    levels its (years + 1, n_paths) price levels (None when inflation is off);
+    contributions, in today's dollars, cover the working years at the front.
+    Returns the (n_paths,) retirement balances and the (retirement years,
+    n_paths) real growth factors that follow.
+    """
+    working = len(contributions)
+    accumulated = simulate_balances(initial_balance, contributions, returns[:, :working],
+                                    None if levels is None else levels[:working + 1])
+    growth = np.ascontiguousarray(returns[:, working:].T) + 1.0
+    if levels is None:
+        return accumulated[-1], growth
+    return accumulated[-1] / levels[working], growth * levels[working:-1] / levels[working + 1:]
+
+
+def compare_strategies(strategies, start_balance, growth, ages, spending, income, real_return):
+    """
+    Run every (name, rate) strategy on the same retirement paths and summarize each.
+
+    ages, spending and income give the age, budget and non-portfolio income
+    (real estate, Social Security) of each retirement year in today's
+    dollars; a year's total spending is its withdrawal plus income. A path
+    fails when the portfolio cannot pay a withdrawal its strategy calls for,
+    and falls short when total spending drops below the budget in any year.
+    """
+    ages = np.asarray(ages)
+    if not len(ages):
+        return {}
+    spending = np.asarray(spending, dtype=float)[:, None]
+    income = np.asarray(income, dtype=float)[:, None]
+    results = {}
+    for name, rate in strategies:
+        withdrawals, balances, failed = simulate_strategy(
+            WITHDRAWAL_STRATEGIES[name], start_balance, growth, ages, rate, int(ages[-1]), real_return
+        )
+        total = withdrawals + income
+        short = (total < spending - 0.5).any(axis=0)
+        bands = percentile_bands(total, SPENDING_PERCENTILES)
+        results[name] = {
+            'rate': rate,
+            'successProbability': round(float(1.0 - failed.mean()) * 100, 1),
+            'shortfallProbability': round(float(short.mean()) * 100, 1),
+            'medianFirstWithdrawal': round(float(np.median(withdrawals[0]))),
+            'medianLifetimeSpending': round(float(np.median(total.sum(axis=0)))),
+            'lowestSpendingP10': round(float(np.percentile(total.min(axis=0), 10))),
+            'medianEndingBalance': round(float(np.median(balances[-1]))),
+            'spending': {f'p{p}': bands[:, i].round().tolist() for i, p in enumerate(SPENDING_PERCENTILES)}
+        }
+    return results